@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.core.exceptions import PermissionDenied
-from .models import CustomUser
+from .models import CustomUser, Ticket, TransicionEstado
+from .operaciones_masivas import actualizar_tickets, eliminar_tickets
 
 
 class CustomUserAdmin(UserAdmin):
@@ -31,5 +32,56 @@ class CustomUserAdmin(UserAdmin):
             raise PermissionDenied("Solo los superusuarios pueden modificar el estado de 'is_staff'.")
         super().save_model(request, obj, form, change)
 
+def _accion_actualizar(descripcion, **cambios):
+    def accion(modeladmin, request, queryset):
+        total = actualizar_tickets(list(queryset.values_list('pk', flat=True)), **cambios)
+        modeladmin.message_user(request, f"Se actualizaron {total} tickets.")
+    accion.__name__ = 'marcar_' + '_'.join(str(valor).lower().replace(' ', '_') for valor in cambios.values())
+    return admin.action(description=descripcion, permissions=['change'])(accion)
+
+
+class TransicionEstadoInline(admin.TabularInline):
+    # El historial de estados es de solo inserción: se muestra sin permitir cambios.
+    model = TransicionEstado
+    fields = ('fecha', 'estado_anterior', 'estado_nuevo', 'tecnico', 'segundos_en_anterior')
+    readonly_fields = fields
+    ordering = ('fecha',)
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class TicketAdmin(admin.ModelAdmin):
+    list_display = ('id', 'titulo', 'usuario', 'tecnico_asignado', 'estado', 'prioridad', 'fecha_creacion')
+    list_filter = ('estado', 'prioridad', 'visita_terreno')
+    list_select_related = ('usuario', 'tecnico_asignado')
+    search_fields = ('titulo',)
+    raw_id_fields = ('usuario', 'tecnico_asignado')
+    inlines = [TransicionEstadoInline]
+    actions = [
+        _accion_actualizar("Marcar como Pendiente", estado='Pendiente'),
+        _accion_actualizar("Marcar como En Progreso", estado='En Progreso'),
+        _accion_actualizar("Marcar como Resuelto", estado='Resuelto'),
+        _accion_actualizar("Prioridad Alta", prioridad='Alta'),
+        _accion_actualizar("Prioridad Media", prioridad='Media'),
+        _accion_actualizar("Prioridad Baja", prioridad='Baja'),
+        'eliminar_seleccionados',
+    ]
+
+    def get_actions(self, request):
+        # La eliminación masiva pasa por eliminar_tickets para mantener los contadores.
+        acciones = super().get_actions(request)
+        acciones.pop('delete_selected', None)
+        return acciones
+
+    @admin.action(description="Eliminar tickets seleccionados", permissions=['delete'])
+    def eliminar_seleccionados(self, request, queryset):
+        total = eliminar_tickets(list(queryset.values_list('pk', flat=True)))
+        self.message_user(request, f"Se eliminaron {total} tickets.")
+
+
 # Registrar el modelo en el admin
-admin.site.register(CustomUser, CustomUserAdmin)
\ No newline at end of file
+admin.site.register(CustomUser, CustomUserAdmin)
+admin.site.register(Ticket, TicketAdmin)
\ No newline at end of file
@@ -0,0 +1,120 @@
+import hashlib
+from functools import wraps
+
+from django.db.models import Max
+from django.http import JsonResponse
+from django.views.decorators.http import condition, require_GET
+
+from .estadisticas import (
+    contar_tickets_por_estado,
+    obtener_agregados_dashboard,
+    version_agregados_dashboard,
+)
+from .forms import FiltroHistorialForm
+from .models import Ticket
+from .paginacion import paginar_por_cursor
+
+COLUMNAS_LISTADO = ('id', 'titulo', 'estado', 'prioridad', 'fecha_creacion', 'fecha_actualizacion')
+COLUMNAS_DETALLE = COLUMNAS_LISTADO + (
+    'descripcion', 'solucion', 'visita_terreno',
+    'usuario__username', 'usuario__nombre_empresa', 'tecnico_asignado__username',
+)
+
+
+# ---- API JSON de solo lectura ----
+# Los ETag de tickets salen de fecha_actualizacion (el detalle también envía
+# Last-Modified); el de estadísticas, de la versión de los agregados del dashboard.
+# Si el cliente ya tiene la versión vigente se responde 304 sin consultar ni
+# serializar el cuerpo.
+
+def login_requerido_api(vista):
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': 'Autenticación requerida.'}, status=401)
+        return vista(request, *args, **kwargs)
+    return envoltura
+
+
+def staff_requerido_api(vista):
+    # Los agregados cubren a todas las empresas y técnicos: igual que el dashboard, solo staff.
+    @wraps(vista)
+    def envoltura(request, *args, **kwargs):
+        if not request.user.is_staff:
+            return JsonResponse({'error': 'No tienes permiso para ver las estadísticas.'}, status=403)
+        return vista(request, *args, **kwargs)
+    return envoltura
+
+
+def _tickets_visibles(request):
+    if request.user.is_staff:
+        return Ticket.objects.all()
+    return Ticket.objects.filter(usuario=request.user)
+
+
+def marca_de_agua(request):
+    # Última actualización y total de tickets (el total detecta eliminaciones). Solo va
+    # en el ETag: un Last-Modified con MAX(fecha_actualizacion) no avanza al eliminar y
+    # se trunca a segundos, así que el listado no lo envía.
+    if not hasattr(request, '_marca_de_agua'):
+        ultima = Ticket.objects.aggregate(ultima=Max('fecha_actualizacion'))['ultima']
+        request._marca_de_agua = (ultima, contar_tickets_por_estado()['tickets_total'])
+    return request._marca_de_agua
+
+
+def _etag(*partes):
+    return hashlib.md5('|'.join(str(parte) for parte in partes).encode()).hexdigest()
+
+
+def etag_listado(request):
+    ultima, total = marca_de_agua(request)
+    return _etag('listado', ultima, total, request.user.pk, request.GET.urlencode())
+
+
+def etag_estadisticas(request):
+    # Las estadísticas cambian también sin tocar fecha_actualizacion (encuestas, SLA
+    # marcado con UPDATE, resúmenes materializados); todo eso invalida los agregados.
+    return _etag('estadisticas', version_agregados_dashboard())
+
+
+def _fecha_ticket(request, ticket_id):
+    if not hasattr(request, '_fecha_ticket'):
+        request._fecha_ticket = _tickets_visibles(request).filter(pk=ticket_id).values_list(
+            'fecha_actualizacion', flat=True).first()
+    return request._fecha_ticket
+
+
+def etag_detalle(request, ticket_id):
+    fecha = _fecha_ticket(request, ticket_id)
+    return _etag('detalle', ticket_id, fecha) if fecha else None
+
+
+@require_GET
+@login_requerido_api
+@condition(etag_func=etag_listado)
+def tickets_api(request):
+    form = FiltroHistorialForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errores': form.errors}, status=400)
+    tickets = _tickets_visibles(request).filtrar(**form.cleaned_data).values(*COLUMNAS_LISTADO)
+    pagina, siguiente = paginar_por_cursor(tickets, request.GET.get('despues'))
+    return JsonResponse({'resultados': pagina, 'siguiente': siguiente})
+
+
+@require_GET
+@login_requerido_api
+@condition(etag_func=etag_detalle, last_modified_func=_fecha_ticket)
+def ticket_detalle_api(request, ticket_id):
+    ticket = _tickets_visibles(request).filter(pk=ticket_id).values(*COLUMNAS_DETALLE).first()
+    if ticket is None:
+        return JsonResponse({'error': 'El ticket no existe.'}, status=404)
+    return JsonResponse(ticket)
+
+
+@require_GET
+@login_requerido_api
+@staff_requerido_api
+@condition(etag_func=etag_estadisticas)
+def estadisticas_api(request):
+    agregados = obtener_agregados_dashboard()
+    return JsonResponse({**contar_tickets_por_estado(), **agregados})
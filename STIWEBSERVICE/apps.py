@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class StiwebserviceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'STIWEBSERVICE'
+
+    def ready(self):
+        from . import asignacion, autenticacion, estadisticas, sla, transiciones  # noqa: F401  Registra los receptores de señales
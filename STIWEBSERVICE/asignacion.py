@@ -0,0 +1,346 @@
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .estadisticas import invalidar_agregados_dashboard
+from .models import ESTADOS_ABIERTOS, Encuesta, Ticket, TicketStats
+
+CustomUser = get_user_model()
+
+ORDEN_PRIORIDAD = {'Alta': 0, 'Media': 1, 'Baja': 2}
+
+
+# ---- Motor de Asignación de Técnicos ----
+# Dos montículos en memoria: los tickets abiertos sin técnico, por prioridad y
+# antigüedad, y los técnicos por cantidad de tickets abiertos. Elegir técnico,
+# encolar y asignar son O(log n). Las entradas que cambian no se buscan dentro
+# del montículo: se marcan como vencidas y se descartan al llegar a la cima.
+#
+# Cada proceso tiene su copia de la cola y de las cargas. La carga completa (todos
+# los tickets en espera) nunca se hace durante una solicitud: la hace el comando
+# asignar_pendientes (resincronizar), una vez o en bucle con --cada. Sin un motor
+# vigente, elegir_tecnico lee solo la carga de los técnicos y los tickets que no
+# alcanzan técnico esperan en la base hasta la próxima pasada del comando. Un
+# motor ya cargado se mantiene con las señales y reparte su cola al liberarse un
+# técnico.
+
+class MotorAsignacion:
+    def __init__(self, capacidad=None):
+        # capacidad: máximo de tickets abiertos por técnico (None = sin límite).
+        self.capacidad = capacidad
+        self._tecnicos = []
+        self._entrada_tecnico = {}
+        self._pendientes = []
+        self._entrada_ticket = {}
+        self._secuencia = itertools.count()
+
+    # -- Técnicos --
+    def fijar_carga(self, tecnico_id, carga):
+        anterior = self._entrada_tecnico.pop(tecnico_id, None)
+        if anterior:
+            anterior[-1] = False
+        entrada = [carga, next(self._secuencia), tecnico_id, True]
+        self._entrada_tecnico[tecnico_id] = entrada
+        heapq.heappush(self._tecnicos, entrada)
+
+    def ajustar_carga(self, tecnico_id, delta):
+        entrada = self._entrada_tecnico.get(tecnico_id)
+        if entrada:
+            self.fijar_carga(tecnico_id, max(entrada[0] + delta, 0))
+
+    def quitar_tecnico(self, tecnico_id):
+        entrada = self._entrada_tecnico.pop(tecnico_id, None)
+        if entrada:
+            entrada[-1] = False
+
+    def carga(self, tecnico_id):
+        entrada = self._entrada_tecnico.get(tecnico_id)
+        return entrada[0] if entrada else None
+
+    def elegir_tecnico(self):
+        # El técnico con menos tickets abiertos, si le queda capacidad.
+        while self._tecnicos and not self._tecnicos[0][-1]:
+            heapq.heappop(self._tecnicos)
+        if not self._tecnicos:
+            return None
+        carga, _, tecnico_id, _ = self._tecnicos[0]
+        if self.capacidad is not None and carga >= self.capacidad:
+            return None
+        return tecnico_id
+
+    # -- Tickets en espera --
+    def encolar(self, ticket_id, prioridad, fecha_creacion):
+        self.descartar(ticket_id)
+        entrada = [ORDEN_PRIORIDAD.get(prioridad, len(ORDEN_PRIORIDAD)), fecha_creacion.timestamp(), ticket_id, True]
+        self._entrada_ticket[ticket_id] = entrada
+        heapq.heappush(self._pendientes, entrada)
+
+    def descartar(self, ticket_id):
+        entrada = self._entrada_ticket.pop(ticket_id, None)
+        if entrada:
+            entrada[-1] = False
+
+    def en_espera(self):
+        return len(self._entrada_ticket)
+
+    def asignar_siguiente(self):
+        # Saca el ticket en espera más urgente y se lo da al técnico menos cargado.
+        while self._pendientes and not self._pendientes[0][-1]:
+            heapq.heappop(self._pendientes)
+        if not self._pendientes:
+            return None
+        tecnico_id = self.elegir_tecnico()
+        if tecnico_id is None:
+            return None
+        ticket_id = heapq.heappop(self._pendientes)[2]
+        del self._entrada_ticket[ticket_id]
+        self.ajustar_carga(tecnico_id, 1)
+        return ticket_id, tecnico_id
+
+    def drenar(self):
+        asignaciones = []
+        while (asignacion := self.asignar_siguiente()) is not None:
+            asignaciones.append(asignacion)
+        return asignaciones
+
+    @classmethod
+    def desde_datos(cls, cargas, pendientes, capacidad=None):
+        # Construye los montículos con heapify (O(n)) en vez de n inserciones.
+        motor = cls(capacidad)
+        for tecnico_id, carga in cargas:
+            entrada = [carga, next(motor._secuencia), tecnico_id, True]
+            motor._entrada_tecnico[tecnico_id] = entrada
+            motor._tecnicos.append(entrada)
+        for ticket_id, prioridad, fecha_creacion in pendientes:
+            entrada = [ORDEN_PRIORIDAD.get(prioridad, len(ORDEN_PRIORIDAD)), fecha_creacion.timestamp(), ticket_id, True]
+            motor._entrada_ticket[ticket_id] = entrada
+            motor._pendientes.append(entrada)
+        heapq.heapify(motor._tecnicos)
+        heapq.heapify(motor._pendientes)
+        return motor
+
+
+def _cargas_tecnicos():
+    abiertos = Q(tickets_asignados_tecnico__estado__in=ESTADOS_ABIERTOS)
+    return CustomUser.objects.filter(is_staff=True, is_active=True).annotate(
+        carga=Count('tickets_asignados_tecnico', filter=abiertos)).values_list('id', 'carga')
+
+
+def _capacidad():
+    return settings.ASIGNACION_CAPACIDAD or None
+
+
+def cargar_motor():
+    pendientes = Ticket.objects.abiertos().filter(tecnico_asignado__isnull=True).values_list(
+        'id', 'prioridad', 'fecha_creacion')
+    return MotorAsignacion.desde_datos(_cargas_tecnicos(), pendientes.iterator(), _capacidad())
+
+
+class _MotorCompartido:
+    # El motor del proceso, con un candado para los hilos del servidor.
+    def __init__(self):
+        self.candado = threading.RLock()
+        self._motor = None
+        self._cargado_en = 0
+
+    def vigente(self):
+        # Llamar con el candado tomado. None si hay que recargarlo.
+        if self._motor is None or time.monotonic() - self._cargado_en > settings.ASIGNACION_RESINCRONIZAR:
+            return None
+        return self._motor
+
+    def recargar(self):
+        # Llamar con el candado tomado; solo desde resincronizar, que reparte lo recargado.
+        self._motor = cargar_motor()
+        self._cargado_en = time.monotonic()
+        return self._motor
+
+    def cargado(self):
+        return self._motor
+
+    def invalidar(self):
+        with self.candado:
+            self._motor = None
+
+
+motor_asignacion = _MotorCompartido()
+
+
+def elegir_tecnico():
+    # Si otro hilo está recargando el motor no se lo espera: se usa la carga de los técnicos.
+    if motor_asignacion.candado.acquire(blocking=False):
+        try:
+            motor = motor_asignacion.vigente()
+            if motor is not None:
+                return motor.elegir_tecnico()
+        finally:
+            motor_asignacion.candado.release()
+    return MotorAsignacion.desde_datos(_cargas_tecnicos(), [], _capacidad()).elegir_tecnico()
+
+
+def asignar_pendientes():
+    # Reparte la cola del motor vigente y lo guarda. Sin motor vigente no hace nada:
+    # recargarlo le toca al comando asignar_pendientes, no a la solicitud en curso.
+    with motor_asignacion.candado:
+        motor = motor_asignacion.vigente()
+        asignaciones = motor.drenar() if motor is not None else []
+    return _guardar_asignaciones(asignaciones)
+
+
+def resincronizar():
+    # Recarga el motor desde la base y reparte todos los tickets en espera.
+    with motor_asignacion.candado:
+        asignaciones = motor_asignacion.recargar().drenar()
+    return _guardar_asignaciones(asignaciones)
+
+
+def _guardar_asignaciones(asignaciones):
+    if not asignaciones:
+        return 0
+    por_tecnico = {}
+    for ticket_id, tecnico_id in asignaciones:
+        por_tecnico.setdefault(tecnico_id, []).append(ticket_id)
+    asignados = 0
+    deltas = Counter()
+    with transaction.atomic():
+        # Un ticket reabierto puede traer su encuesta, que pasa al técnico nuevo.
+        calificaciones = dict(Encuesta.objects.filter(
+            ticket__in=Ticket.objects.abiertos().filter(
+                pk__in=[ticket_id for ticket_id, _ in asignaciones], tecnico_asignado__isnull=True),
+        ).values_list('ticket_id', 'calificacion'))
+        for tecnico_id, ids in por_tecnico.items():
+            # Otro worker pudo asignarlos o cerrarlos entretanto: solo se tocan los que siguen
+            # abiertos y sin técnico. Un UPDATE por resultado de SLA para saber qué contador mover.
+            for resultado, filtro in (('en_curso', Q(sla_incumplido_en__isnull=True)),
+                                      ('incumplido', Q(sla_incumplido_en__isnull=False))):
+                cantidad = Ticket.objects.abiertos().filter(
+                    filtro, pk__in=ids, tecnico_asignado__isnull=True,
+                ).update(tecnico_asignado=tecnico_id, fecha_actualizacion=timezone.now())
+                deltas[('tecnico', '')] -= cantidad
+                deltas[('tecnico', str(tecnico_id))] += cantidad
+                deltas[('sla_tecnico', TicketStats.clave_compuesta(resultado, ''))] -= cantidad
+                deltas[('sla_tecnico', TicketStats.clave_compuesta(resultado, tecnico_id))] += cantidad
+                asignados += cantidad
+            for ticket_id in ids:
+                if ticket_id in calificaciones:
+                    deltas[('encuesta_tecnico', TicketStats.clave_compuesta(calificaciones[ticket_id], ''))] -= 1
+                    deltas[('encuesta_tecnico', TicketStats.clave_compuesta(calificaciones[ticket_id], tecnico_id))] += 1
+        TicketStats.ajustar_varios(deltas)
+        if asignados:
+            transaction.on_commit(invalidar_agregados_dashboard)
+    if asignados != len(asignaciones):
+        motor_asignacion.invalidar()
+    return asignados
+
+
+# ---- Sincronización con los Tickets ----
+# Solo se actualiza un motor ya cargado y después del commit; si no está cargado,
+# la próxima carga lee el estado de la base. Los cambios que no pasan por las
+# señales (UPDATE en bloque) descartan el motor hasta la próxima carga.
+
+def _ocupa(tecnico_id, estado):
+    return tecnico_id is not None and estado in ESTADOS_ABIERTOS
+
+
+def _aplicar_cambio(ticket_id, prioridad, fecha_creacion, anterior, actual):
+    with motor_asignacion.candado:
+        libero = _ocupa(*anterior) and not (_ocupa(*actual) and actual[0] == anterior[0])
+        motor = motor_asignacion.cargado()
+        if motor is None:
+            return
+        if _ocupa(*anterior):
+            motor.ajustar_carga(anterior[0], -1)
+        if _ocupa(*actual):
+            motor.ajustar_carga(actual[0], 1)
+        if actual[0] is None and actual[1] in ESTADOS_ABIERTOS:
+            motor.encolar(ticket_id, prioridad, fecha_creacion)
+        else:
+            motor.descartar(ticket_id)
+    if libero and motor.en_espera():
+        asignar_pendientes()
+
+
+@receiver(pre_save, sender=Ticket)
+def recordar_asignacion_anterior(sender, instance, raw=False, **kwargs):
+    originales = getattr(instance, '_valores_originales', {})
+    if instance._state.adding:
+        instance._asignacion_anterior = (None, None)
+    elif 'tecnico_asignado_id' in originales and 'estado' in originales:
+        instance._asignacion_anterior = (originales['tecnico_asignado_id'], originales['estado'])
+    else:
+        instance._asignacion_anterior = None
+
+
+@receiver(post_save, sender=Ticket)
+def actualizar_motor_por_ticket(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    anterior = getattr(instance, '_asignacion_anterior', None)
+    if anterior is None:
+        # Ticket guardado sin sus valores originales: el motor ya no refleja la base.
+        transaction.on_commit(motor_asignacion.invalidar)
+        return
+    # También sin cambio de técnico o estado: un ticket en espera se reordena si cambió su prioridad.
+    datos = (instance.pk, instance.prioridad, instance.fecha_creacion,
+             anterior, (instance.tecnico_asignado_id, instance.estado))
+    transaction.on_commit(lambda: _aplicar_cambio(*datos))
+
+
+@receiver(post_delete, sender=Ticket)
+def quitar_ticket_del_motor(sender, instance, **kwargs):
+    datos = (instance.pk, instance.prioridad, instance.fecha_creacion,
+             (instance.tecnico_asignado_id, instance.estado), (None, None))
+    transaction.on_commit(lambda: _aplicar_cambio(*datos))
+
+
+# ---- Sincronización con los Técnicos ----
+def _atiende(tecnico_id, disponible):
+    with motor_asignacion.candado:
+        motor = motor_asignacion.cargado()
+        if motor is None:
+            return
+        if not disponible:
+            motor.quitar_tecnico(tecnico_id)
+            return
+        motor.fijar_carga(tecnico_id, Ticket.objects.abiertos().filter(tecnico_asignado_id=tecnico_id).count())
+    if motor.en_espera():
+        asignar_pendientes()
+
+
+@receiver(post_save, sender=CustomUser)
+def actualizar_motor_por_tecnico(sender, instance, created, raw=False, **kwargs):
+    # Solo cuenta que el usuario pase a atender tickets o deje de hacerlo (is_staff e
+    # is_active); los demás guardados, como last_login en cada inicio de sesión, no.
+    if raw:
+        return
+    disponible = instance.is_staff and instance.is_active
+    originales = getattr(instance, '_valores_originales', {})
+    if created:
+        antes = False
+    elif 'is_staff' in originales and 'is_active' in originales:
+        antes = originales['is_staff'] and originales['is_active']
+    else:
+        antes = None
+    if antes == disponible:
+        return
+    if antes is None:
+        transaction.on_commit(motor_asignacion.invalidar)
+    else:
+        transaction.on_commit(lambda: _atiende(instance.pk, disponible))
+
+
+@receiver(post_delete, sender=CustomUser)
+def quitar_tecnico_del_motor(sender, instance, **kwargs):
+    # Sus tickets quedan sin técnico (SET_NULL, sin señales): hay que volver a leerlos.
+    if instance.is_staff:
+        transaction.on_commit(motor_asignacion.invalidar)
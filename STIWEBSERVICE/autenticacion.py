@@ -0,0 +1,63 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+CustomUser = get_user_model()
+CLAVE_USUARIO = 'usuario:{}'
+
+
+# ---- Autenticación por Correo ----
+# Una sola consulta por intento: busca por LOWER(email), que usa el índice único
+# customuser_email_lower_unico. El backend de Django por username queda para el admin.
+
+def usuarios_por_email(email):
+    # El índice es parcial (email <> ''): la consulta tiene que implicar esa condición
+    # para que el planificador lo use. Un correo vacío nunca inicia sesión.
+    return CustomUser._default_manager.exclude(email='').alias(
+        email_normalizado=Lower('email')).filter(email_normalizado=email.lower())
+
+
+class EmailBackend(ModelBackend):
+    def authenticate(self, request, email=None, password=None, **kwargs):
+        if email is None or password is None:
+            return None
+        try:
+            usuario = usuarios_por_email(email).get()
+        except (CustomUser.DoesNotExist, CustomUser.MultipleObjectsReturned):
+            # Correos repetidos solo pueden venir de datos anteriores al índice único: se
+            # rechaza el intento en vez de elegir una cuenta. En ambos casos se hashea
+            # igual la clave para que el tiempo de respuesta no revele si el correo existe.
+            CustomUser().set_password(password)
+            return None
+        if usuario.check_password(password) and self.user_can_authenticate(usuario):
+            return usuario
+        return None
+
+    def get_user(self, user_id):
+        # Con USUARIO_CACHE_TTL el usuario de la sesión se lee de la caché en vez de
+        # consultarlo en cada solicitud autenticada.
+        if not settings.USUARIO_CACHE_TTL:
+            return super().get_user(user_id)
+        clave = CLAVE_USUARIO.format(user_id)
+        usuario = cache.get(clave)
+        if usuario is None:
+            usuario = super().get_user(user_id)
+            if usuario is None:
+                return None
+            cache.set(clave, usuario, settings.USUARIO_CACHE_TTL)
+        return usuario if self.user_can_authenticate(usuario) else None
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidar_usuario_en_cache(sender, instance, **kwargs):
+    # Cubre login (last_login), cambio de contraseña y desactivación. QuerySet.update
+    # no emite señales: esos cambios se ven al vencer USUARIO_CACHE_TTL.
+    # La clave se arma ahora: tras eliminar, Django deja el pk en None.
+    clave = CLAVE_USUARIO.format(instance.pk)
+    transaction.on_commit(lambda: cache.delete(clave))
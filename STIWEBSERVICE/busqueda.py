@@ -0,0 +1,71 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+from django.db import connections
+from django.db.models import Case, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Ticket
+
+PESOS_RANGO = [0.1, 0.2, 0.4, 1.0]  # Pesos D, C, B, A: título > descripción/solución > comentarios
+PESOS_BM25 = (10.0, 4.0, 4.0, 1.0)  # titulo, descripcion, solucion, comentarios
+
+
+# ---- Búsqueda de Tickets ----
+# El índice lo mantienen triggers de la migración 0013 (columna tsvector con GIN en
+# PostgreSQL, tabla FTS5 en SQLite). En SQLite, una migración que reconstruya la tabla
+# de tickets o de comentarios borra esos triggers y hay que volver a crearlos.
+
+def _terminos(texto):
+    return re.findall(r'\w+', texto or '')
+
+
+def _buscar_postgresql(tickets, texto, _limite):
+    # Igual que en SQLite: cada término como prefijo (término:*) y se exigen todos. El
+    # límite no se aplica aquí: el LIMIT de buscar_tickets va tras ordenar por rango y
+    # PostgreSQL lo resuelve en la misma consulta.
+    consulta = SearchQuery(
+        ' & '.join(f"'{termino}':*" for termino in _terminos(texto)), config='spanish', search_type='raw')
+    vector = RawSQL(f'"{Ticket._meta.db_table}".busqueda', [], output_field=SearchVectorField())
+    return tickets.alias(vector=vector).filter(vector=consulta).annotate(
+        rango=SearchRank(vector, consulta, weights=PESOS_RANGO, cover_density=True),
+    )
+
+
+def _buscar_sqlite(tickets, texto, limite):
+    # Cada término entre comillas (sin operadores del usuario) y como prefijo; se exigen todos.
+    consulta = ' '.join('"{}"*'.format(termino.replace('"', '""')) for termino in _terminos(texto))
+    sql = (
+        f'SELECT rowid, -bm25(ticket_busqueda, {", ".join(map(str, PESOS_BM25))}) AS rango '
+        'FROM ticket_busqueda WHERE ticket_busqueda MATCH %s'
+    )
+    parametros = [consulta]
+    if tickets.query.has_filters():
+        visibles, parametros_visibles = tickets.values('id').query.sql_with_params()
+        # Con '+' SQLite filtra las coincidencias en vez de repetir el MATCH por cada id visible.
+        sql += f' AND +rowid IN ({visibles})'
+        parametros.extend(parametros_visibles)
+    # bm25 se calcula una vez por coincidencia dentro de FTS5; es menor mientras más
+    # relevante, por eso se invierte para ordenar igual que en PostgreSQL.
+    with connections[tickets.db].cursor() as cursor:
+        cursor.execute(sql + ' ORDER BY rango DESC, rowid DESC LIMIT %s', parametros + [limite])
+        rangos = cursor.fetchall()
+    return tickets.filter(id__in=[id_ for id_, _ in rangos]).annotate(rango=Case(
+        *(When(id=id_, then=Value(rango)) for id_, rango in rangos),
+        default=Value(0.0), output_field=FloatField(),
+    ))
+
+
+BUSCADORES = {
+    'postgresql': _buscar_postgresql,
+    'sqlite': _buscar_sqlite,
+}
+
+
+def buscar_tickets(texto, tickets=None, limite=50):
+    # Los `limite` tickets más relevantes, anotados con `rango` y ordenados de mayor a menor.
+    tickets = Ticket.objects.all() if tickets is None else tickets
+    if not _terminos(texto):
+        return tickets.none()
+    buscar = BUSCADORES[connections[tickets.db].vendor]
+    return buscar(tickets, texto, limite).order_by('-rango', '-id')[:limite]
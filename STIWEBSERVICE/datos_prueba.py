@@ -0,0 +1,133 @@
+import datetime
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .estadisticas import reconstruir_estadisticas
+from .models import Comentario, CustomUser, Encuesta, Ticket, TransicionEstado
+from .sla import recalcular_vencimientos
+
+CLAVE_PREDETERMINADA = 'benchmark-1234'
+FECHAS_POR_LOTE = 20
+RECORRIDOS = {
+    'Pendiente': ['Pendiente'],
+    'En Progreso': ['Pendiente', 'En Progreso'],
+    'Resuelto': ['Pendiente', 'En Progreso', 'Resuelto'],
+}
+
+# Vocabulario para que la búsqueda de texto completo tenga términos con distinta frecuencia.
+EQUIPOS = ['Impresora', 'Notebook', 'Servidor', 'Router', 'Correo', 'VPN', 'Proyector', 'Teléfono IP',
+           'Base de datos', 'Antivirus', 'Escáner', 'Monitor']
+FALLAS = ['no enciende', 'no conecta', 'está lento', 'muestra un error', 'se reinicia solo',
+          'no sincroniza', 'sin acceso', 'pide contraseña', 'perdió la configuración', 'hace ruido']
+SOLUCIONES = ['Se reinstaló el controlador.', 'Se reemplazó el cable de red.', 'Se actualizó el firmware.',
+              'Se restableció la contraseña del usuario.', 'Se liberó espacio en disco.',
+              'Se cambió la fuente de poder.', 'Se reconfiguró el perfil de red.', 'Se limpió el cabezal.']
+
+
+# ---- Generador de Datos de Prueba ----
+def sembrar_datos(usuarios=100, empresas=10, tickets=1000, comentarios_por_ticket=2,
+                  tecnicos=5, meses=12, lote=1000, clave=CLAVE_PREDETERMINADA, semilla=None):
+    # Todo con bulk_create por lotes. La contraseña se hashea una sola vez para
+    # todos los usuarios; bulk_create no emite señales, así que los contadores
+    # de TicketStats se reconstruyen al final.
+    azar = random.Random(semilla)
+    # Único por ejecución: dos siembras en el mismo segundo no chocan en username.
+    prefijo = uuid.uuid4().hex[:12]
+    clave_hash = make_password(clave)
+    estados = [estado for estado, _ in Ticket.ESTADO_CHOICES]
+    prioridades = [prioridad for prioridad, _ in Ticket.PRIORIDAD_CHOICES]
+
+    with transaction.atomic():
+        personal = CustomUser.objects.bulk_create(
+            CustomUser(
+                username=f'tecnico-{prefijo}-{i}', email=f'tecnico-{prefijo}-{i}@sti.cl',
+                first_name='Técnico', last_name=str(i), nombre_empresa='STI',
+                is_staff=True, password=clave_hash,
+            )
+            for i in range(tecnicos)
+        )
+        clientes = CustomUser.objects.bulk_create(
+            (
+                CustomUser(
+                    username=f'usuario-{prefijo}-{i}',
+                    email=f'usuario-{prefijo}-{i}@empresa{i % empresas}.cl',
+                    first_name='Usuario', last_name=str(i),
+                    nombre_empresa=f'EMPRESA{i % empresas}', password=clave_hash,
+                )
+                for i in range(usuarios)
+            ),
+            batch_size=lote,
+        )
+
+        ahora = timezone.now()
+        creados = 0
+        for inicio in range(0, tickets, lote):
+            cantidad = min(lote, tickets - inicio)
+            nuevos = Ticket.objects.bulk_create(
+                Ticket(
+                    titulo=f'{equipo} {falla} (#{inicio + i})',
+                    descripcion=f'{equipo} {falla} desde {azar.choice(["ayer", "hoy", "la mañana"])}. '
+                                f'También {azar.choice(EQUIPOS).lower()} {azar.choice(FALLAS)}.',
+                    usuario=azar.choice(clientes),
+                    tecnico_asignado=azar.choice(personal) if personal and azar.random() < 0.8 else None,
+                    estado=estado,
+                    prioridad=azar.choice(prioridades),
+                    visita_terreno=azar.random() < 0.2,
+                    solucion=azar.choice(SOLUCIONES) if estado == 'Resuelto' else None,
+                )
+                for i, equipo, falla, estado in (
+                    (i, azar.choice(EQUIPOS), azar.choice(FALLAS), azar.choice(estados)) for i in range(cantidad)
+                )
+            )
+            # auto_now_add fija la fecha al insertar: el lote se reparte en algunas
+            # fechas del período con un UPDATE por fecha.
+            for desplazamiento in range(FECHAS_POR_LOTE):
+                fecha = ahora - datetime.timedelta(
+                    days=azar.randint(0, max(meses * 30 - 1, 0)), seconds=azar.randint(0, 86399))
+                grupo = nuevos[desplazamiento::FECHAS_POR_LOTE]
+                Ticket.objects.filter(pk__in=[t.pk for t in grupo]).update(fecha_creacion=fecha)
+                for ticket in grupo:
+                    ticket.fecha_creacion = fecha
+            recalcular_vencimientos(Ticket.objects.filter(pk__in=[t.pk for t in nuevos]))
+            # Historial de estados hasta el estado sembrado, con duraciones de ~1 día en promedio.
+            transiciones = []
+            for ticket in nuevos:
+                fecha, anterior = ticket.fecha_creacion, None
+                for estado in RECORRIDOS[ticket.estado]:
+                    segundos = None
+                    if anterior:
+                        segundos = int(min(azar.expovariate(1 / 86400), (ahora - fecha).total_seconds()))
+                        fecha += datetime.timedelta(seconds=segundos)
+                    transiciones.append(TransicionEstado(
+                        ticket=ticket, estado_anterior=anterior, estado_nuevo=estado, fecha=fecha,
+                        tecnico=ticket.tecnico_asignado, segundos_en_anterior=segundos,
+                    ))
+                    anterior = estado
+                ticket.fecha_estado = fecha
+            TransicionEstado.objects.bulk_create(transiciones)
+            Ticket.objects.bulk_update(nuevos, ['fecha_estado'])
+            Comentario.objects.bulk_create(
+                Comentario(ticket=ticket, usuario=ticket.usuario, contenido='Comentario de prueba.')
+                for ticket in nuevos
+                for _ in range(comentarios_por_ticket)
+            )
+            encuestas = Encuesta.objects.bulk_create(
+                Encuesta(ticket=ticket, calificacion=azar.randint(1, 5))
+                for ticket in nuevos
+                if ticket.estado == 'Resuelto'
+            )
+            # Igual que los tickets, la encuesta nace con la fecha de hoy: se mueve a
+            # poco después de la resolución para que los meses de satisfacción se llenen.
+            for encuesta in encuestas:
+                encuesta.fecha_creacion = min(
+                    encuesta.ticket.fecha_estado + datetime.timedelta(seconds=azar.randint(0, 2 * 86400)), ahora)
+            Encuesta.objects.bulk_update(encuestas, ['fecha_creacion'], batch_size=lote)
+            creados += cantidad
+
+        reconstruir_estadisticas()
+
+    return {'usuarios': len(clientes), 'tecnicos': len(personal), 'tickets': creados}
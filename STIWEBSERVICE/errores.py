@@ -0,0 +1,92 @@
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connections
+
+from .models import RegistroErrores
+
+logger = logging.getLogger(__name__)
+
+
+# ---- Registro de Errores en Segundo Plano ----
+class BufferErrores:
+    # Acumula errores en memoria agrupados por (tipo_error, ruta) y los guarda con
+    # bulk_create desde un hilo propio, así un 404 nunca espera un INSERT.
+    # Si se llena, se descarta el grupo más antiguo.
+    def __init__(self, capacidad, lote, intervalo):
+        self.capacidad = capacidad
+        self.lote = lote
+        self.intervalo = intervalo
+        self.descartados = 0
+        self._pendientes = OrderedDict()
+        self._candado = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = None
+
+    def registrar(self, tipo_error, ruta, descripcion=''):
+        clave = (tipo_error, ruta[:500])
+        with self._candado:
+            if clave in self._pendientes:
+                self._pendientes[clave][1] += 1
+            else:
+                if len(self._pendientes) >= self.capacidad:
+                    self._pendientes.popitem(last=False)
+                    self.descartados += 1
+                self._pendientes[clave] = [descripcion, 1]
+            lleno = len(self._pendientes) >= self.lote
+        if self.intervalo:
+            self._asegurar_hilo()
+            if lleno:
+                self._despertar.set()
+
+    def vaciar(self):
+        with self._candado:
+            pendientes, self._pendientes = self._pendientes, OrderedDict()
+        if pendientes:
+            RegistroErrores.objects.bulk_create(
+                RegistroErrores(tipo_error=tipo, ruta=ruta, descripcion=descripcion, ocurrencias=ocurrencias)
+                for (tipo, ruta), (descripcion, ocurrencias) in pendientes.items()
+            )
+        return len(pendientes)
+
+    def _asegurar_hilo(self):
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        with self._candado:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._ciclo, name='buffer-errores', daemon=True)
+                self._hilo.start()
+
+    def _ciclo(self):
+        while True:
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            try:
+                self.vaciar()
+            except Exception:
+                logger.exception("No se pudieron guardar los errores acumulados.")
+            finally:
+                # La conexión de este hilo no se reutiliza entre vaciados.
+                connections.close_all()
+
+
+buffer_errores = BufferErrores(
+    capacidad=settings.ERRORES_CAPACIDAD_BUFFER,
+    lote=settings.ERRORES_LOTE,
+    intervalo=settings.ERRORES_INTERVALO_VACIADO,
+)
+
+
+def registrar_error(tipo_error, request, descripcion=''):
+    buffer_errores.registrar(tipo_error, request.path, descripcion)
+
+
+@atexit.register
+def _vaciar_al_salir():
+    try:
+        buffer_errores.vaciar()
+    except Exception:
+        logger.exception("No se pudieron guardar los errores acumulados al salir.")
@@ -0,0 +1,411 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, Q, Subquery, Value, When
+from django.db.models.functions import TruncMonth
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    CALIFICACIONES,
+    ESTADOS_ABIERTOS,
+    RESULTADOS_SLA,
+    CustomUser,
+    Encuesta,
+    ResumenMensual,
+    Ticket,
+    TicketStats,
+    TiempoEstado,
+)
+from .transiciones import inicio_de_mes
+
+
+# ---- Contadores de Tickets ----
+def _contadores_por_estado(totales):
+    return {
+        'tickets_total': sum(totales.values()),
+        'tickets_pendientes': totales.get('Pendiente', 0),
+        'tickets_en_proceso': totales.get('En Progreso', 0),
+        'tickets_resueltos': totales.get('Resuelto', 0),
+    }
+
+
+def contar_tickets_por_estado():
+    # Lee los contadores mantenidos en TicketStats: una consulta de pocas filas,
+    # sin importar el tamaño de la tabla de tickets.
+    return _contadores_por_estado(dict(
+        TicketStats.objects.filter(dimension='estado').values_list('clave', 'total')
+    ))
+
+
+async def acontar_tickets_por_estado():
+    return _contadores_por_estado({
+        clave: total
+        async for clave, total in TicketStats.objects.filter(dimension='estado').values_list('clave', 'total')
+    })
+
+
+def agregados_dashboard():
+    filas = TicketStats.objects.filter(total__gt=0).values_list('dimension', 'clave', 'total')
+    por_dimension = {}
+    for dimension, clave, total in filas:
+        por_dimension.setdefault(dimension, {})[clave] = total
+
+    por_mes = [
+        {'mes': datetime.date(int(clave[:4]), int(clave[5:7]), 1), 'total': total}
+        for clave, total in sorted(por_dimension.get('mes', {}).items())
+    ]
+
+    # Tiempo en estado: solo el último mes materializado, unas pocas filas por índice.
+    tiempos = list(TiempoEstado.objects.filter(
+        mes=Subquery(TiempoEstado.objects.order_by('-mes').values('mes')[:1]),
+    ).values_list('mes', 'dimension', 'clave', 'estado', 'cantidad',
+                  'promedio_segundos', 'p50_segundos', 'p90_segundos'))
+
+    # Resumen mensual: los totales de los últimos 12 meses y el detalle del último mes calculado.
+    ultimo_mes = ResumenMensual.objects.filter(dimension='total').order_by('-mes').values('mes')[:1]
+    resumen = list(ResumenMensual.objects.filter(
+        Q(dimension='total', mes__gte=_meses_atras(inicio_de_mes(timezone.localdate()), 11))
+        | Q(dimension__in=('empresa', 'tecnico'), mes=Subquery(ultimo_mes))
+    ).order_by('mes'))
+
+    por_tecnico_id = por_dimension.get('tecnico', {})
+    ids_tecnicos = {clave for clave in por_tecnico_id if clave}
+    ids_tecnicos.update(clave.partition(':')[2] for clave in por_dimension.get('encuesta_tecnico', {}))
+    ids_tecnicos.discard('')
+    ids_tecnicos.update(clave for _, dimension, clave, *_ in tiempos if dimension == 'tecnico' and clave)
+    ids_tecnicos.update(fila.clave for fila in resumen if fila.dimension == 'tecnico' and fila.clave)
+    nombres = {
+        str(tecnico.pk): tecnico.get_full_name() or tecnico.username
+        for tecnico in CustomUser.objects.filter(pk__in=ids_tecnicos).only('username', 'first_name', 'last_name')
+    }
+    por_tecnico = sorted(
+        ({'tecnico': nombres.get(clave, 'Sin asignar'), 'total': total}
+         for clave, total in por_tecnico_id.items()),
+        key=lambda fila: -fila['total'],
+    )
+
+    por_empresa = sorted(
+        ({'empresa': clave or 'Sin empresa', 'total': total}
+         for clave, total in por_dimension.get('empresa', {}).items()),
+        key=lambda fila: -fila['total'],
+    )
+
+    return {
+        'tickets_por_mes': por_mes,
+        'tickets_por_tecnico': por_tecnico,
+        'tickets_por_empresa': por_empresa,
+        'cumplimiento_sla_por_tecnico': _cumplimiento_sla(
+            por_dimension.get('sla_tecnico', {}), 'tecnico', lambda clave: nombres.get(clave, 'Sin asignar')),
+        'cumplimiento_sla_por_empresa': _cumplimiento_sla(
+            por_dimension.get('sla_empresa', {}), 'empresa', lambda clave: clave or 'Sin empresa'),
+        'satisfaccion_por_tecnico': _satisfaccion(
+            por_dimension.get('encuesta_tecnico', {}), 'tecnico', lambda clave: nombres.get(clave, 'Sin asignar')),
+        'satisfaccion_por_empresa': _satisfaccion(
+            por_dimension.get('encuesta_empresa', {}), 'empresa', lambda clave: clave or 'Sin empresa'),
+        'satisfaccion_por_mes': sorted(
+            _satisfaccion(por_dimension.get('encuesta_mes', {}), 'mes',
+                          lambda clave: datetime.date(int(clave[:4]), int(clave[5:7]), 1)),
+            key=lambda fila: fila['mes'],
+        ),
+        'tiempos_en_estado_mes': tiempos[0][0] if tiempos else None,
+        'tiempos_en_estado': _tiempos_en_estado(tiempos, nombres),
+        **_resumen_mensual(resumen, nombres),
+    }
+
+
+def _meses_atras(mes, cantidad):
+    for _ in range(cantidad):
+        mes = (mes - datetime.timedelta(days=1)).replace(day=1)
+    return mes
+
+
+def _resumen_mensual(resumen, nombres):
+    def metricas(fila):
+        return {
+            'tickets': fila.tickets,
+            'resueltos': fila.resueltos,
+            'visitas_terreno': fila.visitas_terreno,
+            'encuestas': fila.encuestas,
+            'promedio_calificacion': fila.promedio_calificacion,
+        }
+
+    totales = [fila for fila in resumen if fila.dimension == 'total']
+    detalle = [fila for fila in resumen if fila.dimension != 'total']
+    etiquetas = {
+        'empresa': lambda clave: clave or 'Sin empresa',
+        'tecnico': lambda clave: nombres.get(clave, 'Sin asignar'),
+    }
+    dimensiones = dict(ResumenMensual.DIMENSION_CHOICES)
+    return {
+        'resumen_mensual': [{'mes': fila.mes, **metricas(fila)} for fila in totales],
+        'resumen_mes': detalle[0].mes if detalle else None,
+        'resumen_mes_por_grupo': sorted(
+            ({'dimension': dimensiones[fila.dimension], 'grupo': etiquetas[fila.dimension](fila.clave), **metricas(fila)}
+             for fila in detalle),
+            key=lambda fila: (fila['dimension'], -fila['tickets'], fila['grupo']),
+        ),
+    }
+
+
+def _tiempos_en_estado(tiempos, nombres):
+    etiquetas = {
+        'total': lambda _: 'Todos',
+        'tecnico': lambda clave: nombres.get(clave, 'Sin asignar'),
+        'empresa': lambda clave: clave or 'Sin empresa',
+    }
+    dimensiones = dict(TiempoEstado.DIMENSION_CHOICES)
+    orden = list(dimensiones)
+    filas = sorted(
+        (orden.index(dimension), etiquetas[dimension](clave), estado, dimension, cantidad, promedio, p50, p90)
+        for _, dimension, clave, estado, cantidad, promedio, p50, p90 in tiempos
+    )
+    return [
+        {
+            'dimension': dimensiones[dimension],
+            'grupo': grupo,
+            'estado': estado,
+            'cantidad': cantidad,
+            'promedio_horas': round(promedio / 3600, 1),
+            'p50_horas': round(p50 / 3600, 1),
+            'p90_horas': round(p90 / 3600, 1),
+        }
+        for _, grupo, estado, dimension, cantidad, promedio, p50, p90 in filas
+    ]
+
+
+def _cumplimiento_sla(totales, campo, nombre):
+    # Porcentaje sobre los tickets ya evaluados: resueltos e incumplidos (abiertos o no).
+    por_grupo = {}
+    for clave, total in totales.items():
+        resultado, _, grupo = clave.partition(':')
+        por_grupo.setdefault(grupo, dict.fromkeys(RESULTADOS_SLA, 0))[resultado] = total
+    filas = []
+    for grupo, conteo in por_grupo.items():
+        evaluados = conteo['cumplido'] + conteo['incumplido']
+        filas.append({
+            campo: nombre(grupo),
+            **conteo,
+            'porcentaje': round(100 * conteo['cumplido'] / evaluados, 1) if evaluados else None,
+        })
+    # Primero los de peor cumplimiento; sin tickets evaluados, al final.
+    return sorted(filas, key=lambda fila: (fila['porcentaje'] is None, fila['porcentaje'] or 0))
+
+
+def _satisfaccion(totales, campo, nombre):
+    # Claves 'calificacion:grupo'; el promedio sale de la distribución.
+    por_grupo = {}
+    for clave, total in totales.items():
+        calificacion, _, grupo = clave.partition(':')
+        por_grupo.setdefault(grupo, dict.fromkeys(CALIFICACIONES, 0))[int(calificacion)] = total
+    filas = []
+    for grupo, distribucion in por_grupo.items():
+        encuestas = sum(distribucion.values())
+        filas.append({
+            campo: nombre(grupo),
+            'encuestas': encuestas,
+            'promedio': round(sum(c * n for c, n in distribucion.items()) / encuestas, 2),
+            'distribucion': [distribucion[c] for c in CALIFICACIONES],
+        })
+    # Primero los peor calificados.
+    return sorted(filas, key=lambda fila: (fila['promedio'], -fila['encuestas']))
+
+
+# ---- Caché de Agregados del Dashboard ----
+CLAVE_AGREGADOS = 'dashboard:agregados'
+CLAVE_RECALCULO = 'dashboard:agregados:recalculando'
+CLAVE_VERSION = 'dashboard:agregados:version'
+
+
+def obtener_agregados_dashboard():
+    # La entrada guarda la versión de los datos con que se calculó. Si sigue vigente y
+    # dentro del TTL se sirve tal cual. Si no, solo la solicitud que toma el candado
+    # recalcula; las demás sirven la entrada vencida sin esperar o, con la caché vacía,
+    # calculan sin guardar.
+    version = version_agregados_dashboard()
+    entrada = cache.get(CLAVE_AGREGADOS)
+    if entrada is not None and entrada[2] == version and time.time() < entrada[1]:
+        return entrada[0]
+    if not cache.add(CLAVE_RECALCULO, True, timeout=30):
+        return agregados_dashboard() if entrada is None else entrada[0]
+    try:
+        return _guardar_agregados_dashboard(version)
+    finally:
+        cache.delete(CLAVE_RECALCULO)
+
+
+def _guardar_agregados_dashboard(version):
+    # Se guarda con la versión leída antes de calcular: si un cambio la sube mientras
+    # tanto, la entrada nace vencida y la próxima solicitud recalcula.
+    agregados = agregados_dashboard()
+    cache.set(
+        CLAVE_AGREGADOS,
+        (agregados, time.time() + settings.DASHBOARD_CACHE_TTL, version),
+        timeout=settings.DASHBOARD_CACHE_TTL + settings.DASHBOARD_CACHE_STALE,
+    )
+    return agregados
+
+
+def version_agregados_dashboard():
+    # Cambia con cada invalidación; si la caché la pierde se crea otra, lo que solo
+    # cuesta una respuesta completa a los clientes que tenían la anterior.
+    version = cache.get(CLAVE_VERSION)
+    if version is None:
+        cache.add(CLAVE_VERSION, time.time_ns(), timeout=None)
+        version = cache.get(CLAVE_VERSION)
+    return version
+
+
+def invalidar_agregados_dashboard():
+    # La entrada queda vencida pero se conserva: se sirve mientras alguien recalcula.
+    cache.set(CLAVE_VERSION, time.time_ns(), timeout=None)
+
+
+@receiver(post_save, sender=Ticket)
+@receiver(post_delete, sender=Ticket)
+@receiver(post_save, sender=Encuesta)
+@receiver(post_delete, sender=Encuesta)
+def invalidar_agregados_por_ticket(sender, **kwargs):
+    # Tras el commit, para no volver a guardar datos de una transacción sin confirmar.
+    transaction.on_commit(invalidar_agregados_dashboard)
+
+
+# ---- Reconstrucción ----
+# Equivalente en SQL de models.resultado_sla.
+RESULTADO_SLA = Case(
+    When(sla_incumplido_en__isnull=False, then=Value('incumplido')),
+    When(estado__in=ESTADOS_ABIERTOS, then=Value('en_curso')),
+    default=Value('cumplido'),
+)
+
+def calcular_estadisticas(tickets=None, dimensiones=None):
+    # Cuenta los tickets por clave de cada dimensión (una consulta por dimensión).
+    # Sin argumentos recalcula todos los contadores desde la tabla de tickets.
+    tickets = Ticket.objects.all() if tickets is None else tickets
+    calculados = {}
+    con_resultado = tickets.annotate(resultado=RESULTADO_SLA)
+    calificados = tickets.filter(encuesta__isnull=False)
+    agrupaciones = {
+        'estado': tickets.values_list('estado'),
+        'prioridad': tickets.values_list('prioridad'),
+        'mes': tickets.annotate(mes=TruncMonth('fecha_creacion')).values_list('mes'),
+        'tecnico': tickets.values_list('tecnico_asignado_id'),
+        'empresa': tickets.values_list('usuario__nombre_empresa'),
+        'sla_tecnico': con_resultado.values_list('resultado', 'tecnico_asignado_id'),
+        'sla_empresa': con_resultado.values_list('resultado', 'usuario__nombre_empresa'),
+        'encuesta_tecnico': calificados.values_list('encuesta__calificacion', 'tecnico_asignado_id'),
+        'encuesta_empresa': calificados.values_list('encuesta__calificacion', 'usuario__nombre_empresa'),
+        'encuesta_mes': calificados.annotate(
+            mes=TruncMonth('encuesta__fecha_creacion')).values_list('encuesta__calificacion', 'mes'),
+    }
+    if dimensiones is not None:
+        agrupaciones = {dimension: agrupaciones[dimension] for dimension in dimensiones}
+    for dimension, consulta in agrupaciones.items():
+        for *valores, total in consulta.annotate(total=Count('id')).order_by():
+            claves = []
+            for valor in valores:
+                if valor is None:
+                    claves.append('')
+                elif isinstance(valor, datetime.datetime):
+                    claves.append(valor.strftime('%Y-%m'))
+                else:
+                    claves.append(str(valor))
+            clave = TicketStats.clave_compuesta(*claves) if len(claves) > 1 else claves[0]
+            calculados[(dimension, clave)] = calculados.get((dimension, clave), 0) + total
+    return calculados
+
+
+def diferencias_estadisticas(calculados):
+    actuales = {
+        (dimension, clave): total
+        for dimension, clave, total in TicketStats.objects.values_list('dimension', 'clave', 'total')
+    }
+    return {
+        llave: (actuales.get(llave, 0), calculados.get(llave, 0))
+        for llave in actuales.keys() | calculados.keys()
+        if actuales.get(llave, 0) != calculados.get(llave, 0)
+    }
+
+
+def reconstruir_estadisticas():
+    # Reemplaza los contadores por los calculados y devuelve las diferencias encontradas.
+    with transaction.atomic():
+        calculados = calcular_estadisticas()
+        diferencias = diferencias_estadisticas(calculados)
+        TicketStats.objects.all().delete()
+        TicketStats.objects.bulk_create(
+            TicketStats(dimension=dimension, clave=clave, total=total)
+            for (dimension, clave), total in calculados.items()
+        )
+        transaction.on_commit(invalidar_agregados_dashboard)
+    return diferencias
+
+
+def contar_tickets_con_agregado():
+    # Agregado de una sola pasada sobre la tabla; sirve para verificar los contadores.
+    return Ticket.objects.aggregate(
+        tickets_total=Count('id'),
+        tickets_pendientes=Count('id', filter=Q(estado='Pendiente')),
+        tickets_en_proceso=Count('id', filter=Q(estado='En Progreso')),
+        tickets_resueltos=Count('id', filter=Q(estado='Resuelto')),
+    )
+
+
+# ---- Cambios de Usuarios ----
+# Los contadores por empresa y por técnico guardan el nombre de la empresa y el id del
+# técnico. Si la empresa de un usuario cambia, o se elimina un técnico (sus tickets
+# quedan sin asignar con SET_NULL, sin save()), sus totales pasan a la clave nueva.
+DIMENSIONES_EMPRESA = ('empresa', 'sla_empresa', 'encuesta_empresa')
+DIMENSIONES_TECNICO = ('tecnico', 'sla_tecnico', 'encuesta_tecnico')
+
+
+def _mover_a_grupo(totales, grupo):
+    # {(dimension, clave): total} -> deltas que llevan esos totales al grupo `grupo`.
+    deltas = {}
+    for (dimension, clave), total in totales.items():
+        if dimension in ('empresa', 'tecnico'):
+            nueva = grupo
+        else:
+            nueva = TicketStats.clave_compuesta(clave.partition(':')[0], grupo)
+        if nueva != clave:
+            deltas[(dimension, clave)] = deltas.get((dimension, clave), 0) - total
+            deltas[(dimension, nueva)] = deltas.get((dimension, nueva), 0) + total
+    return deltas
+
+
+@receiver(pre_save, sender=CustomUser)
+def recordar_empresa_anterior(sender, instance, raw, update_fields=None, **kwargs):
+    if raw or instance._state.adding or 'nombre_empresa' not in instance.__dict__:
+        return
+    if update_fields is not None and 'nombre_empresa' not in update_fields:
+        return
+    originales = getattr(instance, '_valores_originales', {})
+    if 'nombre_empresa' in originales:
+        anterior = originales['nombre_empresa']
+    else:
+        anterior = CustomUser.objects.filter(pk=instance.pk).values_list('nombre_empresa', flat=True).first()
+    if (anterior or '') != (instance.nombre_empresa or ''):
+        instance._totales_empresa_anterior = calcular_estadisticas(
+            Ticket.objects.filter(usuario=instance), DIMENSIONES_EMPRESA)
+
+
+@receiver(post_save, sender=CustomUser)
+def mover_estadisticas_de_empresa(sender, instance, **kwargs):
+    totales = instance.__dict__.pop('_totales_empresa_anterior', None)
+    if totales:
+        TicketStats.ajustar_varios(_mover_a_grupo(totales, instance.nombre_empresa or ''))
+        transaction.on_commit(invalidar_agregados_dashboard)
+
+
+@receiver(pre_delete, sender=CustomUser)
+def liberar_estadisticas_de_tecnico(sender, instance, **kwargs):
+    # Los tickets del propio usuario se eliminan en cascada y los resta post_delete.
+    totales = calcular_estadisticas(
+        Ticket.objects.filter(tecnico_asignado=instance).exclude(usuario=instance), DIMENSIONES_TECNICO)
+    if totales:
+        TicketStats.ajustar_varios(_mover_a_grupo(totales, ''))
+        transaction.on_commit(invalidar_agregados_dashboard)
@@ -0,0 +1,76 @@
+import csv
+import itertools
+import json
+
+from asgiref.sync import sync_to_async
+
+from .models import Ticket
+
+COLUMNAS_EXPORTACION = {
+    'id': 'id',
+    'titulo': 'titulo',
+    'estado': 'estado',
+    'prioridad': 'prioridad',
+    'fecha_creacion': 'fecha_creacion',
+    'fecha_actualizacion': 'fecha_actualizacion',
+    'visita_terreno': 'visita_terreno',
+    'solicitante': 'usuario__username',
+    'email_solicitante': 'usuario__email',
+    'empresa': 'usuario__nombre_empresa',
+    'tecnico': 'tecnico_asignado__username',
+    'calificacion': 'encuesta__calificacion',
+}
+INICIOS_DE_FORMULA = ('=', '+', '-', '@', '\t', '\r')
+LINEAS_POR_BLOQUE = 500  # Por cada envío de la exportación bajo ASGI
+
+
+# ---- Exportación de Tickets ----
+# Las filas se leen con iterator(chunk_size=...): en PostgreSQL usa un cursor del
+# lado del servidor, así la memoria no crece con la cantidad de tickets.
+
+class _Eco:
+    # "Archivo" para csv.writer que devuelve la línea en vez de guardarla.
+    def write(self, valor):
+        return valor
+
+
+def tickets_para_exportar(filtros=None, chunk_size=2000):
+    tickets = Ticket.objects.filtrar(**(filtros or {})).order_by('id')
+    for fila in tickets.values_list(*COLUMNAS_EXPORTACION.values()).iterator(chunk_size=chunk_size):
+        yield dict(zip(COLUMNAS_EXPORTACION, fila, strict=True))
+
+
+def _celda_csv(valor):
+    if hasattr(valor, 'isoformat'):
+        return valor.isoformat()
+    # Texto del usuario (título, nombres, empresa) que Excel interpretaría como fórmula.
+    if isinstance(valor, str) and valor.startswith(INICIOS_DE_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def lineas_csv(filas):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(list(COLUMNAS_EXPORTACION))
+    for fila in filas:
+        yield escritor.writerow([_celda_csv(valor) for valor in fila.values()])
+
+
+def lineas_jsonl(filas):
+    for fila in filas:
+        yield json.dumps(fila, default=lambda valor: valor.isoformat(), ensure_ascii=False) + '\n'
+
+
+async def lineas_async(lineas):
+    # Bajo ASGI, StreamingHttpResponse lee entero un iterador síncrono antes de enviarlo.
+    # Este generador asíncrono lee cada bloque en el hilo de la petición (el del cursor)
+    # y lo envía antes de leer el siguiente.
+    leer_bloque = sync_to_async(lambda: ''.join(itertools.islice(lineas, LINEAS_POR_BLOQUE)))
+    while bloque := await leer_bloque():
+        yield bloque
+
+
+FORMATOS_EXPORTACION = {
+    'csv': (lineas_csv, 'text/csv; charset=utf-8'),
+    'jsonl': (lineas_jsonl, 'application/x-ndjson; charset=utf-8'),
+}
@@ -2,6 +2,8 @@ from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 
+from .models import Ticket, empresa_desde_email
+
 CustomUser = get_user_model()  # Obtiene el modelo de usuario personalizado
 
 
@@ -30,6 +32,9 @@ class RegistroUsuarioForm(forms.ModelForm):
         confirm_password = cleaned_data.get("confirm_password")
         if password != confirm_password:
             raise forms.ValidationError("Las contraseñas no coinciden.")
+        # La empresa se deriva del correo antes de validar el modelo, que la exige.
+        if not cleaned_data.get('nombre_empresa'):
+            cleaned_data['nombre_empresa'] = empresa_desde_email(cleaned_data.get('email'))
         return cleaned_data
 
 
@@ -44,3 +49,63 @@ class LoginForm(forms.Form):
             'class': 'form-control',
             'placeholder': 'Ingresa tu contraseña'
         }))
+
+
+class FiltroHistorialForm(forms.Form):
+    estado = forms.ChoiceField(
+        required=False,
+        choices=[('', 'Todos')] + Ticket.ESTADO_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'}))
+    prioridad = forms.ChoiceField(
+        required=False,
+        choices=[('', 'Todas')] + Ticket.PRIORIDAD_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'}))
+    desde = forms.DateField(
+        required=False, widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+    hasta = forms.DateField(
+        required=False, widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}))
+
+
+class BusquedaTicketsForm(forms.Form):
+    q = forms.CharField(
+        max_length=200,
+        widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Buscar en tickets y soluciones'}))
+
+
+class AccionMasivaForm(forms.Form):
+    ACCION_CHOICES = [
+        ('estado', 'Cambiar estado'),
+        ('prioridad', 'Cambiar prioridad'),
+        ('tecnico', 'Reasignar técnico'),
+        ('eliminar', 'Eliminar'),
+    ]
+
+    accion = forms.ChoiceField(choices=ACCION_CHOICES, widget=forms.Select(attrs={'class': 'form-select'}))
+    estado = forms.ChoiceField(
+        required=False, choices=[('', '---')] + Ticket.ESTADO_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'}))
+    prioridad = forms.ChoiceField(
+        required=False, choices=[('', '---')] + Ticket.PRIORIDAD_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-select'}))
+    tecnico = forms.ModelChoiceField(
+        required=False, queryset=CustomUser.objects.filter(is_staff=True),
+        widget=forms.Select(attrs={'class': 'form-select'}))
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # Los ids llegan como una lista de casillas "tickets"; no se consultan al validar.
+        ids = [int(valor) for valor in self.data.getlist('tickets') if valor.isdigit()]
+        if not ids:
+            raise forms.ValidationError("Selecciona al menos un ticket.")
+        cleaned_data['tickets'] = ids
+        accion = cleaned_data.get('accion')
+        if accion in ('estado', 'prioridad', 'tecnico') and not cleaned_data.get(accion):
+            raise forms.ValidationError("Indica el nuevo valor para la acción seleccionada.")
+        return cleaned_data
+
+
+class FiltroExportacionForm(FiltroHistorialForm):
+    empresa = forms.CharField(required=False, widget=forms.TextInput(attrs={'class': 'form-control'}))
+    formato = forms.ChoiceField(
+        required=False, choices=[('csv', 'CSV'), ('jsonl', 'JSON Lines')],
+        widget=forms.Select(attrs={'class': 'form-select'}))
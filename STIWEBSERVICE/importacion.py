@@ -0,0 +1,108 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .models import CustomUser, asignar_empresas
+
+COLUMNAS_IMPORTACION = ('username', 'email', 'first_name', 'last_name', 'password', 'nombre_empresa', 'cargo')
+
+
+# ---- Importación de Usuarios ----
+# El costo de importar está casi todo en el hash de contraseñas (PBKDF2), que es
+# CPU pura: se reparte entre procesos para usar todos los núcleos. Las filas
+# se insertan con bulk_create por lotes mientras los procesos hashean.
+
+def leer_usuarios_csv(archivo):
+    for fila in csv.DictReader(archivo):
+        datos = {columna: (fila.get(columna) or '').strip() for columna in COLUMNAS_IMPORTACION}
+        datos['username'] = datos['username'] or datos['email']
+        if datos['username']:
+            yield datos
+
+
+def _preparar_proceso(modulo_settings):
+    # Con fork el proceso hereda Django ya configurado; con spawn hay que iniciarlo.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', modulo_settings)
+    if not apps.ready:
+        django.setup()
+
+
+def _hashear(clave):
+    return make_password(clave or None)
+
+
+def _lotes(filas, tamano):
+    lote = []
+    for fila in filas:
+        lote.append(fila)
+        if len(lote) == tamano:
+            yield lote
+            lote = []
+    if lote:
+        yield lote
+
+
+def _filtrar_nuevos(lote, usernames, correos):
+    # Se descartan antes de hashear los usernames y correos (sin distinguir mayúsculas,
+    # como el índice customuser_email_lower_unico) que ya existen o se repiten en el archivo.
+    usernames.update(CustomUser.objects.filter(
+        username__in=[fila['username'] for fila in lote]).values_list('username', flat=True))
+    correos.update(CustomUser.objects.exclude(email='').annotate(email_normalizado=Lower('email')).filter(
+        email_normalizado__in=[fila['email'].lower() for fila in lote if fila['email']],
+    ).values_list('email_normalizado', flat=True))
+    nuevos = []
+    for fila in lote:
+        correo = fila['email'].lower()
+        if fila['username'] not in usernames and not (correo and correo in correos):
+            usernames.add(fila['username'])
+            if correo:
+                correos.add(correo)
+            nuevos.append(fila)
+    return nuevos
+
+
+def _insertar(lote, claves):
+    usuarios = [
+        CustomUser(**{campo: fila[campo] for campo in COLUMNAS_IMPORTACION if campo != 'password'}, password=clave)
+        for fila, clave in zip(lote, claves, strict=True)
+    ]
+    with transaction.atomic():
+        CustomUser.objects.bulk_create(asignar_empresas(usuarios))
+    return len(usuarios)
+
+
+def importar_usuarios(filas, procesos=None, lote=1000):
+    # procesos=1 hashea en el proceso actual (sin pool), útil como referencia.
+    procesos = procesos or os.cpu_count() or 1
+    resultado = {'leidos': 0, 'creados': 0, 'omitidos': 0, 'procesos': procesos}
+
+    def procesar(hashear):
+        pendiente, usernames, correos = None, set(), set()
+        for leido in _lotes(filas, lote):
+            resultado['leidos'] += len(leido)
+            actual = _filtrar_nuevos(leido, usernames, correos)
+            # Se encola el hash del lote actual antes de insertar el anterior.
+            claves = hashear([fila['password'] for fila in actual])
+            if pendiente:
+                resultado['creados'] += _insertar(*pendiente)
+            pendiente = (actual, claves)
+        if pendiente:
+            resultado['creados'] += _insertar(*pendiente)
+
+    if procesos == 1:
+        procesar(lambda claves: [_hashear(clave) for clave in claves])
+    else:
+        with ProcessPoolExecutor(
+            procesos, initializer=_preparar_proceso,
+            initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'django_project.settings'),),
+        ) as ejecutor:
+            procesar(lambda claves: ejecutor.map(_hashear, claves, chunksize=max(1, len(claves) // (procesos * 4))))
+
+    resultado['omitidos'] = resultado['leidos'] - resultado['creados']
+    return resultado
@@ -0,0 +1,78 @@
+import hashlib
+import math
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.shortcuts import render
+
+# ---- Límite de Intentos (token bucket) ----
+# Cada clave (vista + IP o vista + correo) tiene una cubeta de `capacidad` fichas
+# que se recarga completa en `periodo` segundos. Cada POST gasta una ficha; sin
+# fichas se responde 429 antes de validar el formulario o hashear la contraseña.
+# El estado vive en la caché de Django (locmem, archivo o base de datos). La
+# lectura y escritura no son atómicas: bajo concurrencia se puede colar algún
+# intento de más, a cambio de no bloquear.
+
+reloj = time.time
+
+
+def _clave(vista, dimension, valor):
+    resumen = hashlib.sha256(valor.encode()).hexdigest()[:32]
+    return f'limite:{vista}:{dimension}:{resumen}'
+
+
+def consumir_ficha(clave, capacidad, periodo, ahora=None):
+    # Devuelve 0 si se concedió el intento, o los segundos que faltan para la próxima ficha.
+    ahora = reloj() if ahora is None else ahora
+    recarga = capacidad / periodo
+    fichas, ultima = cache.get(clave, (capacidad, ahora))
+    fichas = min(capacidad, fichas + (ahora - ultima) * recarga)
+    if fichas < 1:
+        return math.ceil((1 - fichas) / recarga)
+    cache.set(clave, (fichas - 1, ahora), timeout=math.ceil(periodo))
+    return 0
+
+
+def ip_cliente(request, proxies):
+    # Con `proxies` saltos confiables, el cliente es la entrada que agregó el más lejano
+    # de ellos en X-Forwarded-For; las anteriores las escribe el cliente y no valen.
+    if not proxies:
+        return request.META.get('REMOTE_ADDR', '')
+    saltos = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    if len(saltos) < proxies:
+        return None
+    return saltos[-proxies]
+
+
+def _valores(request, campo_email):
+    # Sin LIMITES_PROXIES_CONFIABLES no se sabe qué IP es la del cliente: detrás de un
+    # proxy, REMOTE_ADDR sería la misma para todos. En ese caso no se limita por IP.
+    proxies = settings.LIMITES_PROXIES_CONFIABLES
+    ip = ip_cliente(request, proxies) if proxies is not None else None
+    if ip:
+        yield 'ip', ip
+    email = request.POST.get(campo_email, '').strip().lower()
+    if email:
+        yield 'email', email
+
+
+def limitar_intentos(vista, campo_email='email'):
+    # Límites por vista en settings.LIMITES_INTENTOS[vista] = {'ip': (capacidad, periodo), 'email': ...}.
+    def decorador(funcion):
+        @wraps(funcion)
+        def envoltura(request, *args, **kwargs):
+            limites = settings.LIMITES_INTENTOS.get(vista, {}) if settings.LIMITES_ACTIVOS else {}
+            if request.method == 'POST' and limites:
+                for dimension, valor in _valores(request, campo_email):
+                    if dimension not in limites:
+                        continue
+                    espera = consumir_ficha(_clave(vista, dimension, valor), *limites[dimension])
+                    if espera:
+                        respuesta = render(request, '429.html', {'reintentar_en': espera}, status=429)
+                        respuesta['Retry-After'] = str(espera)
+                        return respuesta
+            return funcion(request, *args, **kwargs)
+        return envoltura
+    return decorador
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from STIWEBSERVICE.estadisticas import invalidar_agregados_dashboard
+from STIWEBSERVICE.resumen_mensual import actualizar_resumen_mensual
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula el resumen mensual del mes en curso (tickets, resoluciones, visitas en "
+        "terreno y calificación promedio por empresa y técnico). Los meses terminados se "
+        "calculan una última vez y quedan cerrados; la primera ejecución cierra toda la historia."
+    )
+
+    def handle(self, *args, **options):
+        calculados = actualizar_resumen_mensual()
+        for mes, filas in calculados.items():
+            self.stdout.write(f"{mes:%Y-%m}: {filas} filas")
+        invalidar_agregados_dashboard()
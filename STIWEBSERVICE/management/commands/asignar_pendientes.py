@@ -0,0 +1,39 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from STIWEBSERVICE.asignacion import resincronizar
+
+
+class Command(BaseCommand):
+    help = (
+        "Recarga el motor de asignación desde la base y reparte los tickets en espera entre "
+        "los técnicos con capacidad. Las solicitudes nunca cargan el motor: este comando es el "
+        "que reparte la cola, una vez (cron) o en bucle como worker con --cada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cada', type=float, help="Segundos entre repartos; sin él reparte una vez y termina.")
+        parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto, salida estándar).")
+
+    def handle(self, *args, **options):
+        if options['cada']:
+            # Una línea JSON por pasada.
+            while True:
+                close_old_connections()
+                self.stdout.write(json.dumps(self.repartir(), ensure_ascii=False))
+                time.sleep(options['cada'])
+
+        texto = json.dumps(self.repartir(), indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + '\n')
+        else:
+            self.stdout.write(texto)
+
+    def repartir(self):
+        ahora = timezone.now()
+        return {'asignado_en': ahora.isoformat(), 'asignados': resincronizar()}
@@ -0,0 +1,86 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+
+from STIWEBSERVICE.models import CustomUser, Ticket
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el rendimiento (solicitudes por segundo) de home, dashboard y detalle de "
+        "ticket entre las vistas síncronas (WSGI, un hilo por solicitud concurrente) y las "
+        "asíncronas (ASGI, un solo event loop). Sembrar antes con poblar_datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solicitudes', type=int, default=200)
+        parser.add_argument('--concurrencia', type=int, default=8)
+        parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto, salida estándar).")
+
+    def handle(self, *args, **options):
+        self.tecnico = CustomUser.objects.filter(is_staff=True).order_by('pk').first()
+        ticket = Ticket.objects.order_by('-pk').first()
+        if not (self.tecnico and ticket):
+            raise CommandError("No hay datos suficientes: ejecuta primero poblar_datos.")
+
+        rutas = {
+            'home': reverse('home'),
+            'dashboard': reverse('dashboard'),
+            'detalleticket': reverse('detalleticket', args=[ticket.pk]),
+        }
+        resultados = {}
+        with override_settings(ALLOWED_HOSTS=['testserver'], SECURE_SSL_REDIRECT=False):
+            for nombre, url in rutas.items():
+                with override_settings(ROOT_URLCONF='django_project.urls'):
+                    wsgi = self.medir_wsgi(url, options['solicitudes'], options['concurrencia'])
+                with override_settings(ROOT_URLCONF='django_project.urls_asgi'):
+                    asgi = asyncio.run(self.medir_asgi(url, options['solicitudes'], options['concurrencia']))
+                resultados[nombre] = {'wsgi_rps': wsgi, 'asgi_rps': asgi}
+                self.stderr.write(f"{nombre}: WSGI {wsgi} sol/s, ASGI {asgi} sol/s")
+
+        texto = json.dumps({
+            'motor': connections['default'].vendor,
+            'solicitudes': options['solicitudes'],
+            'concurrencia': options['concurrencia'],
+            'vistas': resultados,
+        }, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + '\n')
+        else:
+            self.stdout.write(texto)
+
+    def medir_wsgi(self, url, solicitudes, concurrencia):
+        def trabajador(cantidad):
+            cliente = Client()
+            cliente.force_login(self.tecnico)
+            try:
+                for _ in range(cantidad):
+                    cliente.get(url)
+            finally:
+                connections.close_all()
+
+        repartidas = [solicitudes // concurrencia] * concurrencia
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(concurrencia) as ejecutor:
+            list(ejecutor.map(trabajador, repartidas))
+        return round(sum(repartidas) / (time.perf_counter() - inicio), 1)
+
+    async def medir_asgi(self, url, solicitudes, concurrencia):
+        cliente = AsyncClient()
+        await cliente.aforce_login(self.tecnico)
+        limite = asyncio.Semaphore(concurrencia)
+
+        async def solicitar():
+            async with limite:
+                await cliente.get(url)
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(solicitar() for _ in range(solicitudes)))
+        return round(solicitudes / (time.perf_counter() - inicio), 1)
@@ -0,0 +1,96 @@
+import heapq
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from STIWEBSERVICE.asignacion import MotorAsignacion
+
+PRIORIDADES = ['Alta', 'Media', 'Baja']
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el motor de asignación en memoria, sin base de datos: carga inicial de un "
+        "backlog sintético, drenado completo, y el flujo en línea (elegir técnico por cada "
+        "ticket nuevo, liberar y reasignar). Compara con elegir técnico recorriendo la lista "
+        "completa, que es lo que haría una consulta por ticket sin el montículo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=100_000)
+        parser.add_argument('--tecnicos', type=int, default=50)
+        parser.add_argument('--capacidad', type=int, default=0, help="0 = sin límite.")
+        parser.add_argument('--semilla', type=int, default=1)
+        parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto, salida estándar).")
+
+    def handle(self, *args, **options):
+        azar = random.Random(options['semilla'])
+        ahora = timezone.now()
+        n, tecnicos = options['tickets'], options['tecnicos']
+        capacidad = options['capacidad'] or None
+        pendientes = [
+            (i, azar.choice(PRIORIDADES), ahora - timedelta(minutes=azar.randrange(60 * 24 * 90)))
+            for i in range(1, n + 1)
+        ]
+        cargas = [(t, 0) for t in range(1, tecnicos + 1)]
+        resultados = {}
+
+        inicio = time.perf_counter()
+        motor = MotorAsignacion.desde_datos(cargas, pendientes, capacidad)
+        resultados['carga_inicial_s'] = round(time.perf_counter() - inicio, 3)
+
+        inicio = time.perf_counter()
+        asignados = len(motor.drenar())
+        resultados['drenado'] = self.ritmo(asignados, time.perf_counter() - inicio)
+
+        # En línea: cada ticket nuevo elige técnico; cada tanto uno se resuelve y libera carga.
+        motor = MotorAsignacion.desde_datos(cargas, [], capacidad)
+        inicio = time.perf_counter()
+        for ticket_id, prioridad, fecha in pendientes:
+            tecnico_id = motor.elegir_tecnico()
+            if tecnico_id is None:
+                motor.encolar(ticket_id, prioridad, fecha)
+            else:
+                motor.ajustar_carga(tecnico_id, 1)
+            if ticket_id % 3 == 0:
+                motor.ajustar_carga(azar.randrange(1, tecnicos + 1), -1)
+                motor.asignar_siguiente()
+        resultados['en_linea'] = self.ritmo(n, time.perf_counter() - inicio)
+        resultados['en_linea']['en_espera'] = motor.en_espera()
+
+        # Referencia: mínimo lineal sobre los técnicos y cola ordenada con heapq sin invalidación.
+        carga = dict(cargas)
+        cola = [(PRIORIDADES.index(p), f.timestamp(), i) for i, p, f in pendientes]
+        inicio = time.perf_counter()
+        heapq.heapify(cola)
+        while cola:
+            heapq.heappop(cola)
+            tecnico_id = min(carga, key=carga.get)
+            carga[tecnico_id] += 1
+        resultados['referencia_lineal'] = self.ritmo(n, time.perf_counter() - inicio)
+
+        for modo in ('drenado', 'en_linea', 'referencia_lineal'):
+            self.stderr.write(f"{modo}: {resultados[modo]['por_segundo']} asignaciones/s")
+
+        texto = json.dumps({
+            'tickets': n,
+            'tecnicos': tecnicos,
+            'capacidad': capacidad,
+            'resultados': resultados,
+        }, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + '\n')
+        else:
+            self.stdout.write(texto)
+
+    def ritmo(self, cantidad, segundos):
+        return {
+            'cantidad': cantidad,
+            'segundos': round(segundos, 3),
+            'por_segundo': round(cantidad / segundos) if segundos else None,
+        }
@@ -0,0 +1,68 @@
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from STIWEBSERVICE.busqueda import buscar_tickets
+from STIWEBSERVICE.models import CustomUser, Ticket
+
+TERMINOS_PREDETERMINADOS = [
+    'impresora', 'servidor no conecta', 'firmware', 'contraseña', 'cabezal impresora',
+    'router lento', 'vpn', 'fuente de poder',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia de la búsqueda de texto completo (p50/p95 por término) sobre la base "
+        "configurada, para todos los tickets (personal técnico) y para los de un cliente. "
+        "Sembrar antes con poblar_datos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('terminos', nargs='*', default=TERMINOS_PREDETERMINADOS)
+        parser.add_argument('--repeticiones', type=int, default=20)
+        parser.add_argument('--limite', type=int, default=50)
+        parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto, salida estándar).")
+
+    def handle(self, *args, **options):
+        cliente = CustomUser.objects.filter(is_staff=False, tickets__isnull=False).order_by('pk').first()
+        if cliente is None:
+            raise CommandError("No hay datos suficientes: ejecuta primero poblar_datos.")
+
+        alcances = {
+            'todos': Ticket.objects.all(),
+            'cliente': Ticket.objects.filter(usuario=cliente),
+        }
+        resultados = {}
+        for termino in options['terminos']:
+            resultados[termino] = {}
+            for alcance, tickets in alcances.items():
+                tiempos = []
+                for _ in range(options['repeticiones']):
+                    inicio = time.perf_counter()
+                    encontrados = len(list(buscar_tickets(termino, tickets, options['limite']).values_list('id')))
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                resultados[termino][alcance] = {
+                    'resultados': encontrados,
+                    'p50_ms': round(statistics.median(tiempos), 2),
+                    'p95_ms': round(statistics.quantiles(tiempos, n=20)[-1], 2) if len(tiempos) > 1 else round(tiempos[0], 2),
+                }
+            self.stderr.write(
+                f"{termino}: todos p50 {resultados[termino]['todos']['p50_ms']} ms, "
+                f"cliente p50 {resultados[termino]['cliente']['p50_ms']} ms"
+            )
+
+        texto = json.dumps({
+            'motor': connection.vendor,
+            'tickets': Ticket.objects.count(),
+            'limite': options['limite'],
+            'terminos': resultados,
+        }, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + '\n')
+        else:
+            self.stdout.write(texto)
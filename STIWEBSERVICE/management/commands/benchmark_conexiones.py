@@ -0,0 +1,96 @@
+import copy
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.utils import load_backend
+
+MODOS = ('sin_persistencia', 'persistente', 'pool')
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia por solicitud de abrir la conexión a PostgreSQL en tres modos: "
+        "una conexión nueva por solicitud, conexiones persistentes (CONN_MAX_AGE) y el pool "
+        "de psycopg 3. Cada solicitud simulada abre o reutiliza la conexión, ejecuta SELECT 1 "
+        "y la libera como lo hace Django al terminar la respuesta."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--solicitudes', type=int, default=200)
+        parser.add_argument('--concurrencia', type=int, default=4)
+        parser.add_argument('--conn-max-age', type=int, default=60)
+        parser.add_argument('--pool-max', type=int, default=10)
+        parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto, salida estándar).")
+
+    def handle(self, *args, **options):
+        base = connections.settings['default']
+        if base['ENGINE'] != 'django.db.backends.postgresql':
+            raise CommandError("Este benchmark requiere PostgreSQL (DB_ENGINE distinto de sqlite).")
+
+        resultados = {}
+        for modo in MODOS:
+            configuracion = self.configuracion(base, modo, options)
+            latencias = self.medir(modo, configuracion, options['solicitudes'], options['concurrencia'])
+            resultados[modo] = {
+                'p50_ms': round(statistics.median(latencias), 2),
+                'p95_ms': round(statistics.quantiles(latencias, n=20)[-1], 2),
+                'total_s': round(sum(latencias) / 1000, 3),
+            }
+            self.stderr.write(f"{modo}: p50 {resultados[modo]['p50_ms']} ms, p95 {resultados[modo]['p95_ms']} ms")
+
+        texto = json.dumps({
+            'solicitudes': options['solicitudes'],
+            'concurrencia': options['concurrencia'],
+            'modos': resultados,
+        }, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + '\n')
+        else:
+            self.stdout.write(texto)
+
+    def configuracion(self, base, modo, options):
+        configuracion = copy.deepcopy(base)
+        configuracion['OPTIONS'].pop('pool', None)
+        configuracion['CONN_MAX_AGE'] = options['conn_max_age'] if modo == 'persistente' else 0
+        if modo == 'pool':
+            configuracion['OPTIONS']['pool'] = {
+                'min_size': min(options['concurrencia'], options['pool_max']),
+                'max_size': options['pool_max'],
+            }
+        return configuracion
+
+    def medir(self, modo, configuracion, solicitudes, concurrencia):
+        backend = load_backend(configuracion['ENGINE'])
+        alias = f'benchmark_{modo}'
+
+        def trabajador(cantidad):
+            conexion = backend.DatabaseWrapper(configuracion, alias)
+            latencias = []
+            try:
+                for _ in range(cantidad):
+                    inicio = time.perf_counter()
+                    conexion.ensure_connection()
+                    with conexion.cursor() as cursor:
+                        cursor.execute('SELECT 1')
+                        cursor.fetchone()
+                    conexion.close_if_unusable_or_obsolete()
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+            finally:
+                conexion.close()
+            return latencias
+
+        repartidas = [solicitudes // concurrencia] * concurrencia
+        latencias = []
+        try:
+            with ThreadPoolExecutor(concurrencia) as ejecutor:
+                for parcial in ejecutor.map(trabajador, repartidas):
+                    latencias.extend(parcial)
+        finally:
+            if modo == 'pool':
+                backend.DatabaseWrapper(configuracion, alias).close_pool()
+        return latencias
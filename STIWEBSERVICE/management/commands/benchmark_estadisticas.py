@@ -0,0 +1,63 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from STIWEBSERVICE.datos_prueba import sembrar_datos
+from STIWEBSERVICE.estadisticas import (
+    contar_tickets_con_agregado,
+    contar_tickets_por_estado,
+)
+from STIWEBSERVICE.models import Ticket
+
+
+def contar_con_consultas_separadas():
+    # Forma anterior: un COUNT(*) por contador.
+    return {
+        "tickets_total": Ticket.objects.count(),
+        "tickets_pendientes": Ticket.objects.filter(estado="Pendiente").count(),
+        "tickets_resueltos": Ticket.objects.filter(estado="Resuelto").count(),
+        "tickets_en_proceso": Ticket.objects.filter(estado="En Progreso").count(),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara los contadores de tickets con consultas separadas, el agregado "
+        "único y TicketStats. Los datos sembrados se descartan al terminar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=100000)
+        parser.add_argument('--repeticiones', type=int, default=10)
+        parser.add_argument('--lote', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.sembrar(options['tickets'], options['lote'])
+            for nombre, funcion in (
+                ("consultas separadas", contar_con_consultas_separadas),
+                ("agregado único", contar_tickets_con_agregado),
+                ("contadores TicketStats", contar_tickets_por_estado),
+            ):
+                self.medir(nombre, funcion, options['repeticiones'])
+            transaction.set_rollback(True)
+
+    def sembrar(self, cantidad, lote):
+        sembrar_datos(usuarios=100, empresas=10, tickets=cantidad, comentarios_por_ticket=0, lote=lote)
+        self.stdout.write(f"Sembrados {cantidad} tickets.")
+
+    def medir(self, nombre, funcion, repeticiones):
+        tiempos = []
+        for _ in range(repeticiones):
+            with CaptureQueriesContext(connection) as consultas:
+                inicio = time.perf_counter()
+                funcion()
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+        self.stdout.write(
+            f"{nombre}: {len(consultas)} consultas, "
+            f"mediana {statistics.median(tiempos):.2f} ms, "
+            f"máximo {max(tiempos):.2f} ms"
+        )
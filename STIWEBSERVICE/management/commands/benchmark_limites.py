@@ -0,0 +1,81 @@
+import itertools
+import json
+import logging
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from STIWEBSERVICE import limites
+
+
+class Command(BaseCommand):
+    help = (
+        "Simula un ataque de relleno de credenciales contra el login (contraseñas incorrectas "
+        "desde pocas IP y muchos correos) y compara el tiempo de CPU del proceso con y sin "
+        "límite de intentos. Sin límite, cada intento paga un hash PBKDF2. Las cubetas usan un "
+        "reloj simulado que avanza al ritmo del ataque (--por-segundo), independiente de lo "
+        "que tarde el hash en esta máquina."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--intentos', type=int, default=200)
+        parser.add_argument('--por-segundo', type=float, default=100, help="Ritmo simulado del ataque.")
+        parser.add_argument('--ips', type=int, default=2)
+        parser.add_argument('--correos', type=int, default=50)
+        parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto, salida estándar).")
+
+    def handle(self, *args, **options):
+        resultados = {}
+        # Cada 429 dejaría una advertencia de django.request.
+        logging.getLogger('django.request').setLevel(logging.ERROR)
+        with override_settings(ALLOWED_HOSTS=['testserver'], SECURE_SSL_REDIRECT=False,
+                               LIMITES_PROXIES_CONFIABLES=0):
+            for modo, activos in (('sin_limite', False), ('con_limite', True)):
+                with override_settings(LIMITES_ACTIVOS=activos):
+                    resultados[modo] = self.atacar(
+                        options['intentos'], options['ips'], options['correos'], options['por_segundo'])
+                self.stderr.write(
+                    f"{modo}: {resultados[modo]['rechazados']} rechazados, "
+                    f"CPU {resultados[modo]['cpu_s']} s ({resultados[modo]['cpu_ms_por_intento']} ms/intento)"
+                )
+
+        texto = json.dumps({
+            'intentos': options['intentos'],
+            'ips': options['ips'],
+            'correos': options['correos'],
+            'por_segundo': options['por_segundo'],
+            'modos': resultados,
+        }, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + '\n')
+        else:
+            self.stdout.write(texto)
+
+    def atacar(self, intentos, ips, correos, por_segundo):
+        cache.clear()
+        origen = time.time()
+        instantes = (origen + n / por_segundo for n in itertools.count())
+        cliente = Client()
+        url = reverse('login')
+        rechazados = 0
+        inicio_cpu, inicio = time.process_time(), time.perf_counter()
+        for i in range(intentos):
+            ahora = next(instantes)
+            with mock.patch.object(limites, 'reloj', lambda ahora=ahora: ahora):
+                respuesta = cliente.post(
+                    url, {'email': f'victima{i % correos}@ejemplo.cl', 'password': f'clave-{i}'},
+                    REMOTE_ADDR=f'203.0.113.{i % ips + 1}',
+                )
+            rechazados += respuesta.status_code == 429
+        cpu = time.process_time() - inicio_cpu
+        return {
+            'rechazados': rechazados,
+            'cpu_s': round(cpu, 3),
+            'cpu_ms_por_intento': round(cpu * 1000 / intentos, 2),
+            'intentos_por_segundo': round(intentos / (time.perf_counter() - inicio), 1),
+        }
@@ -0,0 +1,131 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from STIWEBSERVICE.datos_prueba import CLAVE_PREDETERMINADA
+from STIWEBSERVICE.models import CustomUser, Ticket
+
+MOTORES_SESION = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+
+def percentil(valores, p):
+    if len(valores) == 1:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method='inclusive')[p - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide cada vista con el cliente de pruebas sobre la base de datos configurada "
+        "(sembrarla antes con poblar_datos) y escribe p50/p95, consultas y memoria en JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticiones', type=int, default=50)
+        parser.add_argument('--calentamiento', type=int, default=3)
+        parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto, salida estándar).")
+        parser.add_argument('--clave', default=CLAVE_PREDETERMINADA,
+                            help="Contraseña de los usuarios sembrados, para medir el login.")
+        parser.add_argument('--sesion', choices=list(MOTORES_SESION),
+                            help="Motor de sesiones a medir (por defecto, el de SESSION_MODO).")
+        parser.add_argument('--cache-usuario', type=int,
+                            help="Segundos del usuario en caché (por defecto, USUARIO_CACHE_TTL; 0 lo desactiva).")
+
+    def handle(self, *args, **options):
+        tecnico = CustomUser.objects.filter(is_staff=True).order_by('pk').first()
+        cliente = CustomUser.objects.filter(is_staff=False).order_by('pk').first()
+        ticket = Ticket.objects.order_by('-pk').first()
+        if not (tecnico and cliente and ticket):
+            raise CommandError("No hay datos suficientes: ejecuta primero poblar_datos.")
+
+        escenarios = {
+            'index_vista': (None, 'get', reverse('index'), None),
+            'login_view GET': (None, 'get', reverse('login'), None),
+            'login_view POST': (None, 'post', reverse('login'), {'email': cliente.email, 'password': options['clave']}),
+            'home_vista': (cliente, 'get', reverse('home'), None),
+            'historial_ticket_vista': (cliente, 'get', reverse('historial'), None),
+            'dashboard_vista': (tecnico, 'get', reverse('dashboard'), None),
+            'detalle_ticket_vista': (tecnico, 'get', reverse('detalleticket', args=[ticket.pk]), None),
+        }
+
+        sesion = options['sesion'] or settings.SESSION_MODO
+        cache_usuario = settings.USUARIO_CACHE_TTL if options['cache_usuario'] is None else options['cache_usuario']
+        cache.clear()
+
+        resultados = {}
+        # Sin límite de intentos: el escenario de login repite el mismo correo.
+        with override_settings(ALLOWED_HOSTS=['testserver'], SECURE_SSL_REDIRECT=False, LIMITES_ACTIVOS=False,
+                               SESSION_ENGINE=MOTORES_SESION[sesion], USUARIO_CACHE_TTL=cache_usuario):
+            for nombre, escenario in escenarios.items():
+                resultados[nombre] = self.medir(escenario, options['repeticiones'], options['calentamiento'])
+                self.stderr.write(
+                    f"{nombre}: p50 {resultados[nombre]['p50_ms']} ms, p95 {resultados[nombre]['p95_ms']} ms, "
+                    f"{resultados[nombre]['consultas']} consultas"
+                )
+
+        informe = {
+            'fecha': timezone.now().isoformat(),
+            'motor': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'tickets': Ticket.objects.count(),
+            'repeticiones': options['repeticiones'],
+            'sesion': sesion,
+            'cache_usuario_s': cache_usuario,
+            'vistas': resultados,
+        }
+        texto = json.dumps(informe, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + '\n')
+        else:
+            self.stdout.write(texto)
+
+    def medir(self, escenario, repeticiones, calentamiento):
+        usuario, metodo, url, datos = escenario
+        cliente = Client()
+        if usuario is not None:
+            cliente.force_login(usuario)
+        solicitar = getattr(cliente, metodo)
+
+        for _ in range(calentamiento):
+            solicitar(url, datos)
+
+        tiempos = []
+        consultas = []
+        for _ in range(repeticiones):
+            with CaptureQueriesContext(connection) as capturadas:
+                inicio = time.perf_counter()
+                respuesta = solicitar(url, datos)
+                tiempos.append((time.perf_counter() - inicio) * 1000)
+            consultas.append(len(capturadas))
+
+        # La memoria se mide aparte: tracemalloc distorsiona los tiempos.
+        tracemalloc.start()
+        solicitar(url, datos)
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            'estado_http': respuesta.status_code,
+            'p50_ms': round(percentil(tiempos, 50), 3),
+            'p95_ms': round(percentil(tiempos, 95), 3),
+            'consultas': max(consultas),
+            'memoria_pico_kb': round(pico / 1024, 1),
+        }
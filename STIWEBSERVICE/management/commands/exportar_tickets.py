@@ -0,0 +1,29 @@
+import datetime
+import sys
+
+from django.core.management.base import BaseCommand
+
+from STIWEBSERVICE.exportacion import FORMATOS_EXPORTACION, tickets_para_exportar
+
+
+class Command(BaseCommand):
+    help = "Exporta tickets en CSV o JSON Lines leyendo por bloques, con memoria constante."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--formato', choices=list(FORMATOS_EXPORTACION), default='csv')
+        parser.add_argument('--salida', help="Archivo de destino (por defecto, salida estándar).")
+        parser.add_argument('--desde', type=datetime.date.fromisoformat)
+        parser.add_argument('--hasta', type=datetime.date.fromisoformat)
+        parser.add_argument('--estado')
+        parser.add_argument('--empresa')
+        parser.add_argument('--bloque', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        filtros = {campo: options[campo] for campo in ('desde', 'hasta', 'estado', 'empresa')}
+        generar_lineas, _ = FORMATOS_EXPORTACION[options['formato']]
+        lineas = generar_lineas(tickets_para_exportar(filtros, chunk_size=options['bloque']))
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8', newline='') as archivo:
+                archivo.writelines(lineas)
+        else:
+            sys.stdout.writelines(lineas)
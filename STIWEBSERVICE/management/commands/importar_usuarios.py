@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from STIWEBSERVICE.importacion import (
+    COLUMNAS_IMPORTACION,
+    importar_usuarios,
+    leer_usuarios_csv,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Importa usuarios desde un CSV con columnas " + ", ".join(COLUMNAS_IMPORTACION) + ". "
+        "Las contraseñas se hashean en paralelo en varios procesos y las filas se insertan "
+        "con bulk_create por lotes. Se omiten los usernames y correos (sin distinguir mayúsculas) que ya existen o se repiten."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo')
+        parser.add_argument('--procesos', type=int, help="Por defecto, un proceso por núcleo.")
+        parser.add_argument('--lote', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        with open(options['archivo'], encoding='utf-8-sig', newline='') as archivo:
+            resultado = importar_usuarios(
+                leer_usuarios_csv(archivo), procesos=options['procesos'], lote=options['lote'])
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"Creados {resultado['creados']} de {resultado['leidos']} usuarios "
+            f"({resultado['omitidos']} omitidos) en {segundos:.1f} s con {resultado['procesos']} procesos: "
+            f"{resultado['leidos'] / segundos if segundos else 0:.0f} usuarios/s."
+        ))
@@ -0,0 +1,32 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina las sesiones vencidas por lotes (usa el índice de expire_date), para no "
+        "bloquear la tabla de sesiones con un único DELETE grande como clearsessions. "
+        "Pensado para cron; no aplica con SESSION_MODO=signed_cookies."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000)
+        parser.add_argument('--pausa', type=float, default=0, help="Segundos de espera entre lotes.")
+
+    def handle(self, *args, **options):
+        ahora = timezone.now()
+        eliminadas = 0
+        while True:
+            claves = list(
+                Session.objects.filter(expire_date__lt=ahora)
+                .values_list('session_key', flat=True)[:options['lote']]
+            )
+            if not claves:
+                break
+            eliminadas += Session.objects.filter(session_key__in=claves).delete()[0]
+            if options['pausa']:
+                time.sleep(options['pausa'])
+        self.stdout.write(self.style.SUCCESS(f"Eliminadas {eliminadas} sesiones vencidas."))
@@ -0,0 +1,40 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from STIWEBSERVICE.estadisticas import invalidar_agregados_dashboard
+from STIWEBSERVICE.models import TransicionEstado
+from STIWEBSERVICE.transiciones import inicio_de_mes, materializar_mes
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula el resumen de tiempo en estado (promedio, mediana y p90 por técnico, "
+        "empresa y mes) desde el historial de transiciones. Pensado para ejecutarse cada "
+        "noche: por defecto recalcula el mes en curso y el anterior."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mes', action='append', default=[], help="Mes AAAA-MM; se puede repetir.")
+        parser.add_argument('--todo', action='store_true', help="Recalcula todos los meses con historial.")
+
+    def handle(self, *args, **options):
+        if options['todo']:
+            meses = [
+                timezone.localtime(fecha).date()
+                for fecha in TransicionEstado.objects.datetimes('fecha', 'month')
+            ]
+        elif options['mes']:
+            try:
+                meses = [datetime.datetime.strptime(mes, '%Y-%m').date() for mes in options['mes']]
+            except ValueError:
+                raise CommandError("Usa el formato AAAA-MM para --mes.") from None
+        else:
+            actual = inicio_de_mes(timezone.localdate())
+            meses = [inicio_de_mes(actual - datetime.timedelta(days=1)), actual]
+
+        for mes in meses:
+            filas = materializar_mes(mes)
+            self.stdout.write(f"{mes:%Y-%m}: {filas} filas")
+        invalidar_agregados_dashboard()
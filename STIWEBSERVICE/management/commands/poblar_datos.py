@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from STIWEBSERVICE.datos_prueba import CLAVE_PREDETERMINADA, sembrar_datos
+
+
+class Command(BaseCommand):
+    help = "Siembra usuarios, técnicos, tickets, comentarios y encuestas de prueba con bulk_create."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuarios', type=int, default=1000)
+        parser.add_argument('--empresas', type=int, default=50)
+        parser.add_argument('--tecnicos', type=int, default=10)
+        parser.add_argument('--tickets', type=int, default=10000)
+        parser.add_argument('--comentarios-por-ticket', type=int, default=2)
+        parser.add_argument('--meses', type=int, default=24)
+        parser.add_argument('--lote', type=int, default=1000)
+        parser.add_argument('--clave', default=CLAVE_PREDETERMINADA)
+        parser.add_argument('--semilla', type=int)
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        creados = sembrar_datos(
+            usuarios=options['usuarios'],
+            empresas=options['empresas'],
+            tecnicos=options['tecnicos'],
+            tickets=options['tickets'],
+            comentarios_por_ticket=options['comentarios_por_ticket'],
+            meses=options['meses'],
+            lote=options['lote'],
+            clave=options['clave'],
+            semilla=options['semilla'],
+        )
+        segundos = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"Creados {creados['usuarios']} usuarios, {creados['tecnicos']} técnicos y "
+            f"{creados['tickets']} tickets en {segundos:.1f} s."
+        ))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from STIWEBSERVICE.estadisticas import (
+    calcular_estadisticas,
+    diferencias_estadisticas,
+    reconstruir_estadisticas,
+)
+
+
+class Command(BaseCommand):
+    help = "Reconstruye los contadores de TicketStats desde la tabla de tickets."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--solo-verificar', action='store_true',
+            help="Informa las diferencias sin modificar los contadores.",
+        )
+
+    def handle(self, *args, **options):
+        if options['solo_verificar']:
+            diferencias = diferencias_estadisticas(calcular_estadisticas())
+        else:
+            diferencias = reconstruir_estadisticas()
+
+        for (dimension, clave), (antes, despues) in sorted(diferencias.items()):
+            self.stdout.write(f"{dimension}={clave or '-'}: {antes} -> {despues}")
+        if diferencias:
+            accion = "encontradas" if options['solo_verificar'] else "corregidas"
+            self.stdout.write(self.style.WARNING(f"{len(diferencias)} diferencias {accion}."))
+        else:
+            self.stdout.write(self.style.SUCCESS("Los contadores están al día."))
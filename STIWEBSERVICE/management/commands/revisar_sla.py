@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from STIWEBSERVICE.operaciones_masivas import revisar_vencimientos
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca como incumplidos los tickets abiertos cuyo plazo de SLA ya venció. Pensado "
+        "para ejecutarse periódicamente (cron): cada pasada es un rango sobre el índice "
+        "ticket_sla_por_vencer_idx y solo recorre los que aún no se marcaron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500)
+        parser.add_argument('--salida', help="Archivo JSON de resultados (por defecto, salida estándar).")
+
+    def handle(self, *args, **options):
+        ahora = timezone.now()
+        marcados = revisar_vencimientos(ahora, options['lote'])
+        texto = json.dumps({'revisado_en': ahora.isoformat(), 'marcados': marcados}, indent=2, ensure_ascii=False)
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                archivo.write(texto + '\n')
+        else:
+            self.stdout.write(texto)
@@ -0,0 +1,84 @@
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+logger = logging.getLogger('STIWEBSERVICE.instrumentacion')
+
+# Listas IN de largo variable y literales numéricos no cambian la "forma" de una consulta.
+PATRON_LISTA = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+PATRON_NUMERO = re.compile(r'\b\d+\b')
+
+
+def huella_sql(sql):
+    return PATRON_NUMERO.sub('?', PATRON_LISTA.sub('(...)', sql))
+
+
+class RegistroConsultas:
+    # execute_wrapper de la conexión: acumula tiempo y huellas de cada consulta.
+    def __init__(self, guardar_sql=False):
+        self.guardar_sql = guardar_sql
+        self.tiempo_db = 0.0
+        self.huellas = Counter()
+        self.consultas = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duracion = time.perf_counter() - inicio
+            self.tiempo_db += duracion
+            self.huellas[huella_sql(sql)] += 1
+            if self.guardar_sql:
+                # Solo el texto con sus marcadores: los parámetros traen claves de sesión,
+                # hashes de contraseñas y datos de los usuarios.
+                self.consultas.append({'sql': sql, 'ms': round(duracion * 1000, 3)})
+
+
+class InstrumentacionMiddleware:
+    # Desactivado (INSTRUMENTACION_ACTIVA=False) Django lo descarta al arrancar: costo cero.
+    # Es solo síncrono: execute_wrapper se instala en la conexión del hilo actual y no
+    # vería las consultas que una vista asíncrona hace en otros hilos. En el despliegue
+    # ASGI conviene dejarlo desactivado, o Django adapta toda la cadena a síncrona.
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTACION_ACTIVA:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # El SQL completo solo se guarda en una muestra de las solicitudes.
+        registro = RegistroConsultas(guardar_sql=random.random() < settings.INSTRUMENTACION_MUESTREO_LENTAS)
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(registro):
+            response = self.get_response(request)
+        total_ms = (time.perf_counter() - inicio) * 1000
+        db_ms = registro.tiempo_db * 1000
+        cantidad = sum(registro.huellas.values())
+        duplicadas = {huella: veces for huella, veces in registro.huellas.items() if veces > 1}
+
+        response['Server-Timing'] = (
+            f'total;dur={total_ms:.1f}, db;dur={db_ms:.1f};desc="{cantidad} consultas"'
+        )
+        logger.info(json.dumps({
+            'metodo': request.method,
+            'ruta': request.path,
+            'estado': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'db_ms': round(db_ms, 1),
+            'consultas': cantidad,
+            'duplicadas': duplicadas,
+        }, ensure_ascii=False))
+        if registro.guardar_sql and total_ms >= settings.INSTRUMENTACION_UMBRAL_LENTO_MS:
+            logger.warning(json.dumps({
+                'solicitud_lenta': request.path,
+                'total_ms': round(total_ms, 1),
+                'sql': registro.consultas,
+            }, ensure_ascii=False))
+        return response
@@ -0,0 +1,54 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:02
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+
+def poblar_contadores(apps, schema_editor):
+    Ticket = apps.get_model('STIWEBSERVICE', 'Ticket')
+    TicketStats = apps.get_model('STIWEBSERVICE', 'TicketStats')
+    agrupaciones = {
+        'estado': Ticket.objects.values_list('estado'),
+        'prioridad': Ticket.objects.values_list('prioridad'),
+        'mes': Ticket.objects.annotate(mes=TruncMonth('fecha_creacion')).values_list('mes'),
+        'tecnico': Ticket.objects.values_list('tecnico_asignado_id'),
+        'empresa': Ticket.objects.values_list('usuario__nombre_empresa'),
+    }
+    contadores = {}
+    for dimension, consulta in agrupaciones.items():
+        for valor, total in consulta.annotate(total=Count('id')).order_by():
+            if valor is None:
+                clave = ''
+            elif dimension == 'mes':
+                clave = valor.strftime('%Y-%m')
+            else:
+                clave = str(valor)
+            contadores[(dimension, clave)] = contadores.get((dimension, clave), 0) + total
+    TicketStats.objects.bulk_create(
+        TicketStats(dimension=dimension, clave=clave, total=total)
+        for (dimension, clave), total in contadores.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0007_remove_asignacion_asignado_a_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('estado', 'Estado'), ('prioridad', 'Prioridad'), ('mes', 'Mes'), ('tecnico', 'Técnico'), ('empresa', 'Empresa')], max_length=20)),
+                ('clave', models.CharField(blank=True, max_length=255)),
+                ('total', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'clave'), name='ticketstats_dimension_clave_unica')],
+            },
+        ),
+        migrations.RunPython(poblar_contadores, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0008_ticketstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['estado'], name='ticket_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['-fecha_creacion'], name='ticket_fecha_creacion_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['tecnico_asignado', 'estado'], name='ticket_tecnico_estado_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['usuario', 'fecha_creacion'], name='ticket_usuario_fecha_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('estado__in', ('Pendiente', 'En Progreso'))), fields=['-fecha_creacion'], name='ticket_abiertos_idx'),
+        ),
+    ]
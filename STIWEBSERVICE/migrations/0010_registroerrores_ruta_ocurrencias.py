@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0009_ticket_indices'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='registroerrores',
+            name='ocurrencias',
+            field=models.PositiveIntegerField(default=1),
+        ),
+        migrations.AddField(
+            model_name='registroerrores',
+            name='ruta',
+            field=models.CharField(blank=True, default='', max_length=500),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0010_registroerrores_ruta_ocurrencias'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['fecha_actualizacion'], name='ticket_fecha_actualizacion_idx'),
+        ),
+    ]
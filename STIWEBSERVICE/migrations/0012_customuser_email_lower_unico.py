@@ -0,0 +1,44 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:19
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def revisar_correos_repetidos(apps, schema_editor):
+    # Con correos que solo difieren en mayúsculas el índice único no se puede crear.
+    # No se elige qué cuenta conservar: se listan para corregirlas a mano.
+    CustomUser = apps.get_model('STIWEBSERVICE', 'CustomUser')
+    repetidos = list(
+        CustomUser.objects.exclude(email='').annotate(email_normalizado=Lower('email'))
+        .values('email_normalizado').annotate(cuentas=Count('id')).filter(cuentas__gt=1)
+        .values_list('email_normalizado', flat=True)
+    )
+    if not repetidos:
+        return
+    conflictos = [
+        f"{email}: " + ', '.join(
+            CustomUser.objects.exclude(email='').annotate(email_normalizado=Lower('email'))
+            .filter(email_normalizado=email).order_by('pk').values_list('username', flat=True))
+        for email in repetidos
+    ]
+    raise RuntimeError(
+        "Hay cuentas con el mismo correo (sin distinguir mayúsculas); corrija o vacíe el correo "
+        "de las que sobran antes de migrar:\n" + '\n'.join(conflictos))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0011_ticket_fecha_actualizacion_idx'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(revisar_correos_repetidos, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='customuser',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='customuser_email_lower_unico', violation_error_message='Ya existe un usuario con este correo electrónico.'),
+        ),
+    ]
@@ -0,0 +1,165 @@
+# Índice de búsqueda de texto completo sobre título, descripción, solución y
+# comentarios de cada ticket, mantenido por triggers (así cubre también
+# bulk_create y QuerySet.update). No forma parte del estado de los modelos.
+#
+# PostgreSQL: columna tsvector "busqueda" (configuración spanish) con índice GIN.
+# SQLite: tabla virtual FTS5 "ticket_busqueda" con rowid = id del ticket.
+
+from django.db import migrations
+
+POSTGRESQL = [
+    '''
+    ALTER TABLE "STIWEBSERVICE_ticket" ADD COLUMN busqueda tsvector
+    ''',
+    '''
+    CREATE FUNCTION ticket_busqueda_calcular() RETURNS trigger AS $$
+    BEGIN
+        NEW.busqueda :=
+            setweight(to_tsvector('spanish', coalesce(NEW.titulo, '')), 'A') ||
+            setweight(to_tsvector('spanish', coalesce(NEW.descripcion, '')), 'B') ||
+            setweight(to_tsvector('spanish', coalesce(NEW.solucion, '')), 'B') ||
+            setweight(to_tsvector('spanish', coalesce(
+                (SELECT string_agg(contenido, ' ') FROM "STIWEBSERVICE_comentario" WHERE ticket_id = NEW.id), ''
+            )), 'C');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    '''
+    CREATE TRIGGER ticket_busqueda_insertar BEFORE INSERT ON "STIWEBSERVICE_ticket"
+    FOR EACH ROW EXECUTE FUNCTION ticket_busqueda_calcular()
+    ''',
+    # Django guarda todas las columnas en cada save(): se recalcula solo si cambió
+    # el texto, o si un comentario dejó busqueda en NULL.
+    '''
+    CREATE TRIGGER ticket_busqueda_actualizar BEFORE UPDATE ON "STIWEBSERVICE_ticket"
+    FOR EACH ROW WHEN (
+        NEW.busqueda IS NULL
+        OR OLD.titulo IS DISTINCT FROM NEW.titulo
+        OR OLD.descripcion IS DISTINCT FROM NEW.descripcion
+        OR OLD.solucion IS DISTINCT FROM NEW.solucion
+    ) EXECUTE FUNCTION ticket_busqueda_calcular()
+    ''',
+    '''
+    CREATE FUNCTION comentario_busqueda_invalidar() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP <> 'INSERT' THEN
+            UPDATE "STIWEBSERVICE_ticket" SET busqueda = NULL WHERE id = OLD.ticket_id;
+        END IF;
+        IF TG_OP <> 'DELETE' THEN
+            UPDATE "STIWEBSERVICE_ticket" SET busqueda = NULL WHERE id = NEW.ticket_id;
+        END IF;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    '''
+    CREATE TRIGGER comentario_busqueda AFTER INSERT OR UPDATE OF contenido, ticket_id OR DELETE
+    ON "STIWEBSERVICE_comentario" FOR EACH ROW EXECUTE FUNCTION comentario_busqueda_invalidar()
+    ''',
+    '''
+    UPDATE "STIWEBSERVICE_ticket" SET busqueda = NULL
+    ''',
+    '''
+    CREATE INDEX ticket_busqueda_gin ON "STIWEBSERVICE_ticket" USING gin (busqueda)
+    ''',
+]
+
+POSTGRESQL_REVERSA = [
+    'DROP TRIGGER comentario_busqueda ON "STIWEBSERVICE_comentario"',
+    'DROP FUNCTION comentario_busqueda_invalidar()',
+    'DROP TRIGGER ticket_busqueda_actualizar ON "STIWEBSERVICE_ticket"',
+    'DROP TRIGGER ticket_busqueda_insertar ON "STIWEBSERVICE_ticket"',
+    'DROP FUNCTION ticket_busqueda_calcular()',
+    'ALTER TABLE "STIWEBSERVICE_ticket" DROP COLUMN busqueda',
+]
+
+COMENTARIOS_SQLITE = '''
+    (SELECT coalesce(group_concat(contenido, ' '), '') FROM "STIWEBSERVICE_comentario" WHERE ticket_id = {ticket})
+'''
+
+SQLITE = [
+    '''
+    CREATE VIRTUAL TABLE ticket_busqueda USING fts5(
+        titulo, descripcion, solucion, comentarios, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    ''',
+    '''
+    INSERT INTO ticket_busqueda (rowid, titulo, descripcion, solucion, comentarios)
+    SELECT t.id, t.titulo, t.descripcion, coalesce(t.solucion, ''), ''' + COMENTARIOS_SQLITE.format(ticket='t.id') + '''
+    FROM "STIWEBSERVICE_ticket" t
+    ''',
+    '''
+    CREATE TRIGGER ticket_busqueda_insertar AFTER INSERT ON "STIWEBSERVICE_ticket" BEGIN
+        INSERT INTO ticket_busqueda (rowid, titulo, descripcion, solucion, comentarios)
+        VALUES (new.id, new.titulo, new.descripcion, coalesce(new.solucion, ''), '');
+    END
+    ''',
+    '''
+    CREATE TRIGGER ticket_busqueda_actualizar AFTER UPDATE OF titulo, descripcion, solucion
+    ON "STIWEBSERVICE_ticket" WHEN (
+        old.titulo IS NOT new.titulo OR old.descripcion IS NOT new.descripcion OR old.solucion IS NOT new.solucion
+    ) BEGIN
+        UPDATE ticket_busqueda
+        SET titulo = new.titulo, descripcion = new.descripcion, solucion = coalesce(new.solucion, '')
+        WHERE rowid = new.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER ticket_busqueda_eliminar AFTER DELETE ON "STIWEBSERVICE_ticket" BEGIN
+        DELETE FROM ticket_busqueda WHERE rowid = old.id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER comentario_busqueda_insertar AFTER INSERT ON "STIWEBSERVICE_comentario" BEGIN
+        UPDATE ticket_busqueda SET comentarios = ''' + COMENTARIOS_SQLITE.format(ticket='new.ticket_id') + '''
+        WHERE rowid = new.ticket_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER comentario_busqueda_actualizar AFTER UPDATE OF contenido, ticket_id
+    ON "STIWEBSERVICE_comentario" BEGIN
+        UPDATE ticket_busqueda SET comentarios = ''' + COMENTARIOS_SQLITE.format(ticket='old.ticket_id') + '''
+        WHERE rowid = old.ticket_id;
+        UPDATE ticket_busqueda SET comentarios = ''' + COMENTARIOS_SQLITE.format(ticket='new.ticket_id') + '''
+        WHERE rowid = new.ticket_id;
+    END
+    ''',
+    '''
+    CREATE TRIGGER comentario_busqueda_eliminar AFTER DELETE ON "STIWEBSERVICE_comentario" BEGIN
+        UPDATE ticket_busqueda SET comentarios = ''' + COMENTARIOS_SQLITE.format(ticket='old.ticket_id') + '''
+        WHERE rowid = old.ticket_id;
+    END
+    ''',
+]
+
+SQLITE_REVERSA = [
+    'DROP TRIGGER comentario_busqueda_eliminar',
+    'DROP TRIGGER comentario_busqueda_actualizar',
+    'DROP TRIGGER comentario_busqueda_insertar',
+    'DROP TRIGGER ticket_busqueda_eliminar',
+    'DROP TRIGGER ticket_busqueda_actualizar',
+    'DROP TRIGGER ticket_busqueda_insertar',
+    'DROP TABLE ticket_busqueda',
+]
+
+
+def _ejecutar(sentencias_por_motor):
+    def ejecutar(apps, schema_editor):
+        for sentencia in sentencias_por_motor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sentencia)
+    return ejecutar
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0012_customuser_email_lower_unico'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _ejecutar({'postgresql': POSTGRESQL, 'sqlite': SQLITE}),
+            _ejecutar({'postgresql': POSTGRESQL_REVERSA, 'sqlite': SQLITE_REVERSA}),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:39
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Case, Count, F, Value, When
+
+ESTADOS_ABIERTOS = ('Pendiente', 'En Progreso')
+# Plazos vigentes al escribir la migración: no se leen de settings para que el
+# resultado no dependa de la configuración del momento en que se aplica.
+SLA_HORAS = {'Alta': 8, 'Media': 24, 'Baja': 72}
+DIMENSIONES_SLA = {'sla_tecnico': 'tecnico_asignado_id', 'sla_empresa': 'usuario__nombre_empresa'}
+
+
+def completar_sla(apps, schema_editor):
+    # Plazos de los tickets existentes y contadores de cumplimiento de partida. Los
+    # cerrados no guardan cuándo se resolvieron: se toma fecha_actualizacion y, si es
+    # posterior al plazo, se marcan incumplidos en esa fecha. Los abiertos vencidos
+    # los marca el comando revisar_sla.
+    Ticket = apps.get_model('STIWEBSERVICE', 'Ticket')
+    TicketStats = apps.get_model('STIWEBSERVICE', 'TicketStats')
+    for prioridad, horas in SLA_HORAS.items():
+        Ticket.objects.filter(prioridad=prioridad).update(vence_sla=F('fecha_creacion') + timedelta(hours=horas))
+    Ticket.objects.exclude(estado__in=ESTADOS_ABIERTOS).filter(
+        sla_incumplido_en__isnull=True, fecha_actualizacion__gt=F('vence_sla'),
+    ).update(sla_incumplido_en=F('fecha_actualizacion'))
+    resultado = Case(
+        When(sla_incumplido_en__isnull=False, then=Value('incumplido')),
+        When(estado__in=ESTADOS_ABIERTOS, then=Value('en_curso')),
+        default=Value('cumplido'),
+    )
+    TicketStats.objects.filter(dimension__in=DIMENSIONES_SLA).delete()
+    TicketStats.objects.bulk_create(
+        TicketStats(dimension=dimension, clave=f"{valor}:{'' if grupo is None else grupo}", total=total)
+        for dimension, campo in DIMENSIONES_SLA.items()
+        for valor, grupo, total in Ticket.objects.annotate(resultado=resultado)
+        .values_list('resultado', campo).annotate(total=Count('id')).order_by()
+    )
+
+
+def quitar_contadores_sla(apps, schema_editor):
+    TicketStats = apps.get_model('STIWEBSERVICE', 'TicketStats')
+    TicketStats.objects.filter(dimension__in=DIMENSIONES_SLA).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0013_busqueda_tickets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='sla_incumplido_en',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='vence_sla',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='ticketstats',
+            name='dimension',
+            field=models.CharField(choices=[('estado', 'Estado'), ('prioridad', 'Prioridad'), ('mes', 'Mes'), ('tecnico', 'Técnico'), ('empresa', 'Empresa'), ('sla_tecnico', 'SLA por técnico'), ('sla_empresa', 'SLA por empresa')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('sla_incumplido_en__isnull', True)), fields=['estado', 'vence_sla'], name='ticket_sla_por_vencer_idx'),
+        ),
+        migrations.RunPython(completar_sla, quitar_contadores_sla),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def completar_fecha_estado(apps, schema_editor):
+    # Un ticket pendiente lo está desde que se creó; para los demás no se sabe cuándo
+    # cambiaron, así que su primera transición queda sin duración.
+    Ticket = apps.get_model('STIWEBSERVICE', 'Ticket')
+    Ticket.objects.filter(estado='Pendiente').update(fecha_estado=F('fecha_creacion'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0014_ticket_sla'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ticket',
+            name='fecha_estado',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='TiempoEstado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('tecnico', 'Técnico'), ('empresa', 'Empresa')], max_length=20)),
+                ('clave', models.CharField(blank=True, max_length=255)),
+                ('estado', models.CharField(choices=[('Pendiente', 'Pendiente'), ('En Progreso', 'En Progreso'), ('Resuelto', 'Resuelto')], max_length=20)),
+                ('cantidad', models.PositiveIntegerField()),
+                ('promedio_segundos', models.FloatField()),
+                ('p50_segundos', models.PositiveIntegerField()),
+                ('p90_segundos', models.PositiveIntegerField()),
+                ('calculado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('mes', 'dimension', 'clave', 'estado'), name='tiempoestado_mes_dimension_clave_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='TransicionEstado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado_anterior', models.CharField(blank=True, choices=[('Pendiente', 'Pendiente'), ('En Progreso', 'En Progreso'), ('Resuelto', 'Resuelto')], max_length=20, null=True)),
+                ('estado_nuevo', models.CharField(choices=[('Pendiente', 'Pendiente'), ('En Progreso', 'En Progreso'), ('Resuelto', 'Resuelto')], max_length=20)),
+                ('fecha', models.DateTimeField(default=django.utils.timezone.now)),
+                ('segundos_en_anterior', models.PositiveIntegerField(blank=True, null=True)),
+                ('tecnico', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('ticket', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transiciones', to='STIWEBSERVICE.ticket')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['ticket', 'fecha'], name='transicion_ticket_fecha_idx'), models.Index(fields=['fecha'], name='transicion_fecha_idx')],
+            },
+        ),
+        migrations.RunPython(completar_fecha_estado, migrations.RunPython.noop),
+    ]
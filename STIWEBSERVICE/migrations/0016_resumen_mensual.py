@@ -0,0 +1,38 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:46
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0015_historial_estados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenMensual',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField()),
+                ('dimension', models.CharField(choices=[('total', 'Total'), ('empresa', 'Empresa'), ('tecnico', 'Técnico')], max_length=20)),
+                ('clave', models.CharField(blank=True, max_length=255)),
+                ('tickets', models.PositiveIntegerField(default=0)),
+                ('resueltos', models.PositiveIntegerField(default=0)),
+                ('visitas_terreno', models.PositiveIntegerField(default=0)),
+                ('encuestas', models.PositiveIntegerField(default=0)),
+                ('suma_calificaciones', models.PositiveIntegerField(default=0)),
+                ('cerrado', models.BooleanField(default=False)),
+                ('calculado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='encuesta',
+            index=models.Index(fields=['fecha_creacion'], name='encuesta_fecha_creacion_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='resumenmensual',
+            constraint=models.UniqueConstraint(fields=('dimension', 'mes', 'clave'), name='resumenmensual_dimension_mes_clave_unico'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-18 16:50
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncMonth
+
+DIMENSIONES_ENCUESTA = ('encuesta_tecnico', 'encuesta_empresa', 'encuesta_mes')
+
+
+def contar_encuestas(apps, schema_editor):
+    # Contadores de partida por calificación desde las encuestas existentes.
+    Encuesta = apps.get_model('STIWEBSERVICE', 'Encuesta')
+    TicketStats = apps.get_model('STIWEBSERVICE', 'TicketStats')
+    encuestas = Encuesta.objects.annotate(mes=TruncMonth('fecha_creacion'))
+    grupos = {
+        'encuesta_tecnico': 'ticket__tecnico_asignado_id',
+        'encuesta_empresa': 'ticket__usuario__nombre_empresa',
+        'encuesta_mes': 'mes',
+    }
+    TicketStats.objects.filter(dimension__in=DIMENSIONES_ENCUESTA).delete()
+    TicketStats.objects.bulk_create(
+        TicketStats(dimension=dimension, clave=f"{calificacion}:{'' if grupo is None else grupo}", total=total)
+        for dimension, campo in grupos.items()
+        for calificacion, grupo, total in (
+            (calificacion, grupo.strftime('%Y-%m') if dimension == 'encuesta_mes' else grupo, total)
+            for calificacion, grupo, total in encuestas.values_list('calificacion', campo)
+            .annotate(total=Count('id')).order_by()
+        )
+    )
+
+
+def quitar_contadores_encuesta(apps, schema_editor):
+    TicketStats = apps.get_model('STIWEBSERVICE', 'TicketStats')
+    TicketStats.objects.filter(dimension__in=DIMENSIONES_ENCUESTA).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0016_resumen_mensual'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='ticketstats',
+            name='dimension',
+            field=models.CharField(choices=[('estado', 'Estado'), ('prioridad', 'Prioridad'), ('mes', 'Mes'), ('tecnico', 'Técnico'), ('empresa', 'Empresa'), ('sla_tecnico', 'SLA por técnico'), ('sla_empresa', 'SLA por empresa'), ('encuesta_tecnico', 'Calificación por técnico'), ('encuesta_empresa', 'Calificación por empresa'), ('encuesta_mes', 'Calificación por mes')], max_length=20),
+        ),
+        migrations.RunPython(contar_encuestas, quitar_contadores_encuesta),
+    ]
@@ -0,0 +1,51 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Sus índices propios sobran: ticket_usuario_fecha_idx y ticket_tecnico_estado_idx
+# empiezan por la misma columna y sirven las mismas búsquedas.
+CAMPOS = ('usuario', 'tecnico_asignado')
+
+
+def quitar_indices(apps, schema_editor):
+    # Solo el índice, sin AlterField en la base: en SQLite AlterField reconstruye la
+    # tabla de tickets y borra los triggers de búsqueda de la migración 0013.
+    Ticket = apps.get_model('STIWEBSERVICE', 'Ticket')
+    for campo in CAMPOS:
+        columna = Ticket._meta.get_field(campo).column
+        for nombre in schema_editor._constraint_names(Ticket, [columna], index=True, type_=models.Index.suffix):
+            schema_editor.execute(schema_editor._delete_index_sql(Ticket, nombre))
+
+
+def crear_indices(apps, schema_editor):
+    Ticket = apps.get_model('STIWEBSERVICE', 'Ticket')
+    for campo in CAMPOS:
+        schema_editor.execute(schema_editor._create_index_sql(Ticket, fields=[Ticket._meta.get_field(campo)]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('STIWEBSERVICE', '0017_encuestas_estadisticas'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='ticket',
+                    name='usuario',
+                    field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tickets', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AlterField(
+                    model_name='ticket',
+                    name='tecnico_asignado',
+                    field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='tickets_asignados_tecnico', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+            database_operations=[
+                migrations.RunPython(quitar_indices, crear_indices),
+            ],
+        ),
+    ]
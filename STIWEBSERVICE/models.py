@@ -1,6 +1,14 @@
-from django.db import models
+import datetime
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import models, transaction
 from django.contrib.auth.models import AbstractUser
-from django.db.models.signals import post_save
+from django.db.models import F, Q
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
 
@@ -9,9 +17,45 @@ class CustomUser(AbstractUser):
     nombre_empresa = models.CharField(max_length=255, blank=True, null=True)
     cargo = models.CharField(max_length=255, blank=True, null=True)
 
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Índice único sobre LOWER(email): el login busca por correo sin distinguir mayúsculas.
+            models.UniqueConstraint(
+                Lower('email'), name='customuser_email_lower_unico', condition=~Q(email=''),
+                violation_error_message="Ya existe un usuario con este correo electrónico.",
+            ),
+        ]
+
+    # Campos cuyo valor original se recuerda al cargar el usuario: si cambia la empresa,
+    # sus contadores de TicketStats se mueven a la nueva (ver estadisticas.py), y si
+    # pasa a atender tickets o deja de hacerlo, cambia el motor de asignación.
+    CAMPOS_ORIGINALES = ('nombre_empresa', 'is_staff', 'is_active')
+
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._recordar_valores_originales()
+        return instancia
+
+    def _recordar_valores_originales(self):
+        self._valores_originales = {
+            campo: self.__dict__[campo] for campo in self.CAMPOS_ORIGINALES if campo in self.__dict__
+        }
+
+    def save(self, *args, update_fields=None, **kwargs):
+        # Si puede cambiar la empresa, los contadores se mueven en post_save dentro de la
+        # misma transacción. Crear un usuario o guardar last_login sigue siendo una escritura.
+        if self._state.adding or (update_fields is not None and 'nombre_empresa' not in update_fields):
+            super().save(*args, update_fields=update_fields, **kwargs)
+        else:
+            with transaction.atomic():
+                super().save(*args, update_fields=update_fields, **kwargs)
+        # Después de todos los receptores de post_save, que comparan con los originales.
+        self._recordar_valores_originales()
+
     def clean(self):
         if not self.nombre_empresa:
             raise ValidationError("El nombre de la empresa es obligatorio.")
@@ -19,16 +63,64 @@ class CustomUser(AbstractUser):
 
 
 
-@receiver(post_save, sender=CustomUser)
-def asignar_empresa_automatica(sender, instance, created, **kwargs):
-    if created and not instance.nombre_empresa:
-        email = instance.email
-        dominio = email.split('@')[1].split('.')[0]  # Extrae el dominio
-        instance.nombre_empresa = dominio.upper()  # Convertir el dominio en mayúsculas
-        instance.save()
+def empresa_desde_email(email):
+    # "ana@acme.cl" -> "ACME"; sin '@' o sin dominio no hay empresa que derivar.
+    _, arroba, dominio = (email or '').partition('@')
+    nombre = dominio.split('.')[0] if arroba else ''
+    return nombre.upper() or None
+
+
+def asignar_empresas(usuarios):
+    # Para importaciones con bulk_create, que no emite pre_save: completa
+    # nombre_empresa en memoria, en una sola pasada y sin consultas.
+    for usuario in usuarios:
+        if not usuario.nombre_empresa:
+            usuario.nombre_empresa = empresa_desde_email(usuario.email)
+    return usuarios
+
+
+@receiver(pre_save, sender=CustomUser)
+def asignar_empresa_automatica(sender, instance, raw, **kwargs):
+    # Se completa antes del INSERT para que crear un usuario sea una sola escritura.
+    if not raw and instance._state.adding and not instance.nombre_empresa:
+        instance.nombre_empresa = empresa_desde_email(instance.email)
+
 
+ESTADOS_ABIERTOS = ('Pendiente', 'En Progreso')
 
 
+class TicketQuerySet(models.QuerySet):
+    def con_personas(self):
+        # Solicitante y técnico en la misma consulta (JOIN) en vez de una consulta por fila.
+        return self.select_related('usuario', 'tecnico_asignado')
+
+    def con_comentarios(self):
+        return self.prefetch_related(models.Prefetch(
+            'comentarios',
+            queryset=Comentario.objects.select_related('usuario').order_by('fecha_creacion'),
+        ))
+
+    def abiertos(self):
+        return self.filter(estado__in=ESTADOS_ABIERTOS)
+
+    def filtrar(self, estado=None, prioridad=None, desde=None, hasta=None, empresa=None, **otros):
+        # Acepta el cleaned_data completo de los formularios de filtro.
+        tickets = self
+        if estado:
+            tickets = tickets.filter(estado=estado)
+        if prioridad:
+            tickets = tickets.filter(prioridad=prioridad)
+        if empresa:
+            tickets = tickets.filter(usuario__nombre_empresa=empresa)
+        # Rangos sobre la columna (no fecha_creacion__date) para aprovechar los índices
+        if desde:
+            tickets = tickets.filter(fecha_creacion__gte=timezone.make_aware(
+                datetime.datetime.combine(desde, datetime.time.min)))
+        if hasta:
+            tickets = tickets.filter(fecha_creacion__lt=timezone.make_aware(
+                datetime.datetime.combine(hasta + datetime.timedelta(days=1), datetime.time.min)))
+        return tickets
+
 
 class Ticket(models.Model):
     ESTADO_CHOICES = [
@@ -44,8 +136,9 @@ class Ticket(models.Model):
 
     titulo = models.CharField(max_length=200)
     descripcion = models.TextField()
+    # Sin índice propio en las FK: los compuestos que empiezan por ellas (Meta.indexes) sirven igual.
     usuario = models.ForeignKey(
-        CustomUser, on_delete=models.CASCADE, related_name='tickets')
+        CustomUser, on_delete=models.CASCADE, related_name='tickets', db_index=False)
     estado = models.CharField(
         max_length=20, choices=ESTADO_CHOICES, default='Pendiente')
     prioridad = models.CharField(
@@ -53,14 +146,222 @@ class Ticket(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     tecnico_asignado = models.ForeignKey(
-        CustomUser, on_delete=models.SET_NULL, related_name='tickets_asignados_tecnico', blank=True, null=True)
+        CustomUser, on_delete=models.SET_NULL, related_name='tickets_asignados_tecnico', blank=True, null=True,
+        db_index=False)
     visita_terreno = models.BooleanField(default=False)
     solucion = models.TextField(blank=True, null=True)  
+    # Plazo de resolución según la prioridad (ver sla.py) y cuándo se detectó que se venció.
+    vence_sla = models.DateTimeField(blank=True, null=True)
+    sla_incumplido_en = models.DateTimeField(blank=True, null=True)
+    # Desde cuándo el ticket está en su estado actual (ver transiciones.py).
+    fecha_estado = models.DateTimeField(blank=True, null=True)
+
+    objects = TicketQuerySet.as_manager()
 
+    # Campos cuyo valor original se recuerda al cargar el ticket, para
+    # actualizar TicketStats sin volver a consultar la fila.
+    CAMPOS_ESTADISTICAS = (
+        'estado', 'prioridad', 'fecha_creacion', 'tecnico_asignado_id', 'usuario_id', 'sla_incumplido_en',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado'], name='ticket_estado_idx'),
+            models.Index(fields=['-fecha_creacion'], name='ticket_fecha_creacion_idx'),
+            models.Index(fields=['tecnico_asignado', 'estado'], name='ticket_tecnico_estado_idx'),
+            models.Index(fields=['usuario', 'fecha_creacion'], name='ticket_usuario_fecha_idx'),
+            # Marca de agua (MAX) para los ETag de la API
+            models.Index(fields=['fecha_actualizacion'], name='ticket_fecha_actualizacion_idx'),
+            # Índice parcial de tickets abiertos; lo aprovecha PostgreSQL.
+            models.Index(
+                fields=['-fecha_creacion'], name='ticket_abiertos_idx',
+                condition=models.Q(estado__in=ESTADOS_ABIERTOS),
+            ),
+            # Revisión de SLA: rango sobre vence_sla de los abiertos que aún no se marcan
+            # incumplidos. La condición no lleva parámetros, así que también la usa SQLite.
+            models.Index(
+                fields=['estado', 'vence_sla'], name='ticket_sla_por_vencer_idx',
+                condition=models.Q(sla_incumplido_en__isnull=True),
+            ),
+        ]
 
     def __str__(self):
         return f"Ticket #{self.id} - {self.titulo}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        instancia._recordar_valores_originales()
+        return instancia
+
+    def _recordar_valores_originales(self):
+        self._valores_originales = {
+            campo: self.__dict__[campo] for campo in self.CAMPOS_ESTADISTICAS if campo in self.__dict__
+        }
+
+    def save(self, *args, **kwargs):
+        # Los contadores se ajustan en post_save; la transacción los guarda junto con el ticket.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class TicketStats(models.Model):
+    DIMENSION_CHOICES = [
+        ('estado', 'Estado'),
+        ('prioridad', 'Prioridad'),
+        ('mes', 'Mes'),
+        ('tecnico', 'Técnico'),
+        ('empresa', 'Empresa'),
+        ('sla_tecnico', 'SLA por técnico'),
+        ('sla_empresa', 'SLA por empresa'),
+        ('encuesta_tecnico', 'Calificación por técnico'),
+        ('encuesta_empresa', 'Calificación por empresa'),
+        ('encuesta_mes', 'Calificación por mes'),
+    ]
+
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    clave = models.CharField(max_length=255, blank=True)  # '' representa un valor nulo
+    total = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'clave'], name='ticketstats_dimension_clave_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}={self.clave or '-'}: {self.total}"
+
+    @staticmethod
+    def clave_mes(fecha):
+        return timezone.localtime(fecha).strftime('%Y-%m')
+
+    @staticmethod
+    def clave_compuesta(valor, grupo):
+        # 'cumplido:5', '4:ACME', '5:2026-03'... el valor nunca lleva ':'.
+        return f'{valor}:{grupo}'
+
+    @classmethod
+    def ajustar(cls, dimension, clave, delta):
+        filtro = cls.objects.filter(dimension=dimension, clave=clave)
+        if not filtro.update(total=F('total') + delta):
+            cls.objects.get_or_create(dimension=dimension, clave=clave)
+            filtro.update(total=F('total') + delta)
+
+    @classmethod
+    def ajustar_varios(cls, deltas):
+        # deltas: {(dimension, clave): delta}. Siempre en el mismo orden, para que dos
+        # transacciones que mueven contadores en sentidos opuestos no se bloqueen mutuamente.
+        for (dimension, clave), delta in sorted(deltas.items()):
+            if delta:
+                cls.ajustar(dimension, clave, delta)
+
+
+_ajuste_estadisticas = threading.local()
+
+
+@contextmanager
+def estadisticas_en_bloque():
+    # Las operaciones masivas ajustan TicketStats con deltas agrupados; mientras
+    # tanto los receptores no ajustan fila por fila.
+    _ajuste_estadisticas.suspendido = True
+    try:
+        yield
+    finally:
+        _ajuste_estadisticas.suspendido = False
+
+
+def _empresa_de_usuario(usuario_id):
+    if usuario_id is None:
+        return ''
+    return CustomUser.objects.filter(pk=usuario_id).values_list('nombre_empresa', flat=True).first() or ''
+
+
+RESULTADOS_SLA = ('en_curso', 'cumplido', 'incumplido')
+
+
+def resultado_sla(estado, sla_incumplido_en):
+    # Misma regla que la expresión de calcular_estadisticas.
+    if sla_incumplido_en is not None:
+        return 'incumplido'
+    return 'en_curso' if estado in ESTADOS_ABIERTOS else 'cumplido'
+
+
+def _claves_estadisticas(valores, empresa):
+    resultado = resultado_sla(valores['estado'], valores['sla_incumplido_en'])
+    tecnico = str(valores['tecnico_asignado_id'] or '')
+    return {
+        'estado': valores['estado'] or '',
+        'prioridad': valores['prioridad'] or '',
+        'mes': TicketStats.clave_mes(valores['fecha_creacion']),
+        'tecnico': tecnico,
+        'empresa': empresa,
+        'sla_tecnico': TicketStats.clave_compuesta(resultado, tecnico),
+        'sla_empresa': TicketStats.clave_compuesta(resultado, empresa),
+    }
+
+
+@receiver(pre_save, sender=Ticket)
+def completar_valores_originales(sender, instance, raw, **kwargs):
+    # Un ticket cargado con only()/defer() no recuerda los campos diferidos: se leen antes
+    # del UPDATE (no cambian, porque save() solo escribe los campos cargados) para que
+    # post_save pueda comparar todos.
+    if raw or instance._state.adding or getattr(_ajuste_estadisticas, 'suspendido', False):
+        return
+    originales = getattr(instance, '_valores_originales', {})
+    faltantes = [campo for campo in Ticket.CAMPOS_ESTADISTICAS if campo not in originales]
+    if not faltantes:
+        return
+    valores = Ticket.objects.filter(pk=instance.pk).values(*faltantes).first() or {}
+    for campo, valor in valores.items():
+        originales[campo] = valor
+        instance.__dict__.setdefault(campo, valor)
+    instance._valores_originales = originales
+
+
+@receiver(post_save, sender=Ticket)
+def sumar_ticket_a_estadisticas(sender, instance, created, raw=False, **kwargs):
+    if raw or getattr(_ajuste_estadisticas, 'suspendido', False):
+        return
+    actuales = {campo: getattr(instance, campo) for campo in Ticket.CAMPOS_ESTADISTICAS}
+    originales = getattr(instance, '_valores_originales', {})
+    deltas = Counter()
+    if created:
+        empresa = instance.usuario.nombre_empresa or ''
+        for dimension, clave in _claves_estadisticas(actuales, empresa).items():
+            deltas[(dimension, clave)] += 1
+    elif len(originales) == len(Ticket.CAMPOS_ESTADISTICAS) and originales != actuales:
+        # La empresa solo cambia si cambia el solicitante, y solo se necesita si cambia ese
+        # o el resultado de SLA; se evita la consulta en el caso común.
+        if originales['usuario_id'] == actuales['usuario_id']:
+            mismo_resultado = (resultado_sla(originales['estado'], originales['sla_incumplido_en'])
+                               == resultado_sla(actuales['estado'], actuales['sla_incumplido_en']))
+            empresa_anterior = empresa_actual = '' if mismo_resultado else instance.usuario.nombre_empresa or ''
+        else:
+            empresa_anterior = _empresa_de_usuario(originales['usuario_id'])
+            empresa_actual = instance.usuario.nombre_empresa or ''
+        anteriores = _claves_estadisticas(originales, empresa_anterior)
+        nuevas = _claves_estadisticas(actuales, empresa_actual)
+        for dimension, clave in nuevas.items():
+            if anteriores[dimension] != clave:
+                deltas[(dimension, anteriores[dimension])] -= 1
+                deltas[(dimension, clave)] += 1
+        if anteriores['tecnico'] != nuevas['tecnico'] or originales['usuario_id'] != actuales['usuario_id']:
+            deltas.update(_mover_encuesta(instance, anteriores, nuevas))
+    TicketStats.ajustar_varios(deltas)
+    instance._recordar_valores_originales()
+
+
+@receiver(post_delete, sender=Ticket)
+def restar_ticket_de_estadisticas(sender, instance, **kwargs):
+    if getattr(_ajuste_estadisticas, 'suspendido', False):
+        return
+    valores = {campo: getattr(instance, campo) for campo in Ticket.CAMPOS_ESTADISTICAS}
+    if Ticket.usuario.is_cached(instance):
+        empresa = instance.usuario.nombre_empresa or ''
+    else:
+        empresa = _empresa_de_usuario(instance.usuario_id)
+    TicketStats.ajustar_varios(dict.fromkeys(_claves_estadisticas(valores, empresa).items(), -1))
+
 
 class Comentario(models.Model):
     ticket = models.ForeignKey(
@@ -70,7 +371,10 @@ class Comentario(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"Comentario por {self.usuario.username} en Ticket #{self.ticket.id}"
+        return f"Comentario por {self.usuario.username} en Ticket #{self.ticket_id}"
+
+
+CALIFICACIONES = range(1, 6)
 
 
 class Encuesta(models.Model):
@@ -80,13 +384,158 @@ class Encuesta(models.Model):
     comentarios = models.TextField(blank=True, null=True)
     fecha_creacion = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Rango por mes del resumen mensual
+            models.Index(fields=['fecha_creacion'], name='encuesta_fecha_creacion_idx'),
+        ]
+
     def __str__(self):
-        return f"Encuesta para Ticket #{self.ticket.id} - Calificación: {self.calificacion}"
+        return f"Encuesta para Ticket #{self.ticket_id} - Calificación: {self.calificacion}"
+
+
+def _claves_encuesta(calificacion, fecha_creacion, tecnico, empresa):
+    return {
+        'encuesta_tecnico': TicketStats.clave_compuesta(calificacion, tecnico),
+        'encuesta_empresa': TicketStats.clave_compuesta(calificacion, empresa),
+        'encuesta_mes': TicketStats.clave_compuesta(calificacion, TicketStats.clave_mes(fecha_creacion)),
+    }
+
+
+def _ajustar_encuesta(encuesta, delta):
+    # Un contador por calificación (1 a 5) y grupo: el promedio y la distribución salen
+    # de los mismos totales, sin volver a agregar las encuestas.
+    if Encuesta.ticket.is_cached(encuesta):
+        ticket = encuesta.ticket
+        tecnico_id = ticket.tecnico_asignado_id
+        if Ticket.usuario.is_cached(ticket):
+            empresa = ticket.usuario.nombre_empresa
+        else:
+            empresa = _empresa_de_usuario(ticket.usuario_id)
+    else:
+        tecnico_id, empresa = Ticket.objects.filter(pk=encuesta.ticket_id).values_list(
+            'tecnico_asignado_id', 'usuario__nombre_empresa').first() or (None, None)
+    claves = _claves_encuesta(encuesta.calificacion, encuesta.fecha_creacion, str(tecnico_id or ''), empresa or '')
+    TicketStats.ajustar_varios(dict.fromkeys(claves.items(), delta))
+
+
+def _mover_encuesta(ticket, anteriores, nuevas):
+    # Un ticket calificado que cambia de técnico o de solicitante lleva su calificación al nuevo grupo.
+    deltas = Counter()
+    calificacion = Encuesta.objects.filter(ticket=ticket).values_list('calificacion', flat=True).first()
+    if calificacion is None:
+        return deltas
+    for dimension, grupo in (('encuesta_tecnico', 'tecnico'), ('encuesta_empresa', 'empresa')):
+        if anteriores[grupo] != nuevas[grupo]:
+            deltas[(dimension, TicketStats.clave_compuesta(calificacion, anteriores[grupo]))] -= 1
+            deltas[(dimension, TicketStats.clave_compuesta(calificacion, nuevas[grupo]))] += 1
+    return deltas
+
+
+@receiver(post_save, sender=Encuesta)
+def sumar_encuesta_a_estadisticas(sender, instance, created, raw=False, **kwargs):
+    # Las encuestas no se editan desde el sitio: solo se cuentan al crearse.
+    if created and not raw and not getattr(_ajuste_estadisticas, 'suspendido', False):
+        _ajustar_encuesta(instance, 1)
+
+
+@receiver(post_delete, sender=Encuesta)
+def restar_encuesta_de_estadisticas(sender, instance, **kwargs):
+    if not getattr(_ajuste_estadisticas, 'suspendido', False):
+        _ajustar_encuesta(instance, -1)
+
+
+class TransicionEstado(models.Model):
+    # Registro de solo inserción: una fila por cada cambio de estado, escrita en la
+    # misma transacción que el ticket. estado_anterior es nulo al crear el ticket.
+    ticket = models.ForeignKey(Ticket, on_delete=models.CASCADE, related_name='transiciones')
+    estado_anterior = models.CharField(max_length=20, choices=Ticket.ESTADO_CHOICES, blank=True, null=True)
+    estado_nuevo = models.CharField(max_length=20, choices=Ticket.ESTADO_CHOICES)
+    fecha = models.DateTimeField(default=timezone.now)
+    # Técnico a cargo durante el estado que termina y cuánto duró ese estado.
+    tecnico = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, related_name='+', blank=True, null=True)
+    segundos_en_anterior = models.PositiveIntegerField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['ticket', 'fecha'], name='transicion_ticket_fecha_idx'),
+            models.Index(fields=['fecha'], name='transicion_fecha_idx'),
+        ]
+
+    def __str__(self):
+        return f"Ticket #{self.ticket_id}: {self.estado_anterior or '-'} -> {self.estado_nuevo}"
+
+
+class TiempoEstado(models.Model):
+    # Resumen mensual materializado desde TransicionEstado (comando materializar_tiempos_estado).
+    DIMENSION_CHOICES = [
+        ('total', 'Total'),
+        ('tecnico', 'Técnico'),
+        ('empresa', 'Empresa'),
+    ]
+
+    mes = models.DateField()  # Primer día del mes en que terminó el estado
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    clave = models.CharField(max_length=255, blank=True)  # '' representa un valor nulo
+    estado = models.CharField(max_length=20, choices=Ticket.ESTADO_CHOICES)
+    cantidad = models.PositiveIntegerField()
+    promedio_segundos = models.FloatField()
+    p50_segundos = models.PositiveIntegerField()
+    p90_segundos = models.PositiveIntegerField()
+    calculado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['mes', 'dimension', 'clave', 'estado'], name='tiempoestado_mes_dimension_clave_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.mes:%Y-%m} {self.dimension}={self.clave or '-'} {self.estado}: {self.p50_segundos} s"
+
+
+class ResumenMensual(models.Model):
+    # Actividad de cada mes, materializada por actualizar_resumen_mensual. Cada hecho
+    # cuenta en el mes en que ocurrió: tickets y visitas por fecha de creación,
+    # resoluciones por su transición a Resuelto y encuestas por su fecha. Los meses
+    # cerrados no se vuelven a calcular.
+    DIMENSION_CHOICES = [
+        ('total', 'Total'),
+        ('empresa', 'Empresa'),
+        ('tecnico', 'Técnico'),
+    ]
+
+    mes = models.DateField()
+    dimension = models.CharField(max_length=20, choices=DIMENSION_CHOICES)
+    clave = models.CharField(max_length=255, blank=True)  # '' representa un valor nulo
+    tickets = models.PositiveIntegerField(default=0)
+    resueltos = models.PositiveIntegerField(default=0)
+    visitas_terreno = models.PositiveIntegerField(default=0)
+    encuestas = models.PositiveIntegerField(default=0)
+    suma_calificaciones = models.PositiveIntegerField(default=0)
+    cerrado = models.BooleanField(default=False)
+    calculado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dimension', 'mes', 'clave'], name='resumenmensual_dimension_mes_clave_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.mes:%Y-%m} {self.dimension}={self.clave or '-'}: {self.tickets} tickets"
+
+    @property
+    def promedio_calificacion(self):
+        return round(self.suma_calificaciones / self.encuestas, 2) if self.encuestas else None
+
 
 class RegistroErrores(models.Model):
     tipo_error = models.CharField(max_length=50)  # Ejemplo: '404', '500'
     descripcion = models.TextField()
     fecha_ocurrencia = models.DateTimeField(auto_now_add=True)
+    ruta = models.CharField(max_length=500, blank=True, default='')
+    ocurrencias = models.PositiveIntegerField(default=1)  # Repeticiones agrupadas en un mismo vaciado
 
     def __str__(self):
         return f"Error {self.tipo_error} - {self.fecha_ocurrencia}"
@@ -0,0 +1,87 @@
+from collections import Counter
+
+from django.db import transaction
+from django.utils import timezone
+
+from .asignacion import motor_asignacion
+from .estadisticas import calcular_estadisticas, invalidar_agregados_dashboard
+from .models import ESTADOS_ABIERTOS, Ticket, TicketStats, estadisticas_en_bloque
+from .sla import recalcular_vencimientos, vencidos_sin_marcar
+from .transiciones import registrar_transiciones_en_bloque
+
+# Dimensiones de TicketStats que cambian con cada campo editable en bloque.
+DIMENSIONES_POR_CAMPO = {
+    'estado': ('estado', 'sla_tecnico', 'sla_empresa'),
+    'prioridad': ('prioridad',),
+    'tecnico_asignado': ('tecnico', 'sla_tecnico', 'encuesta_tecnico'),
+}
+DIMENSIONES_SLA = ('sla_tecnico', 'sla_empresa')
+
+
+# ---- Operaciones Masivas de Tickets ----
+def _bloquear(ids):
+    # Bloquea las filas para que nadie las cambie entre el conteo y la escritura.
+    bloqueados = list(Ticket.objects.select_for_update().filter(pk__in=ids).values_list('pk', flat=True))
+    return Ticket.objects.filter(pk__in=bloqueados)
+
+
+def _aplicar_diferencia(antes, despues):
+    diferencia = Counter(despues)
+    diferencia.subtract(antes)
+    TicketStats.ajustar_varios(diferencia)
+
+
+def actualizar_tickets(ids, **cambios):
+    # Un solo UPDATE ... WHERE id IN (...) con los contadores ajustados por grupo.
+    dimensiones = list(dict.fromkeys(
+        dimension for campo in cambios for dimension in DIMENSIONES_POR_CAMPO[campo]))
+    ahora = timezone.now()
+    with transaction.atomic():
+        tickets = _bloquear(ids)
+        antes = calcular_estadisticas(tickets, dimensiones)
+        if 'estado' in cambios:
+            registrar_transiciones_en_bloque(tickets, cambios['estado'], ahora)
+            if cambios['estado'] not in ESTADOS_ABIERTOS:
+                vencidos_sin_marcar(tickets, ahora).update(sla_incumplido_en=ahora)
+        actualizados = tickets.update(fecha_actualizacion=ahora, **cambios)
+        if 'prioridad' in cambios:
+            recalcular_vencimientos(tickets)
+        _aplicar_diferencia(antes, calcular_estadisticas(tickets, dimensiones))
+        transaction.on_commit(invalidar_agregados_dashboard)
+        # El UPDATE no emite señales: el motor de asignación del proceso queda descartado
+        # hasta que el comando asignar_pendientes lo recargue y reparta la cola.
+        transaction.on_commit(motor_asignacion.invalidar)
+    return actualizados
+
+
+def marcar_sla_incumplido(ids, ahora):
+    # Solo se marcan los que siguen abiertos y sin marcar al tomar el bloqueo.
+    with transaction.atomic():
+        tickets = _bloquear(ids)
+        antes = calcular_estadisticas(tickets, DIMENSIONES_SLA)
+        marcados = vencidos_sin_marcar(tickets, ahora).update(sla_incumplido_en=ahora)
+        _aplicar_diferencia(antes, calcular_estadisticas(tickets, DIMENSIONES_SLA))
+        if marcados:
+            transaction.on_commit(invalidar_agregados_dashboard)
+    return marcados
+
+
+def revisar_vencimientos(ahora=None, lote=500):
+    # Recorre por lotes los abiertos con el plazo vencido que aún no se marcan.
+    ahora = ahora or timezone.now()
+    marcados = 0
+    vencidos = vencidos_sin_marcar(Ticket.objects.all(), ahora).values_list('pk', flat=True)
+    while ids := list(vencidos[:lote]):
+        marcados += marcar_sla_incumplido(ids, ahora)
+    return marcados
+
+
+def eliminar_tickets(ids):
+    with transaction.atomic(), estadisticas_en_bloque():
+        tickets = _bloquear(ids)
+        antes = calcular_estadisticas(tickets)
+        tickets.delete()
+        _aplicar_diferencia(antes, {})
+        transaction.on_commit(invalidar_agregados_dashboard)
+        transaction.on_commit(motor_asignacion.invalidar)
+    return sum(total for (dimension, _), total in antes.items() if dimension == 'estado')
@@ -0,0 +1,47 @@
+import base64
+import datetime
+
+from django.db.models import Q
+
+# ---- Paginación por Cursor (keyset) ----
+# Las páginas se recorren por (fecha_creacion, id) descendente: cada página filtra
+# "menor que la última fila vista" en vez de usar OFFSET, así la página 500 cuesta
+# lo mismo que la primera.
+
+def codificar_cursor(fecha, pk):
+    texto = f"{fecha.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(texto.encode()).decode().rstrip('=')
+
+
+def decodificar_cursor(cursor):
+    try:
+        relleno = '=' * (-len(cursor) % 4)
+        fecha, pk = base64.urlsafe_b64decode(cursor + relleno).decode().split('|')
+        return datetime.datetime.fromisoformat(fecha), int(pk)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def despues_de(queryset, fecha, pk):
+    # Filas posteriores a (fecha, pk) en el orden descendente. El rango sobre
+    # fecha_creacion es el que recorre el índice; el OR solo descarta las filas ya vistas
+    # con la misma fecha. Con el OR solo, SQLite recorre el índice completo.
+    return queryset.filter(fecha_creacion__lte=fecha).filter(Q(fecha_creacion__lt=fecha) | Q(id__lt=pk))
+
+
+def paginar_por_cursor(queryset, cursor=None, tamano=25):
+    # El queryset debe incluir 'id' y 'fecha_creacion'. Devuelve (filas, cursor_siguiente).
+    queryset = queryset.order_by('-fecha_creacion', '-id')
+    posicion = decodificar_cursor(cursor) if cursor else None
+    if posicion:
+        queryset = despues_de(queryset, *posicion)
+    filas = list(queryset[:tamano + 1])
+    siguiente = None
+    if len(filas) > tamano:
+        filas = filas[:tamano]
+        ultima = filas[-1]
+        if isinstance(ultima, dict):
+            siguiente = codificar_cursor(ultima['fecha_creacion'], ultima['id'])
+        else:
+            siguiente = codificar_cursor(ultima.fecha_creacion, ultima.id)
+    return filas, siguiente
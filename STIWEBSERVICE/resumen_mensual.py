@@ -0,0 +1,81 @@
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from .models import Encuesta, ResumenMensual, Ticket, TransicionEstado
+from .transiciones import inicio_de_mes, limites_mes
+
+# ---- Resumen Mensual ----
+# Se recalcula solo el mes en curso. Un mes terminado se calcula una última vez
+# en la primera actualización posterior y queda cerrado: la fila 'total' (que
+# existe aunque el mes no tenga actividad) marca qué meses ya se cerraron.
+
+def _consultas_mes(mes):
+    inicio, fin = limites_mes(mes)
+    tickets = Ticket.objects.filter(fecha_creacion__gte=inicio, fecha_creacion__lt=fin)
+    resoluciones = TransicionEstado.objects.filter(fecha__gte=inicio, fecha__lt=fin, estado_nuevo='Resuelto')
+    encuestas = Encuesta.objects.filter(fecha_creacion__gte=inicio, fecha_creacion__lt=fin)
+    por_ticket = {'tickets': Count('id'), 'visitas_terreno': Count('id', filter=Q(visita_terreno=True))}
+    por_resolucion = {'resueltos': Count('id')}
+    por_encuesta = {'encuestas': Count('id'), 'suma_calificaciones': Sum('calificacion')}
+    # (dimensión, consulta, campo que da la clave, agregados por campo del resumen)
+    return [
+        ('empresa', tickets, 'usuario__nombre_empresa', por_ticket),
+        ('empresa', resoluciones, 'ticket__usuario__nombre_empresa', por_resolucion),
+        ('empresa', encuestas, 'ticket__usuario__nombre_empresa', por_encuesta),
+        ('tecnico', tickets, 'tecnico_asignado_id', por_ticket),
+        ('tecnico', resoluciones, 'tecnico_id', por_resolucion),
+        ('tecnico', encuestas, 'ticket__tecnico_asignado_id', por_encuesta),
+    ]
+
+
+def calcular_mes(mes, cerrar=False):
+    # Seis consultas agrupadas, acotadas al mes por índice; el total se suma en memoria.
+    valores = defaultdict(lambda: defaultdict(int))
+    for dimension, consulta, campo_clave, agregados in _consultas_mes(mes):
+        filas = consulta.values(campo_clave).annotate(**agregados).order_by().values_list(campo_clave, *agregados)
+        for clave, *totales in filas:
+            for campo, total in zip(agregados, totales, strict=True):
+                valores[(dimension, '' if clave is None else str(clave))][campo] += total or 0
+    # Cada ticket, resolución y encuesta pertenece a exactamente una empresa ('' si no tiene).
+    total = valores[('total', '')]
+    for (dimension, _), campos in list(valores.items()):
+        if dimension == 'empresa':
+            for campo, valor in campos.items():
+                total[campo] += valor
+
+    ahora = timezone.now()
+    with transaction.atomic():
+        ResumenMensual.objects.filter(mes=mes, cerrado=False).delete()
+        ResumenMensual.objects.bulk_create(
+            ResumenMensual(mes=mes, dimension=dimension, clave=clave, cerrado=cerrar, calculado_en=ahora, **campos)
+            for (dimension, clave), campos in valores.items()
+        )
+    return len(valores)
+
+
+def meses_por_cerrar(actual):
+    # Meses anteriores al actual, desde el primer ticket, que aún no tienen su fila 'total' cerrada.
+    primero = Ticket.objects.aggregate(primero=Min('fecha_creacion'))['primero']
+    if primero is None:
+        return []
+    cerrados = set(ResumenMensual.objects.filter(dimension='total', cerrado=True).values_list('mes', flat=True))
+    meses = []
+    mes = inicio_de_mes(timezone.localtime(primero).date())
+    while mes < actual:
+        if mes not in cerrados:
+            meses.append(mes)
+        mes = (mes + datetime.timedelta(days=32)).replace(day=1)
+    return meses
+
+
+def actualizar_resumen_mensual(hoy=None):
+    actual = inicio_de_mes(hoy or timezone.localdate())
+    calculados = {}
+    for mes in meses_por_cerrar(actual):
+        calculados[mes] = calcular_mes(mes, cerrar=True)
+    calculados[actual] = calcular_mes(actual)
+    return calculados
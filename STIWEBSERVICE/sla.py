@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import ESTADOS_ABIERTOS, Ticket
+
+# ---- Plazos de SLA ----
+# vence_sla = fecha_creacion + SLA_HORAS[prioridad], guardado en el ticket para que
+# la revisión sea un rango sobre el índice ticket_sla_por_vencer_idx. Un ticket
+# sin prioridad no tiene plazo. Un incumplimiento ya registrado no se borra aunque
+# después se baje la prioridad.
+
+def calcular_vencimiento(fecha_creacion, prioridad):
+    horas = settings.SLA_HORAS.get(prioridad)
+    return None if horas is None else fecha_creacion + timedelta(hours=horas)
+
+
+def recalcular_vencimientos(tickets):
+    # Para QuerySet.update y bulk_create, que no pasan por pre_save: un UPDATE por prioridad.
+    for prioridad, horas in settings.SLA_HORAS.items():
+        tickets.filter(prioridad=prioridad).update(vence_sla=F('fecha_creacion') + timedelta(hours=horas))
+    tickets.exclude(prioridad__in=list(settings.SLA_HORAS)).update(vence_sla=None)
+
+
+def vencidos_sin_marcar(tickets, ahora):
+    # Abiertos con el plazo vencido que aún no se marcan incumplidos (también los que
+    # se cierran ahora fuera de plazo).
+    return tickets.filter(estado__in=ESTADOS_ABIERTOS, sla_incumplido_en__isnull=True, vence_sla__lt=ahora)
+
+
+@receiver(pre_save, sender=Ticket)
+def fijar_vencimiento_sla(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    ahora = timezone.now()
+    # Al crear, auto_now_add fija fecha_creacion después de este receptor.
+    instance.vence_sla = calcular_vencimiento(instance.fecha_creacion or ahora, instance.prioridad)
+    estado_anterior = getattr(instance, '_valores_originales', {}).get('estado')
+    if (estado_anterior in ESTADOS_ABIERTOS and instance.estado not in ESTADOS_ABIERTOS
+            and instance.sla_incumplido_en is None
+            and instance.vence_sla is not None and instance.vence_sla < ahora):
+        instance.sla_incumplido_en = ahora
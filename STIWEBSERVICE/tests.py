@@ -1,3 +1,1371 @@
-from django.test import TestCase
+import io
+import json
+from collections import OrderedDict
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import Permission
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .admin import TicketAdmin
+from .asignacion import (
+    MotorAsignacion,
+    elegir_tecnico,
+    motor_asignacion,
+    resincronizar,
+)
+from .autenticacion import usuarios_por_email
+from .busqueda import buscar_tickets
+from .datos_prueba import sembrar_datos
+from .errores import BufferErrores, buffer_errores
+from .estadisticas import (
+    CLAVE_AGREGADOS,
+    CLAVE_RECALCULO,
+    acontar_tickets_por_estado,
+    agregados_dashboard,
+    calcular_estadisticas,
+    contar_tickets_por_estado,
+    diferencias_estadisticas,
+    invalidar_agregados_dashboard,
+    obtener_agregados_dashboard,
+)
+from .importacion import importar_usuarios, leer_usuarios_csv
+from .limites import consumir_ficha
+from .middleware import huella_sql
+from .models import (
+    ESTADOS_ABIERTOS,
+    Comentario,
+    CustomUser,
+    Encuesta,
+    RegistroErrores,
+    ResumenMensual,
+    Ticket,
+    TicketStats,
+    TiempoEstado,
+    TransicionEstado,
+    asignar_empresas,
+    empresa_desde_email,
+)
+from .operaciones_masivas import actualizar_tickets
+from .paginacion import despues_de, paginar_por_cursor
+from .resumen_mensual import actualizar_resumen_mensual
+from .sla import vencidos_sin_marcar
+
+
+class ContarTicketsPorEstadoTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+        for estado in ['Pendiente', 'Pendiente', 'En Progreso', 'Resuelto']:
+            Ticket.objects.create(
+                titulo='Falla', descripcion='Detalle', usuario=cls.usuario, estado=estado)
+
+    def test_una_sola_consulta(self):
+        with self.assertNumQueries(1):
+            contadores = contar_tickets_por_estado()
+        self.assertEqual(contadores, {
+            'tickets_total': 4,
+            'tickets_pendientes': 2,
+            'tickets_en_proceso': 1,
+            'tickets_resueltos': 1,
+        })
+
+
+class TicketStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='clave-segura-123',
+            nombre_empresa='STI', first_name='Ana', last_name='Rojas', is_staff=True)
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+
+    def total(self, dimension, clave):
+        return TicketStats.objects.filter(dimension=dimension, clave=clave).values_list('total', flat=True).first() or 0
+
+    def test_contadores_siguen_cambios_de_estado_y_eliminacion(self):
+        ticket = Ticket.objects.create(titulo='Falla', descripcion='Detalle', usuario=self.cliente)
+        self.assertEqual(self.total('estado', 'Pendiente'), 1)
+        self.assertEqual(self.total('empresa', 'ACME'), 1)
+
+        self.client.force_login(self.tecnico)
+        self.client.post(reverse('detalleticket', args=[ticket.id]), {
+            'estado': 'En Progreso', 'prioridad': 'Alta', 'solucion': '',
+        })
+        self.assertEqual(self.total('estado', 'Pendiente'), 0)
+        self.assertEqual(self.total('estado', 'En Progreso'), 1)
+        self.assertEqual(self.total('prioridad', 'Alta'), 1)
+        self.assertEqual(self.total('tecnico', str(self.tecnico.pk)), 1)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+        self.client.post(reverse('eliminar_ticket', args=[ticket.id]))
+        self.assertEqual(self.total('estado', 'En Progreso'), 0)
+        self.assertEqual(self.total('empresa', 'ACME'), 0)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+    def test_cambiar_empresa_del_usuario_mueve_sus_contadores(self):
+        ticket = Ticket.objects.create(
+            titulo='Falla', descripcion='Detalle', usuario=self.cliente, tecnico_asignado=self.tecnico)
+        Encuesta.objects.create(ticket=ticket, calificacion=4)
+        cliente = CustomUser.objects.get(pk=self.cliente.pk)
+        cliente.nombre_empresa = 'ACME SPA'
+        cliente.save()
+        self.assertEqual(self.total('empresa', 'ACME'), 0)
+        self.assertEqual(self.total('empresa', 'ACME SPA'), 1)
+        self.assertEqual(self.total('encuesta_empresa', '4:ACME SPA'), 1)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+        with self.assertNumQueries(1):
+            cliente.save(update_fields=['last_login'])
+
+    def test_eliminar_tecnico_deja_sus_tickets_sin_asignar_en_los_contadores(self):
+        otro = CustomUser.objects.create_user(
+            username='tecnico2', email='tecnico2@sti.cl', password='x', nombre_empresa='STI', is_staff=True)
+        ticket = Ticket.objects.create(titulo='Falla', descripcion='Detalle', usuario=self.cliente,
+                                       tecnico_asignado=otro, estado='Resuelto')
+        Encuesta.objects.create(ticket=ticket, calificacion=5)
+        # Ticket propio del técnico: se elimina en cascada.
+        Ticket.objects.create(titulo='Propio', descripcion='Detalle', usuario=otro, tecnico_asignado=otro)
+        otro.delete()
+        self.assertEqual(self.total('tecnico', ''), 1)
+        self.assertEqual(self.total('sla_tecnico', 'cumplido:'), 1)
+        self.assertEqual(self.total('encuesta_tecnico', '5:'), 1)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+    def test_guardar_ticket_con_campos_diferidos_ajusta_contadores(self):
+        ticket = Ticket.objects.create(titulo='Falla', descripcion='Detalle', usuario=self.cliente)
+        diferido = Ticket.objects.only('id', 'titulo').get(pk=ticket.pk)
+        diferido.estado = 'En Progreso'
+        diferido.tecnico_asignado = self.tecnico
+        diferido.save()
+        self.assertEqual(self.total('estado', 'Pendiente'), 0)
+        self.assertEqual(self.total('tecnico', str(self.tecnico.pk)), 1)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+    def test_agregados_dashboard_sin_recorrer_tickets(self):
+        Ticket.objects.create(
+            titulo='Falla', descripcion='Detalle', usuario=self.cliente, tecnico_asignado=self.tecnico)
+        Ticket.objects.create(titulo='Otra', descripcion='Detalle', usuario=self.cliente)
+        with self.assertNumQueries(4):
+            agregados = agregados_dashboard()
+        self.assertEqual(agregados['tickets_por_empresa'], [{'empresa': 'ACME', 'total': 2}])
+        self.assertCountEqual(agregados['tickets_por_tecnico'], [
+            {'tecnico': 'Ana Rojas', 'total': 1},
+            {'tecnico': 'Sin asignar', 'total': 1},
+        ])
+        self.assertEqual(sum(fila['total'] for fila in agregados['tickets_por_mes']), 2)
+
+
+class IndicesTicketTests(TestCase):
+    # Regresión: cada consulta frecuente debe usar su índice según EXPLAIN.
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+        Ticket.objects.create(titulo='Falla', descripcion='Detalle', usuario=cls.usuario)
+
+    def plan(self, queryset):
+        if connection.vendor == 'postgresql':
+            # Con tablas pequeñas el planificador prefiere recorrerlas completas.
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                return queryset.explain()
+        return queryset.explain()
+
+    def test_consultas_frecuentes_usan_indices(self):
+        consultas = {
+            'ticket_estado_idx': Ticket.objects.filter(estado='Pendiente').values('id'),
+            'ticket_fecha_creacion_idx': Ticket.objects.order_by('-fecha_creacion')[:5],
+            'ticket_tecnico_estado_idx': Ticket.objects.filter(
+                tecnico_asignado=self.usuario, estado='En Progreso').values('id'),
+            'ticket_usuario_fecha_idx': Ticket.objects.filter(
+                usuario=self.usuario).order_by('fecha_creacion'),
+        }
+        if connection.vendor == 'postgresql':
+            # SQLite no usa índices parciales cuando la condición llega como parámetro.
+            consultas['ticket_abiertos_idx'] = Ticket.objects.filter(
+                estado__in=ESTADOS_ABIERTOS).order_by('-fecha_creacion')[:5]
+        consultas['ticket_sla_por_vencer_idx'] = vencidos_sin_marcar(Ticket.objects.all(), timezone.now()).values('id')
+        consultas['customuser_email_lower_unico'] = usuarios_por_email('Cliente@acme.cl')
+        for indice, queryset in consultas.items():
+            with self.subTest(indice=indice):
+                self.assertIn(indice, self.plan(queryset))
+
+    def test_fk_sin_indice_redundante(self):
+        with connection.cursor() as cursor:
+            restricciones = connection.introspection.get_constraints(cursor, Ticket._meta.db_table)
+        indices = [r['columns'] for r in restricciones.values() if r['index'] and not r['unique']]
+        self.assertNotIn(['usuario_id'], indices)
+        self.assertNotIn(['tecnico_asignado_id'], indices)
+        self.assertIn(['usuario_id', 'fecha_creacion'], indices)
+        self.assertIn(['tecnico_asignado_id', 'estado'], indices)
+
+    def test_pagina_siguiente_busca_por_rango(self):
+        tickets = Ticket.objects.order_by('-fecha_creacion', '-id').values('id', 'fecha_creacion')
+        plan = self.plan(despues_de(tickets, timezone.now(), 0)[:26])
+        self.assertIn('ticket_fecha_creacion_idx', plan)
+        if connection.vendor == 'sqlite':
+            self.assertIn('SEARCH', plan)
+
+
+class CacheAgregadosDashboardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_se_sirve_desde_cache_hasta_que_cambia_un_ticket(self):
+        obtener_agregados_dashboard()
+        with self.assertNumQueries(0):
+            obtener_agregados_dashboard()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(titulo='Falla', descripcion='Detalle', usuario=self.cliente)
+        agregados = obtener_agregados_dashboard()
+        self.assertEqual(agregados['tickets_por_empresa'], [{'empresa': 'ACME', 'total': 1}])
+
+    @override_settings(DASHBOARD_CACHE_TTL=0, DASHBOARD_CACHE_STALE=60)
+    def test_valor_vencido_se_sirve_mientras_otro_recalcula(self):
+        obtener_agregados_dashboard()
+        cache.add(CLAVE_RECALCULO, True)
+        with self.assertNumQueries(0):
+            obtener_agregados_dashboard()
+        cache.delete(CLAVE_RECALCULO)
+        with self.assertNumQueries(3):
+            obtener_agregados_dashboard()
+
+    def test_invalidada_se_sirve_vencida_mientras_otro_recalcula(self):
+        anteriores = obtener_agregados_dashboard()
+        with self.captureOnCommitCallbacks(execute=True):
+            Ticket.objects.create(titulo='Falla', descripcion='Detalle', usuario=self.cliente)
+        cache.add(CLAVE_RECALCULO, True)
+        with self.assertNumQueries(0):
+            self.assertEqual(obtener_agregados_dashboard(), anteriores)
+
+    def test_cache_vacia_sin_candado_calcula_sin_guardar(self):
+        cache.add(CLAVE_RECALCULO, True)
+        with mock.patch('STIWEBSERVICE.estadisticas.time.sleep') as dormir:
+            obtener_agregados_dashboard()
+        dormir.assert_not_called()
+        self.assertTrue(cache.get(CLAVE_RECALCULO))
+        self.assertIsNone(cache.get(CLAVE_AGREGADOS))
+
+    def test_cambio_durante_el_calculo_no_deja_vigente_la_entrada(self):
+        def calcular_y_cambiar():
+            invalidar_agregados_dashboard()
+            return {'tickets_por_mes': []}
+
+        with mock.patch('STIWEBSERVICE.estadisticas.agregados_dashboard', side_effect=calcular_y_cambiar):
+            obtener_agregados_dashboard()
+        with self.assertNumQueries(3):
+            obtener_agregados_dashboard()
+
+
+class HistorialTicketTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+        otro = CustomUser.objects.create_user(
+            username='otro', email='otro@beta.cl', password='clave-segura-123',
+            nombre_empresa='BETA')
+        for i, estado in enumerate(['Pendiente', 'Resuelto', 'Pendiente', 'Resuelto', 'Pendiente']):
+            Ticket.objects.create(titulo=f'Ticket {i}', descripcion='Detalle', usuario=cls.cliente, estado=estado)
+        Ticket.objects.create(titulo='Ajeno', descripcion='Detalle', usuario=otro)
+
+    def test_paginas_por_cursor_sin_repetir_filas(self):
+        tickets = Ticket.objects.filter(usuario=self.cliente).values('id', 'fecha_creacion')
+        vistos = []
+        cursor = None
+        while True:
+            pagina, cursor = paginar_por_cursor(tickets, cursor, tamano=2)
+            vistos.extend(fila['id'] for fila in pagina)
+            if cursor is None:
+                break
+        esperados = list(tickets.order_by('-fecha_creacion', '-id').values_list('id', flat=True))
+        self.assertEqual(vistos, esperados)
+
+    def test_filtra_por_estado_y_solo_tickets_propios(self):
+        self.client.force_login(self.cliente)
+        respuesta = self.client.get(reverse('historial'), {'estado': 'Resuelto'})
+        self.assertEqual(respuesta.status_code, 200)
+        titulos = [ticket['titulo'] for ticket in respuesta.context['tickets']]
+        self.assertEqual(titulos, ['Ticket 3', 'Ticket 1'])
+
+    def test_cursor_invalido_vuelve_a_la_primera_pagina(self):
+        self.client.force_login(self.cliente)
+        respuesta = self.client.get(reverse('historial'), {'despues': 'no-es-un-cursor'})
+        self.assertEqual(len(respuesta.context['tickets']), 5)
+
+
+class PresupuestoConsultasTests(TestCase):
+    # El número de consultas no debe crecer con la cantidad de filas.
+    TAMANOS = (1, 100, 1000)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='clave-segura-123',
+            nombre_empresa='STI', is_staff=True)
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+
+    def crear_tickets(self, cantidad):
+        Ticket.objects.bulk_create(
+            Ticket(titulo=f'Ticket {i}', descripcion='Detalle', usuario=self.cliente,
+                   tecnico_asignado=self.tecnico, estado='Resuelto')
+            for i in range(cantidad)
+        )
+        return Ticket.objects.filter(usuario=self.cliente)
+
+    def test_detalle_ticket_con_comentarios(self):
+        self.client.force_login(self.tecnico)
+        for cantidad in self.TAMANOS:
+            with self.subTest(comentarios=cantidad):
+                ticket = Ticket.objects.create(titulo='Falla', descripcion='Detalle', usuario=self.cliente)
+                Comentario.objects.bulk_create(
+                    Comentario(ticket=ticket, usuario=self.cliente, contenido=f'Comentario {i}')
+                    for i in range(cantidad)
+                )
+                # Sesión, usuario, ticket con personas y comentarios con autor.
+                with self.assertNumQueries(4):
+                    respuesta = self.client.get(reverse('detalleticket', args=[ticket.id]))
+                self.assertContains(respuesta, f'Comentario {cantidad - 1}')
+
+    def test_listado_de_tickets_con_personas(self):
+        for cantidad in self.TAMANOS:
+            with self.subTest(tickets=cantidad):
+                Ticket.objects.all().delete()
+                tickets = self.crear_tickets(cantidad)
+                with self.assertNumQueries(1):
+                    nombres = [(t.usuario.username, t.tecnico_asignado.username) for t in tickets.con_personas()]
+                self.assertEqual(len(nombres), cantidad)
+
+    def test_str_de_comentarios_y_encuestas(self):
+        for cantidad in self.TAMANOS:
+            with self.subTest(filas=cantidad):
+                Ticket.objects.all().delete()
+                tickets = list(self.crear_tickets(cantidad))
+                Comentario.objects.bulk_create(
+                    Comentario(ticket=ticket, usuario=self.cliente, contenido='Hola') for ticket in tickets)
+                Encuesta.objects.bulk_create(Encuesta(ticket=ticket, calificacion=5) for ticket in tickets)
+                with self.assertNumQueries(2):
+                    textos = [str(c) for c in Comentario.objects.select_related('usuario')]
+                    textos += [str(e) for e in Encuesta.objects.all()]
+                self.assertEqual(len(textos), 2 * cantidad)
+
+
+class SembrarDatosTests(TestCase):
+    def test_siembra_por_lotes_y_deja_contadores_consistentes(self):
+        creados = sembrar_datos(usuarios=6, empresas=3, tecnicos=2, tickets=25, comentarios_por_ticket=1, lote=10)
+        self.assertEqual(creados, {'usuarios': 6, 'tecnicos': 2, 'tickets': 25})
+        self.assertEqual(Ticket.objects.count(), 25)
+        self.assertEqual(Comentario.objects.count(), 25)
+        self.assertEqual(Encuesta.objects.count(), Ticket.objects.filter(estado='Resuelto').count())
+        for encuesta in Encuesta.objects.select_related('ticket'):
+            self.assertGreaterEqual(encuesta.fecha_creacion, encuesta.ticket.fecha_estado)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+        # Una segunda siembra seguida no repite usernames.
+        self.assertEqual(sembrar_datos(usuarios=2, tecnicos=1, tickets=0)['usuarios'], 2)
+
+
+class InstrumentacionMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+
+    def test_huella_agrupa_listas_in_y_literales(self):
+        self.assertEqual(
+            huella_sql('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21'),
+            huella_sql('SELECT * FROM t WHERE id IN (%s, %s) LIMIT 5'),
+        )
+
+    @override_settings(INSTRUMENTACION_ACTIVA=True, INSTRUMENTACION_MUESTREO_LENTAS=1.0,
+                       INSTRUMENTACION_UMBRAL_LENTO_MS=0)
+    def test_expone_server_timing_y_registra_la_solicitud(self):
+        self.client.force_login(self.cliente)
+        with self.assertLogs('STIWEBSERVICE.instrumentacion', level='INFO') as logs:
+            respuesta = self.client.get(reverse('home'))
+        self.assertIn('db;dur=', respuesta['Server-Timing'])
+        linea = json.loads(logs.records[0].getMessage())
+        self.assertEqual(linea['ruta'], reverse('home'))
+        self.assertGreater(linea['consultas'], 0)
+        lenta = json.loads(logs.records[1].getMessage())
+        self.assertEqual(len(lenta['sql']), linea['consultas'])
+        # Sin parámetros: la consulta de la sesión no deja la clave en el log.
+        self.assertNotIn(self.client.session.session_key, logs.records[1].getMessage())
+
+    def test_desactivado_no_agrega_cabecera(self):
+        self.client.force_login(self.cliente)
+        respuesta = self.client.get(reverse('home'))
+        self.assertFalse(respuesta.has_header('Server-Timing'))
+
+
+class BufferErroresTests(TestCase):
+    def test_agrupa_por_tipo_y_ruta_y_guarda_en_una_consulta(self):
+        buffer = BufferErrores(capacidad=10, lote=10, intervalo=0)
+        for _ in range(50):
+            buffer.registrar('404', '/wp-login.php')
+        buffer.registrar('404', '/.env')
+        buffer.registrar('403', '/dashboard/')
+        with self.assertNumQueries(1):
+            self.assertEqual(buffer.vaciar(), 3)
+        self.assertEqual(RegistroErrores.objects.get(ruta='/wp-login.php').ocurrencias, 50)
+        self.assertEqual(buffer.vaciar(), 0)
+
+    def test_buffer_lleno_descarta_el_grupo_mas_antiguo(self):
+        buffer = BufferErrores(capacidad=2, lote=10, intervalo=0)
+        for ruta in ['/a', '/b', '/c']:
+            buffer.registrar('404', ruta)
+        buffer.vaciar()
+        self.assertEqual(buffer.descartados, 1)
+        self.assertCountEqual(RegistroErrores.objects.values_list('ruta', flat=True), ['/b', '/c'])
+
+    def test_las_vistas_de_error_no_escriben_en_la_solicitud(self):
+        cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+        self.client.force_login(cliente)
+        with mock.patch.multiple(buffer_errores, intervalo=0, _pendientes=OrderedDict()):
+            self.client.get('/no-existe/')
+            self.client.get(reverse('dashboard'))
+            self.assertFalse(RegistroErrores.objects.exists())
+            buffer_errores.vaciar()
+        self.assertCountEqual(
+            RegistroErrores.objects.values_list('tipo_error', 'ruta'),
+            [('404', '/no-existe/'), ('403', reverse('dashboard'))],
+        )
+
+
+class AccionesMasivasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='clave-segura-123',
+            nombre_empresa='STI', is_staff=True)
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+
+    def setUp(self):
+        self.ids = [
+            Ticket.objects.create(titulo=f'Ticket {i}', descripcion='Detalle', usuario=self.cliente).pk
+            for i in range(30)
+        ]
+        self.client.force_login(self.tecnico)
+
+    def test_reasigna_y_cambia_estado_con_contadores_consistentes(self):
+        for datos in (
+            {'accion': 'estado', 'estado': 'En Progreso'},
+            {'accion': 'tecnico', 'tecnico': self.tecnico.pk},
+            {'accion': 'prioridad', 'prioridad': 'Alta'},
+        ):
+            self.client.post(reverse('acciones_masivas'), {**datos, 'tickets': self.ids[:20]})
+        self.assertEqual(Ticket.objects.filter(estado='En Progreso', tecnico_asignado=self.tecnico,
+                                               prioridad='Alta').count(), 20)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+    def test_consultas_no_dependen_de_la_cantidad_de_tickets(self):
+        actualizar_tickets(self.ids[:1], estado='Resuelto')
+        with CaptureQueriesContext(connection) as pocos:
+            actualizar_tickets(self.ids[1:5], estado='Resuelto')
+        with CaptureQueriesContext(connection) as muchos:
+            actualizar_tickets(self.ids[5:], estado='Resuelto')
+        self.assertEqual(len(pocos), len(muchos))
+
+    def test_elimina_en_bloque(self):
+        respuesta = self.client.post(reverse('acciones_masivas'), {'accion': 'eliminar', 'tickets': self.ids[:25]})
+        self.assertRedirects(respuesta, reverse('historial'))
+        self.assertEqual(Ticket.objects.count(), 5)
+        self.assertEqual(contar_tickets_por_estado()['tickets_total'], 5)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+    def test_solo_personal_tecnico(self):
+        self.client.force_login(self.cliente)
+        with mock.patch.multiple(buffer_errores, intervalo=0, _pendientes=OrderedDict()):
+            respuesta = self.client.post(reverse('acciones_masivas'), {'accion': 'eliminar', 'tickets': self.ids})
+        self.assertEqual(respuesta.status_code, 403)
+        self.assertEqual(Ticket.objects.count(), 30)
+
+
+class ExportacionTicketsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='clave-segura-123',
+            nombre_empresa='STI', is_staff=True)
+        acme = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+        beta = CustomUser.objects.create_user(
+            username='otro', email='otro@beta.cl', password='clave-segura-123',
+            nombre_empresa='BETA')
+        resuelto = Ticket.objects.create(
+            titulo='Impresora', descripcion='Detalle', usuario=acme, estado='Resuelto',
+            tecnico_asignado=cls.tecnico)
+        Encuesta.objects.create(ticket=resuelto, calificacion=4)
+        Ticket.objects.create(titulo='Correo', descripcion='Detalle', usuario=acme)
+        Ticket.objects.create(titulo='VPN', descripcion='Detalle', usuario=beta)
+
+    def setUp(self):
+        self.client.force_login(self.tecnico)
+
+    def test_csv_en_streaming_con_filtro_de_empresa(self):
+        respuesta = self.client.get(reverse('exportar_tickets'), {'empresa': 'ACME'})
+        self.assertTrue(respuesta.streaming)
+        lineas = b''.join(respuesta.streaming_content).decode().splitlines()
+        self.assertEqual(lineas[0].split(',')[:3], ['id', 'titulo', 'estado'])
+        self.assertEqual(len(lineas), 3)
+
+    def test_csv_neutraliza_formulas(self):
+        Ticket.objects.create(titulo='=HYPERLINK("http://x","clic")', descripcion='Detalle',
+                              usuario=CustomUser.objects.get(username='otro'))
+        respuesta = self.client.get(reverse('exportar_tickets'), {'empresa': 'BETA'})
+        contenido = b''.join(respuesta.streaming_content).decode()
+        self.assertIn('"\'=HYPERLINK(""http://x"",""clic"")"', contenido)
+
+    def test_jsonl_incluye_calificacion_y_tecnico(self):
+        respuesta = self.client.get(reverse('exportar_tickets'), {'formato': 'jsonl', 'estado': 'Resuelto'})
+        filas = [json.loads(linea) for linea in b''.join(respuesta.streaming_content).decode().splitlines()]
+        self.assertEqual(len(filas), 1)
+        self.assertEqual(filas[0]['calificacion'], 4)
+        self.assertEqual(filas[0]['tecnico'], 'tecnico')
+        self.assertEqual(filas[0]['empresa'], 'ACME')
+
+
+class ApiTicketsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+        otro = CustomUser.objects.create_user(
+            username='otro', email='otro@beta.cl', password='clave-segura-123',
+            nombre_empresa='BETA')
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='clave-segura-123',
+            nombre_empresa='STI', is_staff=True)
+        cls.ticket = Ticket.objects.create(titulo='Impresora', descripcion='Detalle', usuario=cls.cliente)
+        cls.ajeno = Ticket.objects.create(titulo='VPN', descripcion='Detalle', usuario=otro)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.cliente)
+
+    def test_listado_responde_304_sin_serializar(self):
+        respuesta = self.client.get(reverse('api_tickets'))
+        self.assertEqual([t['titulo'] for t in respuesta.json()['resultados']], ['Impresora'])
+        etag = respuesta['ETag']
+        self.assertNotIn('Last-Modified', respuesta)
+        # Sesión, usuario, MAX(fecha_actualizacion) y total de TicketStats.
+        with self.assertNumQueries(4):
+            respuesta = self.client.get(reverse('api_tickets'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 304)
+        self.assertEqual(respuesta.content, b'')
+
+        self.ajeno.delete()
+        respuesta = self.client.get(reverse('api_tickets'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+
+    def test_detalle_cambia_de_etag_al_actualizar(self):
+        url = reverse('api_ticket_detalle', args=[self.ticket.pk])
+        respuesta = self.client.get(url)
+        self.assertEqual(respuesta.json()['usuario__nombre_empresa'], 'ACME')
+        etag = respuesta['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=respuesta['Last-Modified']).status_code, 304)
+
+        self.ticket.estado = 'En Progreso'
+        self.ticket.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_estadisticas_cambian_de_etag_sin_tocar_tickets(self):
+        self.client.force_login(self.tecnico)
+        url = reverse('api_estadisticas')
+        etag = self.client.get(url)['ETag']
+        # Sesión y usuario: la versión sale de la caché.
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Ticket.objects.filter(pk=self.ticket.pk).update(estado='Resuelto')
+        with self.captureOnCommitCallbacks(execute=True):
+            Encuesta.objects.create(ticket=self.ticket, calificacion=5)
+        respuesta = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['satisfaccion_por_empresa'][0]['encuestas'], 1)
+        self.assertNotIn('Last-Modified', respuesta)
+
+    def test_permisos(self):
+        self.assertEqual(self.client.get(reverse('api_ticket_detalle', args=[self.ajeno.pk])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('api_estadisticas')).status_code, 403)
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('api_estadisticas')).status_code, 401)
+
+
+@override_settings(ROOT_URLCONF='django_project.urls_asgi')
+class VistasAsincronasTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='clave-segura-123',
+            nombre_empresa='STI', is_staff=True)
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123',
+            nombre_empresa='ACME')
+        cls.ticket = Ticket.objects.create(titulo='Impresora', descripcion='Detalle', usuario=cls.cliente)
+
+    def setUp(self):
+        cache.clear()
+
+    async def test_home_y_dashboard(self):
+        await self.async_client.aforce_login(self.tecnico)
+        respuesta = await self.async_client.get(reverse('home'))
+        self.assertEqual(respuesta.context['tickets_pendientes'], 1)
+        self.assertContains(respuesta, 'Impresora')
+        respuesta = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(respuesta.context['tickets_por_empresa'], [{'empresa': 'ACME', 'total': 1}])
+
+    async def test_dashboard_solo_personal_tecnico(self):
+        await self.async_client.aforce_login(self.cliente)
+        with mock.patch.multiple(buffer_errores, intervalo=0, _pendientes=OrderedDict()):
+            respuesta = await self.async_client.get(reverse('dashboard'))
+        self.assertEqual(respuesta.status_code, 403)
+
+    async def test_detalle_actualiza_el_ticket(self):
+        await self.async_client.aforce_login(self.tecnico)
+        url = reverse('detalleticket', args=[self.ticket.pk])
+        respuesta = await self.async_client.get(url)
+        self.assertContains(respuesta, 'cliente@acme.cl')
+        await self.async_client.post(url, {'estado': 'En Progreso', 'prioridad': 'Alta', 'solucion': ''})
+        ticket = await Ticket.objects.aget(pk=self.ticket.pk)
+        self.assertEqual(ticket.estado, 'En Progreso')
+        self.assertEqual(ticket.tecnico_asignado_id, self.tecnico.pk)
+        self.assertEqual((await acontar_tickets_por_estado())['tickets_en_proceso'], 1)
+
+    async def test_exportacion_se_envia_por_bloques(self):
+        await self.async_client.aforce_login(self.tecnico)
+        with mock.patch('STIWEBSERVICE.exportacion.LINEAS_POR_BLOQUE', 1):
+            respuesta = await self.async_client.get(reverse('exportar_tickets'))
+            self.assertTrue(respuesta.is_async)
+            bloques = [bloque async for bloque in respuesta.streaming_content]
+        self.assertEqual(len(bloques), 2)
+        self.assertIn(b'Impresora', bloques[1])
+
+
+class EmpresaAutomaticaTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_deriva_empresa_del_correo(self):
+        self.assertEqual(empresa_desde_email('ana@acme.cl'), 'ACME')
+        self.assertIsNone(empresa_desde_email('sin-arroba'))
+        self.assertIsNone(empresa_desde_email('ana@'))
+        self.assertIsNone(empresa_desde_email(None))
+
+    def test_crear_usuario_es_una_sola_escritura(self):
+        with CaptureQueriesContext(connection) as consultas:
+            usuario = CustomUser.objects.create(username='ana', email='ana@acme.cl')
+        self.assertEqual(len(consultas), 1)
+        self.assertTrue(consultas[0]['sql'].startswith('INSERT'))
+        usuario.refresh_from_db()
+        self.assertEqual(usuario.nombre_empresa, 'ACME')
+
+    def test_correo_sin_arroba_no_falla(self):
+        usuario = CustomUser.objects.create_user(username='local', email='local', password='x')
+        self.assertIsNone(usuario.nombre_empresa)
+
+    def test_respeta_empresa_indicada(self):
+        usuario = CustomUser.objects.create_user(
+            username='ana', email='ana@acme.cl', password='x', nombre_empresa='Otra')
+        self.assertEqual(usuario.nombre_empresa, 'Otra')
+
+    def test_registro_consultas_de_validacion_y_un_insert(self):
+        datos = {
+            'username': 'nuevo', 'first_name': 'Nuevo', 'last_name': 'Usuario',
+            'email': 'nuevo@beta.cl', 'password': 'clave-segura', 'confirm_password': 'clave-segura',
+            'nombre_empresa': '', 'cargo': '',
+        }
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.post(reverse('registrarse'), datos)
+        self.assertRedirects(respuesta, reverse('login'), fetch_redirect_response=False)
+        escrituras = [q['sql'] for q in consultas if not q['sql'].startswith('SELECT')]
+        self.assertEqual(len(escrituras), 1)
+        self.assertTrue(escrituras[0].startswith('INSERT'))
+        # Validación: username único y correo único (LOWER(email)).
+        self.assertEqual(len(consultas), 3)
+        self.assertEqual(CustomUser.objects.get(username='nuevo').nombre_empresa, 'BETA')
+
+        datos.update(username='otro', email='NUEVO@beta.cl')
+        respuesta = self.client.post(reverse('registrarse'), datos)
+        self.assertContains(respuesta, 'Ya existe un usuario con este correo electrónico.')
+
+    def test_asignar_empresas_en_lote(self):
+        usuarios = asignar_empresas([
+            CustomUser(username=f'u{i}', email=email, nombre_empresa=empresa)
+            for i, (email, empresa) in enumerate([('a@acme.cl', None), ('b@beta.cl', 'Fija'), ('c', '')])
+        ])
+        with self.assertNumQueries(1):
+            CustomUser.objects.bulk_create(usuarios)
+        self.assertEqual(
+            list(CustomUser.objects.order_by('username').values_list('nombre_empresa', flat=True)),
+            ['ACME', 'Fija', None],
+        )
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportarUsuariosTests(TestCase):
+    CSV = (
+        "username,email,first_name,last_name,password,nombre_empresa,cargo\n"
+        "ana,ana@acme.cl,Ana,Pérez,clave-ana,,Jefa\n"
+        ",beto@beta.cl,Beto,Soto,clave-beto,Fija,\n"
+        "existente,otro@acme.cl,,,clave,,\n"
+        "ana,repetida@acme.cl,,,clave,,\n"
+        "sinclave,sinclave@acme.cl,,,,,\n"
+        "mayusculas,EXISTENTE@acme.cl,,,clave,,\n"
+        "otra-ana,ANA@acme.cl,,,clave,,\n"
+        "sincorreo1,,,,clave,,\n"
+        "sincorreo2,,,,clave,,\n"
+    )
+
+    def setUp(self):
+        CustomUser.objects.create_user(username='existente', email='existente@acme.cl', password='x')
+
+    def importar(self, procesos):
+        return importar_usuarios(leer_usuarios_csv(io.StringIO(self.CSV)), procesos=procesos, lote=2)
+
+    def comprobar(self, resultado):
+        self.assertEqual((resultado['leidos'], resultado['creados'], resultado['omitidos']), (9, 5, 4))
+        self.assertFalse(CustomUser.objects.filter(username__in=['mayusculas', 'otra-ana']).exists())
+        ana = CustomUser.objects.get(username='ana')
+        self.assertEqual((ana.nombre_empresa, ana.cargo), ('ACME', 'Jefa'))
+        self.assertTrue(ana.check_password('clave-ana'))
+        beto = CustomUser.objects.get(username='beto@beta.cl')
+        self.assertEqual(beto.nombre_empresa, 'Fija')
+        self.assertTrue(beto.check_password('clave-beto'))
+        self.assertFalse(CustomUser.objects.get(username='sinclave').has_usable_password())
+
+    def test_importa_en_el_proceso_actual(self):
+        self.comprobar(self.importar(procesos=1))
+
+    def test_importa_con_varios_procesos(self):
+        self.comprobar(self.importar(procesos=2))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginPorEmailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = CustomUser.objects.create_user(
+            username='ana', email='Ana@Acme.cl', password='clave-ana', nombre_empresa='ACME')
+
+    def setUp(self):
+        cache.clear()
+
+    def consultas_login(self, email, clave):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.post(reverse('login'), {'email': email, 'password': clave})
+        return respuesta, [q['sql'] for q in consultas if 'STIWEBSERVICE_customuser' in q['sql']
+                           and q['sql'].startswith('SELECT')]
+
+    def test_login_exitoso_una_consulta_sin_distinguir_mayusculas(self):
+        respuesta, lecturas = self.consultas_login('ana@acme.CL', 'clave-ana')
+        self.assertRedirects(respuesta, reverse('home'), fetch_redirect_response=False)
+        self.assertEqual(len(lecturas), 1)
+        self.assertIn('LOWER', lecturas[0].upper())
+        self.assertEqual(int(self.client.session['_auth_user_id']), self.usuario.pk)
+
+    def test_login_fallido_una_consulta(self):
+        for email, clave in (('ana@acme.cl', 'incorrecta'), ('nadie@acme.cl', 'clave-ana')):
+            with self.assertNumQueries(1):
+                respuesta = self.client.post(reverse('login'), {'email': email, 'password': clave})
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertContains(respuesta, 'Correo o contraseña incorrectos.')
+
+    def test_correo_unico_sin_distinguir_mayusculas(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            CustomUser.objects.create_user(username='otra', email='ANA@acme.cl', password='x')
+        CustomUser.objects.create_user(username='sin-correo-1', email='', password='x')
+        CustomUser.objects.create_user(username='sin-correo-2', email='', password='x')
+
+    def test_correos_repetidos_heredados_rechazan_el_login(self):
+        with mock.patch('django.db.models.query.QuerySet.get', side_effect=CustomUser.MultipleObjectsReturned):
+            respuesta, _ = self.consultas_login('ana@acme.cl', 'clave-ana')
+        self.assertContains(respuesta, 'Correo o contraseña incorrectos.')
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    LIMITES_INTENTOS={'login': {'ip': (3, 60), 'email': (2, 300)}},
+    LIMITES_PROXIES_CONFIABLES=0,
+)
+class LimiteIntentosTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def intentar(self, email, ip='10.0.0.1', **extra):
+        return self.client.post(reverse('login'), {'email': email, 'password': 'incorrecta'},
+                                REMOTE_ADDR=ip, **extra)
+
+    def test_cubeta_se_vacia_y_se_recarga(self):
+        self.assertEqual(consumir_ficha('prueba', 2, 60, ahora=1000), 0)
+        self.assertEqual(consumir_ficha('prueba', 2, 60, ahora=1000), 0)
+        self.assertEqual(consumir_ficha('prueba', 2, 60, ahora=1000), 30)
+        self.assertEqual(consumir_ficha('prueba', 2, 60, ahora=1030), 0)
+
+    def test_limite_por_correo_rechaza_sin_autenticar(self):
+        self.assertEqual(self.intentar('ana@acme.cl').status_code, 200)
+        self.assertEqual(self.intentar('ANA@acme.cl').status_code, 200)
+        with mock.patch('STIWEBSERVICE.views.authenticate') as autenticar, self.assertNumQueries(0):
+            respuesta = self.intentar('ana@acme.cl')
+        autenticar.assert_not_called()
+        self.assertEqual(respuesta.status_code, 429)
+        self.assertEqual(respuesta['Retry-After'], '150')
+        self.assertEqual(self.intentar('otra@acme.cl', ip='10.0.0.2').status_code, 200)
+
+    def test_limite_por_ip(self):
+        for i in range(3):
+            self.assertEqual(self.intentar(f'usuario{i}@acme.cl').status_code, 200)
+        self.assertEqual(self.intentar('usuario9@acme.cl').status_code, 429)
+        self.assertEqual(self.intentar('usuario9@acme.cl', ip='10.0.0.2').status_code, 200)
+
+    @override_settings(LIMITES_PROXIES_CONFIABLES=1)
+    def test_limite_por_ip_detras_de_un_proxy(self):
+        # Todo llega desde la IP del proxy; el cliente es el último salto de X-Forwarded-For
+        # y lo que el cliente haya escrito antes en la cabecera no cuenta.
+        for i in range(3):
+            respuesta = self.intentar(f'usuario{i}@acme.cl', ip='10.1.1.1',
+                                      HTTP_X_FORWARDED_FOR=f'1.2.3.{i}, 198.51.100.7')
+            self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self.intentar('usuario9@acme.cl', ip='10.1.1.1',
+                                       HTTP_X_FORWARDED_FOR='198.51.100.7').status_code, 429)
+        self.assertEqual(self.intentar('usuario9@acme.cl', ip='10.1.1.1',
+                                       HTTP_X_FORWARDED_FOR='198.51.100.8').status_code, 200)
+
+    def test_sin_proxies_configurados_no_limita_por_ip(self):
+        with self.settings(LIMITES_PROXIES_CONFIABLES=None):
+            for i in range(5):
+                self.assertEqual(self.intentar(f'usuario{i}@acme.cl').status_code, 200)
+
+    def test_get_y_limites_desactivados(self):
+        for _ in range(5):
+            self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+        with self.settings(LIMITES_ACTIVOS=False):
+            for _ in range(5):
+                self.assertEqual(self.intentar('ana@acme.cl').status_code, 200)
+
+
+class SesionesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='x', nombre_empresa='ACME')
+
+    def setUp(self):
+        cache.clear()
+
+    def consultas_home(self):
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(reverse('home'))
+        tablas = [q['sql'] for q in consultas if 'django_session' in q['sql'] or 'STIWEBSERVICE_customuser' in q['sql']]
+        return respuesta, tablas
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db', USUARIO_CACHE_TTL=300)
+    def test_cached_db_y_usuario_en_cache_sin_consultas_de_autenticacion(self):
+        self.client.force_login(self.cliente)
+        _, primeras = self.consultas_home()
+        self.assertEqual(len(primeras), 1)
+        respuesta, siguientes = self.consultas_home()
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(siguientes, [])
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cached_db', USUARIO_CACHE_TTL=300)
+    def test_desactivar_usuario_invalida_la_cache(self):
+        self.client.force_login(self.cliente)
+        self.consultas_home()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cliente.is_active = False
+            self.cliente.save()
+        respuesta = self.client.get(reverse('home'))
+        self.assertEqual(respuesta.status_code, 302)
+        self.assertFalse(respuesta.wsgi_request.user.is_authenticated)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_signed_cookies_sin_tabla_de_sesiones(self):
+        self.client.force_login(self.cliente)
+        respuesta, consultas = self.consultas_home()
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertFalse([sql for sql in consultas if 'django_session' in sql])
+
+    def test_limpiar_sesiones_por_lotes(self):
+        ahora = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'vencida{i}', session_data='', expire_date=ahora - timedelta(days=1))
+        Session.objects.create(session_key='vigente', session_data='', expire_date=ahora + timedelta(days=1))
+        salida = io.StringIO()
+        with CaptureQueriesContext(connection) as consultas:
+            call_command('limpiar_sesiones', lote=2, stdout=salida)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['vigente'])
+        self.assertIn('Eliminadas 5', salida.getvalue())
+        self.assertEqual(len([q for q in consultas if q['sql'].startswith('DELETE')]), 3)
+
+
+class BusquedaTicketsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='x', is_staff=True, nombre_empresa='STI')
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='x', nombre_empresa='ACME')
+        otro = CustomUser.objects.create_user(
+            username='otro', email='otro@beta.cl', password='x', nombre_empresa='BETA')
+        cls.impresora = Ticket.objects.create(
+            titulo='Impresora atascada', descripcion='No imprime desde ayer', usuario=cls.cliente)
+        cls.correo = Ticket.objects.create(
+            titulo='Correo caído', descripcion='El correo no sincroniza; quizás la impresora de red', usuario=cls.cliente)
+        cls.ajeno = Ticket.objects.create(titulo='Impresora sin tóner', descripcion='Cambiar tóner', usuario=otro)
+
+    def ids(self, texto, tickets=None):
+        return [ticket.id for ticket in buscar_tickets(texto, tickets)]
+
+    def test_titulo_pesa_mas_que_descripcion(self):
+        ids = self.ids('impresora', Ticket.objects.filter(usuario=self.cliente))
+        self.assertEqual(ids, [self.impresora.id, self.correo.id])
+        self.assertCountEqual(self.ids('impresora'), [self.impresora.id, self.correo.id, self.ajeno.id])
+
+    def test_indice_sigue_cambios_de_tickets_y_comentarios(self):
+        self.assertEqual(self.ids('rodillo'), [])
+        self.impresora.solucion = 'Se cambió el rodillo'
+        self.impresora.save()
+        self.assertEqual(self.ids('rodillo'), [self.impresora.id])
+
+        comentario = Comentario.objects.create(ticket=self.correo, usuario=self.tecnico, contenido='Reinicié el servidor')
+        self.assertEqual(self.ids('servidor'), [self.correo.id])
+        comentario.delete()
+        self.assertEqual(self.ids('servidor'), [])
+
+        nuevo, = Ticket.objects.bulk_create([Ticket(titulo='Proyector', descripcion='Sin imagen', usuario=self.cliente)])
+        self.assertEqual(self.ids('proyector'), [nuevo.id])
+        nuevo.delete()
+        self.assertEqual(self.ids('proyector'), [])
+
+    def test_entrada_con_operadores_no_falla(self):
+        self.assertEqual(self.ids('impresora ayer'), [self.impresora.id])
+        self.assertIsInstance(self.ids('"impresora" OR -ayer* NEAR('), list)
+        self.assertEqual(self.ids('  ¿?  '), [])
+
+    def test_vista_respeta_visibilidad(self):
+        self.client.force_login(self.cliente)
+        respuesta = self.client.get(reverse('buscar_tickets'), {'q': 'impresora'})
+        self.assertEqual([fila['id'] for fila in respuesta.context['resultados']], [self.impresora.id, self.correo.id])
+        self.assertContains(respuesta, 'Impresora atascada')
+        self.assertNotContains(respuesta, 'Impresora sin tóner')
+
+        self.client.force_login(self.tecnico)
+        respuesta = self.client.get(reverse('buscar_tickets'), {'q': 'tóner'})
+        self.assertEqual([fila['id'] for fila in respuesta.context['resultados']], [self.ajeno.id])
+
+
+class MotorAsignacionTests(TestCase):
+    def test_prioridad_antiguedad_y_carga(self):
+        ahora = timezone.now()
+        motor = MotorAsignacion.desde_datos(
+            cargas=[(1, 2), (2, 0), (3, 1)],
+            pendientes=[
+                (10, 'Baja', ahora - timedelta(days=3)),
+                (11, 'Alta', ahora),
+                (12, 'Alta', ahora - timedelta(hours=1)),
+                (13, None, ahora - timedelta(days=9)),
+            ],
+            capacidad=2,
+        )
+        self.assertEqual(motor.elegir_tecnico(), 2)
+        self.assertEqual(motor.drenar(), [(12, 2), (11, 3), (10, 2)])
+        self.assertIsNone(motor.elegir_tecnico())
+        self.assertEqual(motor.en_espera(), 1)
+
+        motor.ajustar_carga(1, -2)
+        motor.descartar(13)
+        self.assertEqual(motor.drenar(), [])
+        self.assertEqual(motor.elegir_tecnico(), 1)
+
+
+@override_settings(ASIGNACION_CAPACIDAD=1)
+class AsignacionAutomaticaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnicos = [
+            CustomUser.objects.create_user(
+                username=f'tecnico{i}', email=f'tecnico{i}@sti.cl', password='x', is_staff=True, nombre_empresa='STI')
+            for i in range(2)
+        ]
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='x', nombre_empresa='ACME')
+
+    def setUp(self):
+        motor_asignacion.invalidar()
+        self.addCleanup(motor_asignacion.invalidar)
+        self.client.force_login(self.cliente)
+
+    def crear(self, titulo):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('ticket'), {'titulo': titulo, 'descripcion': 'Detalle'})
+        return Ticket.objects.get(titulo=titulo)
+
+    def test_reparte_encola_y_asigna_al_liberar(self):
+        # Con el motor cargado (como lo deja el comando en su proceso), liberar a un técnico reparte la cola.
+        resincronizar()
+        primero, segundo, tercero = (self.crear(titulo) for titulo in ('Uno', 'Dos', 'Tres'))
+        self.assertCountEqual(
+            [primero.tecnico_asignado_id, segundo.tecnico_asignado_id], [tecnico.pk for tecnico in self.tecnicos])
+        self.assertIsNone(tercero.tecnico_asignado_id)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            primero.estado = 'Resuelto'
+            primero.save()
+        tercero.refresh_from_db()
+        self.assertEqual(tercero.tecnico_asignado_id, primero.tecnico_asignado_id)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+    def test_solicitudes_no_cargan_la_cola(self):
+        primero, _, tercero = (self.crear(titulo) for titulo in ('Uno', 'Dos', 'Tres'))
+        self.assertIsNone(motor_asignacion.cargado())
+        with self.assertNumQueries(1):
+            self.assertIsNone(elegir_tecnico())
+        with self.captureOnCommitCallbacks(execute=True):
+            primero.estado = 'Resuelto'
+            primero.save()
+        self.assertIsNone(motor_asignacion.cargado())
+        tercero.refresh_from_db()
+        self.assertIsNone(tercero.tecnico_asignado_id)
+
+    def test_resolver_en_bloque_y_el_comando_reparte_la_cola(self):
+        resincronizar()
+        primero, _, tercero = (self.crear(titulo) for titulo in ('Uno', 'Dos', 'Tres'))
+        self.assertIsNone(tercero.tecnico_asignado_id)
+        with self.captureOnCommitCallbacks(execute=True):
+            actualizar_tickets([primero.pk], estado='Resuelto')
+        self.assertIsNone(motor_asignacion.cargado())
+        salida = io.StringIO()
+        call_command('asignar_pendientes', stdout=salida)
+        self.assertEqual(json.loads(salida.getvalue())['asignados'], 1)
+        tercero.refresh_from_db()
+        self.assertEqual(tercero.tecnico_asignado_id, primero.tecnico_asignado_id)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+    def test_tecnico_nuevo_recibe_la_cola(self):
+        resincronizar()
+        self.crear('Uno')
+        self.crear('Dos')
+        en_espera = self.crear('Tres')
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevo = CustomUser.objects.create_user(
+                username='tecnico9', email='tecnico9@sti.cl', password='x', is_staff=True, nombre_empresa='STI')
+        en_espera.refresh_from_db()
+        self.assertEqual(en_espera.tecnico_asignado_id, nuevo.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            nuevo.is_active = False
+            nuevo.save()
+        self.assertIsNone(motor_asignacion.cargado().carga(nuevo.pk))
+
+    def test_solo_cambios_de_disponibilidad_tocan_el_motor(self):
+        resincronizar()
+        tecnico = CustomUser.objects.get(pk=self.tecnicos[0].pk)
+        with mock.patch('STIWEBSERVICE.asignacion._atiende') as atiende, \
+                mock.patch.object(motor_asignacion, 'invalidar') as invalidar, \
+                self.captureOnCommitCallbacks(execute=True):
+            tecnico.first_name = 'Ana'
+            tecnico.save()
+            self.cliente.last_name = 'Rojas'
+            self.cliente.save()
+            CustomUser.objects.create_user(username='otro', email='otro@acme.cl', password='x')
+        atiende.assert_not_called()
+        invalidar.assert_not_called()
+        self.assertEqual(motor_asignacion.cargado().carga(tecnico.pk), 0)
+
+    def test_ticket_asignado_a_mano_sale_de_la_cola(self):
+        resincronizar()
+        self.crear('Uno')
+        self.crear('Dos')
+        en_espera = self.crear('Tres')
+        self.assertEqual(motor_asignacion.cargado().en_espera(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            en_espera.tecnico_asignado = self.tecnicos[0]
+            en_espera.save()
+        self.assertEqual(motor_asignacion.cargado().en_espera(), 0)
+        self.assertEqual(motor_asignacion.cargado().carga(self.tecnicos[0].pk), 2)
+
+
+@override_settings(SLA_HORAS={'Alta': 4, 'Media': 24, 'Baja': 72})
+class SlaTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='x', is_staff=True,
+            nombre_empresa='STI', first_name='Ana', last_name='Rojas')
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='x', nombre_empresa='ACME')
+
+    def crear(self, prioridad, estado='Pendiente'):
+        return Ticket.objects.create(
+            titulo='Falla', descripcion='Detalle', usuario=self.cliente, tecnico_asignado=self.tecnico,
+            prioridad=prioridad, estado=estado)
+
+    def mas_tarde(self, horas):
+        return mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(hours=horas))
+
+    def test_plazo_segun_prioridad_y_al_repriorizar(self):
+        ticket = self.crear('Alta')
+        self.assertAlmostEqual(ticket.vence_sla, ticket.fecha_creacion + timedelta(hours=4), delta=timedelta(seconds=1))
+        ticket.prioridad = 'Baja'
+        ticket.save()
+        self.assertEqual(ticket.vence_sla, ticket.fecha_creacion + timedelta(hours=72))
+        actualizar_tickets([ticket.pk], prioridad='Media')
+        ticket.refresh_from_db()
+        self.assertEqual(ticket.vence_sla, ticket.fecha_creacion + timedelta(hours=24))
+
+    def test_revision_marca_los_vencidos_una_sola_vez(self):
+        vencido = self.crear('Alta')
+        self.crear('Media')
+        self.crear('Alta', estado='Resuelto')
+        with self.mas_tarde(5):
+            salida = io.StringIO()
+            call_command('revisar_sla', stdout=salida)
+            self.assertEqual(json.loads(salida.getvalue())['marcados'], 1)
+            salida = io.StringIO()
+            call_command('revisar_sla', stdout=salida)
+            self.assertEqual(json.loads(salida.getvalue())['marcados'], 0)
+        vencido.refresh_from_db()
+        self.assertIsNotNone(vencido.sla_incumplido_en)
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+        self.assertEqual(agregados_dashboard()['cumplimiento_sla_por_empresa'], [
+            {'empresa': 'ACME', 'en_curso': 1, 'cumplido': 1, 'incumplido': 1, 'porcentaje': 50.0},
+        ])
+
+    def test_resolver_fuera_de_plazo_queda_incumplido(self):
+        tarde, a_tiempo, tarde_en_bloque, a_tiempo_en_bloque = (
+            self.crear(prioridad) for prioridad in ('Alta', 'Baja', 'Alta', 'Baja'))
+        with self.mas_tarde(5):
+            for ticket in (Ticket.objects.get(pk=tarde.pk), Ticket.objects.get(pk=a_tiempo.pk)):
+                ticket.estado = 'Resuelto'
+                ticket.save()
+            actualizar_tickets([tarde_en_bloque.pk, a_tiempo_en_bloque.pk], estado='Resuelto')
+        self.assertCountEqual(
+            Ticket.objects.filter(sla_incumplido_en__isnull=False).values_list('pk', flat=True),
+            [tarde.pk, tarde_en_bloque.pk])
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+        self.assertEqual(agregados_dashboard()['cumplimiento_sla_por_tecnico'], [
+            {'tecnico': 'Ana Rojas', 'en_curso': 0, 'cumplido': 2, 'incumplido': 2, 'porcentaje': 50.0},
+        ])
+
+        self.client.force_login(self.tecnico)
+        respuesta = self.client.get(reverse('dashboard'))
+        self.assertContains(respuesta, 'Cumplimiento de SLA por Técnico')
+        self.assertContains(respuesta, '50,0%')
+
+
+class HistorialEstadosTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='x', is_staff=True,
+            nombre_empresa='STI', first_name='Ana', last_name='Rojas')
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='x', nombre_empresa='ACME')
+
+    def crear(self):
+        return Ticket.objects.create(
+            titulo='Falla', descripcion='Detalle', usuario=self.cliente, tecnico_asignado=self.tecnico)
+
+    def test_registra_cada_cambio_de_estado_con_su_duracion(self):
+        ticket = self.crear()
+        self.client.force_login(self.tecnico)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() + timedelta(hours=2)):
+            self.client.post(reverse('detalleticket', args=[ticket.id]), {
+                'estado': 'En Progreso', 'prioridad': 'Media', 'solucion': '',
+            })
+            self.client.post(reverse('detalleticket', args=[ticket.id]), {
+                'estado': 'En Progreso', 'prioridad': 'Alta', 'solucion': '',
+            })
+        creacion, inicio = ticket.transiciones.order_by('fecha')
+        self.assertEqual((creacion.estado_anterior, creacion.estado_nuevo), (None, 'Pendiente'))
+        self.assertEqual((inicio.estado_anterior, inicio.estado_nuevo), ('Pendiente', 'En Progreso'))
+        self.assertEqual(inicio.tecnico, self.tecnico)
+        self.assertAlmostEqual(inicio.segundos_en_anterior, 7200, delta=5)
+
+    def test_se_escribe_en_la_misma_transaccion_que_el_ticket(self):
+        ticket = Ticket.objects.get(pk=self.crear().pk)
+        ticket.estado = 'Resuelto'
+        with mock.patch.object(TransicionEstado.objects, 'create', side_effect=IntegrityError), \
+                self.assertRaises(IntegrityError):
+            ticket.save()
+        self.assertEqual(Ticket.objects.get(pk=ticket.pk).estado, 'Pendiente')
+
+    def test_operaciones_masivas_registran_solo_los_que_cambian(self):
+        ids = [self.crear().pk for _ in range(3)]
+        actualizar_tickets(ids[:1], estado='En Progreso')
+        actualizar_tickets(ids, estado='En Progreso')
+        self.assertEqual(TransicionEstado.objects.filter(estado_nuevo='En Progreso').count(), 3)
+        self.assertFalse(Ticket.objects.filter(pk__in=ids, fecha_estado__isnull=True).exists())
+
+    def test_materializa_promedio_y_percentiles(self):
+        ticket = self.crear()
+        TransicionEstado.objects.bulk_create(
+            TransicionEstado(ticket=ticket, estado_anterior='En Progreso', estado_nuevo='Resuelto',
+                             tecnico=self.tecnico, segundos_en_anterior=horas * 3600)
+            for horas in (1, 2, 3, 10)
+        )
+        call_command('materializar_tiempos_estado', stdout=io.StringIO())
+        resumen = TiempoEstado.objects.get(dimension='total', estado='En Progreso')
+        self.assertEqual(
+            (resumen.cantidad, resumen.promedio_segundos, resumen.p50_segundos, resumen.p90_segundos),
+            (4, 4 * 3600, 2 * 3600, 10 * 3600))
+
+        with self.assertNumQueries(4):
+            agregados = agregados_dashboard()
+        self.assertIn(
+            {'dimension': 'Técnico', 'grupo': 'Ana Rojas', 'estado': 'En Progreso', 'cantidad': 4,
+             'promedio_horas': 4.0, 'p50_horas': 2.0, 'p90_horas': 10.0},
+            agregados['tiempos_en_estado'])
+
+
+class ResumenMensualTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='x', is_staff=True,
+            nombre_empresa='STI', first_name='Ana', last_name='Rojas')
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='x', nombre_empresa='ACME')
+
+    def crear(self, fecha, **campos):
+        ticket = Ticket.objects.create(
+            titulo='Falla', descripcion='Detalle', usuario=self.cliente, tecnico_asignado=self.tecnico, **campos)
+        Ticket.objects.filter(pk=ticket.pk).update(fecha_creacion=fecha)
+        return Ticket.objects.get(pk=ticket.pk)
+
+    def test_cierra_meses_pasados_y_solo_recalcula_el_actual(self):
+        hoy = timezone.localdate()
+        mes_anterior = (hoy.replace(day=1) - timedelta(days=1)).replace(day=1)
+        anterior = self.crear(timezone.now() - timedelta(days=hoy.day + 1), visita_terreno=True)
+        actual = self.crear(timezone.now())
+        for ticket, calificacion in ((anterior, 2), (actual, 5)):
+            ticket.estado = 'Resuelto'
+            ticket.save()
+            Encuesta.objects.create(ticket=ticket, calificacion=calificacion)
+
+        self.assertEqual(set(actualizar_resumen_mensual()), {mes_anterior, hoy.replace(day=1)})
+        total_anterior = ResumenMensual.objects.get(dimension='total', mes=mes_anterior)
+        self.assertTrue(total_anterior.cerrado)
+        self.assertEqual((total_anterior.tickets, total_anterior.visitas_terreno, total_anterior.resueltos),
+                         (1, 1, 0))
+        por_tecnico = ResumenMensual.objects.get(dimension='tecnico', clave=str(self.tecnico.pk), mes=hoy.replace(day=1))
+        self.assertEqual((por_tecnico.tickets, por_tecnico.resueltos, por_tecnico.encuestas), (1, 2, 2))
+        self.assertEqual(por_tecnico.promedio_calificacion, 3.5)
+
+        # Lo que cambia después no altera el mes cerrado; el mes actual sí se recalcula.
+        self.crear(timezone.now() - timedelta(days=hoy.day + 1))
+        self.crear(timezone.now())
+        self.assertEqual(set(actualizar_resumen_mensual()), {hoy.replace(day=1)})
+        self.assertEqual(ResumenMensual.objects.get(dimension='total', mes=mes_anterior).tickets, 1)
+        self.assertEqual(ResumenMensual.objects.get(dimension='total', mes=hoy.replace(day=1)).tickets, 2)
+
+        with self.assertNumQueries(4):
+            agregados = agregados_dashboard()
+        self.assertEqual([fila['tickets'] for fila in agregados['resumen_mensual']], [1, 2])
+        self.assertIn(
+            {'dimension': 'Técnico', 'grupo': 'Ana Rojas', 'tickets': 2, 'resueltos': 2, 'visitas_terreno': 0,
+             'encuestas': 2, 'promedio_calificacion': 3.5},
+            agregados['resumen_mes_por_grupo'])
+
+
+class SatisfaccionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.tecnico = CustomUser.objects.create_user(
+            username='tecnico', email='tecnico@sti.cl', password='x', is_staff=True,
+            nombre_empresa='STI', first_name='Ana', last_name='Rojas')
+        cls.otro_tecnico = CustomUser.objects.create_user(
+            username='tecnico2', email='tecnico2@sti.cl', password='x', is_staff=True, nombre_empresa='STI')
+        cls.cliente = CustomUser.objects.create_user(
+            username='cliente', email='cliente@acme.cl', password='clave-segura-123', nombre_empresa='ACME')
+
+    def crear_resuelto(self):
+        return Ticket.objects.create(
+            titulo='Falla', descripcion='Detalle', usuario=self.cliente,
+            tecnico_asignado=self.tecnico, estado='Resuelto')
+
+    def test_doble_envio_no_crea_otra_encuesta(self):
+        ticket = self.crear_resuelto()
+        self.client.login(username='cliente', password='clave-segura-123')
+        url = reverse('encuesta', args=[ticket.pk])
+        self.assertRedirects(self.client.post(url, {'rating': '4'}), reverse('home'), fetch_redirect_response=False)
+        respuesta = self.client.post(url, {'rating': '1'}, follow=True)
+        self.assertContains(respuesta, 'Este ticket ya fue calificado.')
+        self.assertEqual(Encuesta.objects.get(ticket=ticket).calificacion, 4)
+        self.assertEqual(TicketStats.objects.get(dimension='encuesta_tecnico', clave=f'4:{self.tecnico.pk}').total, 1)
+
+    def test_rechaza_calificacion_fuera_de_rango(self):
+        ticket = self.crear_resuelto()
+        self.client.login(username='cliente', password='clave-segura-123')
+        respuesta = self.client.post(reverse('encuesta', args=[ticket.pk]), {'rating': '9'})
+        self.assertContains(respuesta, 'Selecciona una calificación de 1 a 5.')
+        self.assertFalse(Encuesta.objects.exists())
+
+    def test_contadores_siguen_a_encuestas_y_tickets(self):
+        tickets = [self.crear_resuelto() for _ in range(3)]
+        for ticket, calificacion in zip(tickets, (5, 4, 2), strict=True):
+            Encuesta.objects.create(ticket=ticket, calificacion=calificacion)
+        tickets[0].tecnico_asignado = self.otro_tecnico
+        tickets[0].save()
+        actualizar_tickets([tickets[1].pk], tecnico_asignado=self.otro_tecnico)
+        tickets[2].delete()
+        self.assertEqual(diferencias_estadisticas(calcular_estadisticas()), {})
+
+    def test_dashboard_promedio_y_distribucion(self):
+        for calificacion in (5, 4, 4, 1):
+            Encuesta.objects.create(ticket=self.crear_resuelto(), calificacion=calificacion)
+        with self.assertNumQueries(4):
+            agregados = agregados_dashboard()
+        self.assertEqual(agregados['satisfaccion_por_tecnico'], [
+            {'tecnico': 'Ana Rojas', 'encuestas': 4, 'promedio': 3.5, 'distribucion': [1, 0, 0, 2, 1]},
+        ])
+        self.assertEqual(agregados['satisfaccion_por_empresa'][0]['empresa'], 'ACME')
+        self.assertEqual(agregados['satisfaccion_por_mes'][0]['mes'], timezone.localdate().replace(day=1))
+
+
+class AdminAccionesMasivasTests(TestCase):
+    def test_acciones_masivas_requieren_permiso_de_cambio(self):
+        staff = CustomUser.objects.create_user(username='lector', email='lector@sti.cl', password='x', is_staff=True)
+        staff.user_permissions.add(Permission.objects.get(codename='view_ticket'))
+        ticket_admin = TicketAdmin(Ticket, admin.site)
+        request = RequestFactory().get('/')
+        request.user = CustomUser.objects.get(pk=staff.pk)
+        self.assertNotIn('marcar_resuelto', ticket_admin.get_actions(request))
+
+        staff.user_permissions.add(Permission.objects.get(codename='change_ticket'))
+        request.user = CustomUser.objects.get(pk=staff.pk)
+        self.assertIn('marcar_resuelto', ticket_admin.get_actions(request))
+        self.assertNotIn('eliminar_seleccionados', ticket_admin.get_actions(request))
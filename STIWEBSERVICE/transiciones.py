@@ -0,0 +1,112 @@
+import datetime
+import math
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Ticket, TiempoEstado, TransicionEstado
+
+# ---- Historial de Estados ----
+# Cada cambio de estado agrega una fila a TransicionEstado dentro del atomic de
+# Ticket.save (o de actualizar_tickets). La duración del estado que termina sale
+# de Ticket.fecha_estado, así que registrar no consulta la base. Los tickets
+# anteriores al historial solo tienen fecha_estado si siguen en Pendiente.
+
+def _segundos(desde, hasta):
+    return None if desde is None else max(int((hasta - desde).total_seconds()), 0)
+
+
+@receiver(pre_save, sender=Ticket)
+def preparar_transicion(sender, instance, raw=False, **kwargs):
+    # Los valores originales se leen aquí: el receptor de estadísticas los renueva en post_save.
+    instance._transicion = None
+    if raw:
+        return
+    originales = getattr(instance, '_valores_originales', {})
+    if instance._state.adding:
+        anterior = None
+    elif 'estado' in originales and originales['estado'] != instance.estado:
+        anterior = originales['estado']
+    else:
+        return
+    ahora = timezone.now()
+    tecnico_id = originales.get('tecnico_asignado_id', instance.tecnico_asignado_id)
+    instance._transicion = (anterior, _segundos(instance.fecha_estado, ahora) if anterior else None, ahora, tecnico_id)
+    instance.fecha_estado = ahora
+
+
+@receiver(post_save, sender=Ticket)
+def registrar_transicion(sender, instance, raw=False, **kwargs):
+    transicion = getattr(instance, '_transicion', None)
+    if transicion is None:
+        return
+    instance._transicion = None
+    anterior, segundos, fecha, tecnico_id = transicion
+    TransicionEstado.objects.create(
+        ticket=instance, estado_anterior=anterior, estado_nuevo=instance.estado, fecha=fecha,
+        tecnico_id=tecnico_id, segundos_en_anterior=segundos,
+    )
+
+
+def registrar_transiciones_en_bloque(tickets, estado, ahora):
+    # Para QuerySet.update, antes de cambiar el estado: una lectura y un bulk_create.
+    cambian = tickets.exclude(estado=estado)
+    TransicionEstado.objects.bulk_create(
+        TransicionEstado(
+            ticket_id=ticket_id, estado_anterior=anterior, estado_nuevo=estado, fecha=ahora,
+            tecnico_id=tecnico_id, segundos_en_anterior=_segundos(desde, ahora),
+        )
+        for ticket_id, anterior, desde, tecnico_id in cambian.values_list(
+            'pk', 'estado', 'fecha_estado', 'tecnico_asignado_id')
+    )
+    cambian.update(fecha_estado=ahora)
+
+
+# ---- Tiempo en Estado (materializado) ----
+# Promedio y percentiles por mes, técnico y empresa. Los percentiles no se pueden
+# sumar entre lotes, así que cada mes se recalcula completo desde su historial.
+
+def inicio_de_mes(fecha):
+    return fecha.replace(day=1)
+
+
+def limites_mes(mes):
+    # Inicio y fin (excluido) del mes en la zona horaria local.
+    siguiente = (mes + datetime.timedelta(days=32)).replace(day=1)
+    return (timezone.make_aware(datetime.datetime.combine(mes, datetime.time.min)),
+            timezone.make_aware(datetime.datetime.combine(siguiente, datetime.time.min)))
+
+
+def _percentil(ordenados, fraccion):
+    # Rango más cercano: el valor bajo el cual queda al menos esa fracción de los casos.
+    return ordenados[max(math.ceil(fraccion * len(ordenados)) - 1, 0)]
+
+
+def materializar_mes(mes):
+    inicio, fin = limites_mes(mes)
+    duraciones = defaultdict(list)
+    filas = TransicionEstado.objects.filter(
+        fecha__gte=inicio, fecha__lt=fin, segundos_en_anterior__isnull=False,
+    ).values_list('estado_anterior', 'tecnico_id', 'ticket__usuario__nombre_empresa', 'segundos_en_anterior')
+    for estado, tecnico_id, empresa, segundos in filas.iterator():
+        duraciones[('total', '', estado)].append(segundos)
+        duraciones[('tecnico', str(tecnico_id or ''), estado)].append(segundos)
+        duraciones[('empresa', empresa or '', estado)].append(segundos)
+
+    ahora = timezone.now()
+    resumenes = []
+    for (dimension, clave, estado), segundos in duraciones.items():
+        segundos.sort()
+        resumenes.append(TiempoEstado(
+            mes=mes, dimension=dimension, clave=clave, estado=estado, cantidad=len(segundos),
+            promedio_segundos=sum(segundos) / len(segundos),
+            p50_segundos=_percentil(segundos, 0.5), p90_segundos=_percentil(segundos, 0.9),
+            calculado_en=ahora,
+        ))
+    with transaction.atomic():
+        TiempoEstado.objects.filter(mes=mes).delete()
+        TiempoEstado.objects.bulk_create(resumenes)
+    return len(resumenes)
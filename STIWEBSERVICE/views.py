@@ -1,17 +1,36 @@
+import asyncio
+
 from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.shortcuts import redirect, render, get_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.views.decorators.http import require_POST
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, redirect, render, get_object_or_404
 from django.core.exceptions import PermissionDenied
-from django.db.models.functions import TruncMonth
-from django.db.models import Count
 from django.conf.urls import handler404, handler403
-from .forms import LoginForm, RegistroUsuarioForm
-from .models import Ticket, Encuesta
+from .asignacion import elegir_tecnico
+from .busqueda import buscar_tickets
+from .errores import registrar_error
+from .estadisticas import acontar_tickets_por_estado, contar_tickets_por_estado, obtener_agregados_dashboard
+from .exportacion import FORMATOS_EXPORTACION, lineas_async, tickets_para_exportar
+from .forms import (
+    AccionMasivaForm,
+    BusquedaTicketsForm,
+    FiltroExportacionForm,
+    FiltroHistorialForm,
+    LoginForm,
+    RegistroUsuarioForm,
+)
+from .limites import limitar_intentos
+from .models import CALIFICACIONES, Ticket, Encuesta
+from .operaciones_masivas import actualizar_tickets, eliminar_tickets
+from .paginacion import paginar_por_cursor
 from django.db import IntegrityError
 from django.contrib.auth import get_user_model
 
 CustomUser = get_user_model()
+LIMITE_RESULTADOS_BUSQUEDA = 50
 
 def index_vista(request):
     return render(request, 'index.html')
@@ -23,22 +42,19 @@ def is_staff_user(user):
     raise PermissionDenied
 
 # ---- Vistas de Autenticación ----
+@limitar_intentos('login')
 def login_view(request):
     if request.method == 'POST':
         form = LoginForm(request.POST)
         if form.is_valid():
             email = form.cleaned_data['email']
             password = form.cleaned_data['password']
-            try:
-                user = CustomUser.objects.get(email=email)
-                user = authenticate(request, username=user.username, password=password)
-                if user is not None:
-                    login(request, user)
-                    messages.success(request, f"Bienvenido {user.first_name or user.username}.")
-                    return redirect('home')
-                messages.error(request, "Correo o contraseña incorrectos.")
-            except CustomUser.DoesNotExist:
-                messages.error(request, "Correo no registrado.")
+            user = authenticate(request, email=email, password=password)
+            if user is not None:
+                login(request, user)
+                messages.success(request, f"Bienvenido {user.first_name or user.username}.")
+                return redirect('home')
+            messages.error(request, "Correo o contraseña incorrectos.")
     else:
         form = LoginForm()
     return render(request, 'login.html', {'form': form})
@@ -47,6 +63,7 @@ def custom_logout(request):
     logout(request)
     return redirect('login')
 
+@limitar_intentos('registrarse')
 def registrarse_vista(request):
     if request.method == 'POST':
         form = RegistroUsuarioForm(request.POST)
@@ -68,10 +85,7 @@ def perfil_usuario(request):
 @login_required
 def home_vista(request):
     context = {
-        "tickets_total": Ticket.objects.count(),
-        "tickets_pendientes": Ticket.objects.filter(estado="Pendiente").count(),
-        "tickets_resueltos": Ticket.objects.filter(estado="Resuelto").count(),
-        "tickets_en_proceso": Ticket.objects.filter(estado="En Progreso").count(),
+        **contar_tickets_por_estado(),
         "tickets_recientes": Ticket.objects.order_by("-fecha_creacion")[:5],
     }
     return render(request, "home.html", context)
@@ -85,7 +99,10 @@ def ticket_vista(request):
         if not (titulo and descripcion):
             messages.error(request, "El título y la descripción son obligatorios.")
         else:
-            Ticket.objects.create(titulo=titulo, descripcion=descripcion, usuario=request.user)
+            # El técnico menos cargado se fija antes del INSERT; sin capacidad, el ticket queda en cola.
+            Ticket.objects.create(
+                titulo=titulo, descripcion=descripcion, usuario=request.user,
+                tecnico_asignado_id=elegir_tecnico())
             messages.success(request, "El ticket fue creado exitosamente.")
             return redirect("home")
     return render(request, "ticket1.html")
@@ -94,31 +111,14 @@ def ticket_vista(request):
 @user_passes_test(is_staff_user)
 def dashboard_vista(request):
     context = {
-        'tickets_pendientes': Ticket.objects.filter(estado="Pendiente").count(),
-        'tickets_en_proceso': Ticket.objects.filter(estado="En Progreso").count(),
-        'tickets_resueltos': Ticket.objects.filter(estado="Resuelto").count(),
-        'tickets_por_mes': (
-            Ticket.objects.annotate(mes=TruncMonth('fecha_creacion'))
-            .values('mes')
-            .annotate(total=Count('id'))
-            .order_by('mes')
-        ),
-        'tickets_por_tecnico': (
-            Ticket.objects.values('tecnico_asignado__first_name', 'tecnico_asignado__last_name')
-            .annotate(total=Count('id'))
-            .order_by('-total')
-        ),
-        'tickets_por_empresa': (
-            Ticket.objects.values('usuario__nombre_empresa')
-            .annotate(total=Count('id'))
-            .order_by('-total')
-        ),
+        **contar_tickets_por_estado(),
+        **obtener_agregados_dashboard(),
     }
     return render(request, 'dashboard.html', context)
 
 @login_required
 def detalle_ticket_vista(request, ticket_id):
-    ticket = get_object_or_404(Ticket, id=ticket_id)
+    ticket = get_object_or_404(Ticket.objects.con_personas().con_comentarios(), id=ticket_id)
     if request.method == 'POST' and request.user.is_staff:
         ticket.estado = request.POST.get('estado')
         ticket.prioridad = request.POST.get('prioridad')
@@ -131,10 +131,78 @@ def detalle_ticket_vista(request, ticket_id):
         return redirect('dashboard')
     return render(request, 'detalle_ticket.html', {'ticket': ticket})
 
+@login_required
+def historial_ticket_vista(request):
+    form = FiltroHistorialForm(request.GET or None)
+    tickets = Ticket.objects.all() if request.user.is_staff else Ticket.objects.filter(usuario=request.user)
+    if form.is_valid():
+        tickets = tickets.filtrar(**form.cleaned_data)
+    tickets = tickets.values(
+        'id', 'titulo', 'estado', 'prioridad', 'fecha_creacion',
+        'usuario__first_name', 'usuario__last_name', 'usuario__nombre_empresa',
+    )
+    pagina, siguiente = paginar_por_cursor(tickets, request.GET.get('despues'))
+
+    parametros = request.GET.copy()
+    parametros.pop('despues', None)
+    return render(request, 'historial_ticket.html', {
+        'form': form,
+        'accion_form': AccionMasivaForm() if request.user.is_staff else None,
+        'tickets': pagina,
+        'cursor_siguiente': siguiente,
+        'es_primera_pagina': 'despues' not in request.GET,
+        'filtros_query': parametros.urlencode(),
+    })
+
+@login_required
+def buscar_tickets_vista(request):
+    form = BusquedaTicketsForm(request.GET or None)
+    resultados = []
+    if form.is_valid():
+        tickets = Ticket.objects.all() if request.user.is_staff else Ticket.objects.filter(usuario=request.user)
+        resultados = buscar_tickets(form.cleaned_data['q'], tickets, LIMITE_RESULTADOS_BUSQUEDA).values(
+            'id', 'titulo', 'estado', 'solucion', 'fecha_creacion', 'usuario__nombre_empresa', 'rango',
+        )
+    return render(request, 'busqueda_ticket.html', {'form': form, 'resultados': resultados})
+
+@login_required
+@user_passes_test(is_staff_user)
+@require_POST
+def acciones_masivas_vista(request):
+    form = AccionMasivaForm(request.POST)
+    if not form.is_valid():
+        for error in form.non_field_errors():
+            messages.error(request, error)
+        return redirect('historial')
+    datos = form.cleaned_data
+    if datos['accion'] == 'eliminar':
+        total = eliminar_tickets(datos['tickets'])
+        messages.success(request, f"Se eliminaron {total} tickets.")
+    else:
+        campo = 'tecnico_asignado' if datos['accion'] == 'tecnico' else datos['accion']
+        total = actualizar_tickets(datos['tickets'], **{campo: datos[datos['accion']]})
+        messages.success(request, f"Se actualizaron {total} tickets.")
+    return redirect('historial')
+
+@login_required
+@user_passes_test(is_staff_user)
+def exportar_tickets_vista(request):
+    form = FiltroExportacionForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest("Filtros de exportación inválidos.")
+    formato = form.cleaned_data['formato'] or 'csv'
+    generar_lineas, content_type = FORMATOS_EXPORTACION[formato]
+    lineas = generar_lineas(tickets_para_exportar(form.cleaned_data))
+    if isinstance(request, ASGIRequest):
+        lineas = lineas_async(lineas)
+    response = StreamingHttpResponse(lineas, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="tickets.{formato}"'
+    return response
+
 @login_required
 def eliminar_ticket_vista(request, ticket_id):
     try:
-        ticket = Ticket.objects.get(id=ticket_id)
+        ticket = Ticket.objects.select_related('usuario').get(id=ticket_id)
         ticket.delete()
         messages.success(request, "El ticket ha sido eliminado exitosamente.")
     except Ticket.DoesNotExist:
@@ -143,21 +211,70 @@ def eliminar_ticket_vista(request, ticket_id):
 
 @login_required
 def encuesta_vista(request, ticket_id):
-    ticket = get_object_or_404(Ticket, id=ticket_id)
+    # Con el solicitante cargado, los contadores de satisfacción no vuelven a consultarlo.
+    ticket = get_object_or_404(Ticket.objects.select_related("usuario"), id=ticket_id)
     if not request.user.is_staff and ticket.estado == "Resuelto":
         if request.method == "POST":
-            Encuesta.objects.create(
-                ticket=ticket,
-                calificacion=request.POST.get("rating"),
-                comentarios=request.POST.get("comments"),
-            )
-            messages.success(request, "¡Gracias por calificar el servicio!")
+            calificacion = request.POST.get("rating", "")
+            if calificacion not in {str(valor) for valor in CALIFICACIONES}:
+                messages.error(request, "Selecciona una calificación de 1 a 5.")
+                return render(request, "encuesta.html", {"ticket": ticket})
+            # get_or_create recupera la encuesta si un segundo envío pierde la carrera contra
+            # la restricción única del OneToOne, en vez de terminar en IntegrityError.
+            _, creada = Encuesta.objects.get_or_create(ticket=ticket, defaults={
+                "calificacion": int(calificacion),
+                "comentarios": request.POST.get("comments"),
+            })
+            if creada:
+                messages.success(request, "¡Gracias por calificar el servicio!")
+            else:
+                messages.info(request, "Este ticket ya fue calificado.")
             return redirect("home")
         return render(request, "encuesta.html", {"ticket": ticket})
     messages.error(request, "No tienes permiso para calificar este ticket.")
     return redirect("home")
 
+# ---- Vistas Asíncronas (despliegue ASGI, VISTAS_ASYNC=True) ----
+# render() es síncrono: se deja request.user ya resuelto para que las plantillas
+# no consulten la base de datos desde el event loop. El dashboard no tiene versión
+# asíncrona: sus agregados son síncronos (caché y recálculo) y solo se ejecutarían
+# en el hilo compartido de sync_to_async sin ganar nada.
+async def _resolver_usuario(request):
+    request.user = await request.auser()
+
+@login_required
+async def home_vista_async(request):
+    await _resolver_usuario(request)
+
+    async def recientes():
+        return [ticket async for ticket in Ticket.objects.order_by("-fecha_creacion")[:5]]
+
+    contadores, tickets_recientes = await asyncio.gather(acontar_tickets_por_estado(), recientes())
+    return render(request, "home.html", {**contadores, "tickets_recientes": tickets_recientes})
+
+@login_required
+async def detalle_ticket_vista_async(request, ticket_id):
+    await _resolver_usuario(request)
+    ticket = await aget_object_or_404(Ticket.objects.con_personas().con_comentarios(), id=ticket_id)
+    if request.method == 'POST' and request.user.is_staff:
+        ticket.estado = request.POST.get('estado')
+        ticket.prioridad = request.POST.get('prioridad')
+        ticket.solucion = request.POST.get('solucion')
+        ticket.visita_terreno = 'visita_terreno' in request.POST
+        if ticket.estado == 'En Progreso' and ticket.tecnico_asignado is None:
+            ticket.tecnico_asignado = request.user
+        await ticket.asave()
+        messages.success(request, "El ticket ha sido actualizado correctamente.")
+        return redirect('dashboard')
+    return render(request, 'detalle_ticket.html', {'ticket': ticket})
+
 # ---- Manejo de Errores ----
+# Los errores se registran en memoria y se guardan por lotes (ver errores.py).
 def error_404_view(request, exception=None):
+    registrar_error('404', request)
     return render(request, '404.html', status=404)
 
+def error_403_view(request, exception=None):
+    registrar_error('403', request, str(exception or ''))
+    return render(request, '403.html', status=403)
+
@@ -3,6 +3,16 @@ ASGI config for django_project project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Despliegue ASGI (las vistas asíncronas se activan con VISTAS_ASYNC=True):
+
+    VISTAS_ASYNC=True uvicorn django_project.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
+o con gunicorn administrando los procesos (ver gunicorn.conf.py):
+
+    VISTAS_ASYNC=True GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker gunicorn django_project.asgi
+
+Para comparar ambos despliegues: python manage.py benchmark_asgi
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
 """
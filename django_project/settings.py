@@ -1,7 +1,6 @@
 import os
 from pathlib import Path
 from dotenv import load_dotenv
-from django.shortcuts import render
 
 # Cargar variables de entorno desde .env
 load_dotenv()
@@ -34,6 +33,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'STIWEBSERVICE.middleware.InstrumentacionMiddleware',  # Tiempos y consultas por solicitud
     'corsheaders.middleware.CorsMiddleware',  # Añadido para CORS
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -46,7 +46,28 @@ MIDDLEWARE = [
 if "REPLIT_DEPLOYMENT" in os.environ:
     MIDDLEWARE.append('django.middleware.clickjacking.XFrameOptionsMiddleware')
 
-ROOT_URLCONF = 'django_project.urls'
+# Instrumentación por solicitud (Server-Timing y log estructurado); desactivada no agrega costo
+INSTRUMENTACION_ACTIVA = os.getenv('INSTRUMENTACION_ACTIVA', 'False') == 'True'
+INSTRUMENTACION_UMBRAL_LENTO_MS = float(os.getenv('INSTRUMENTACION_UMBRAL_LENTO_MS', '500'))
+INSTRUMENTACION_MUESTREO_LENTAS = float(os.getenv('INSTRUMENTACION_MUESTREO_LENTAS', '0.1'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'STIWEBSERVICE': {
+            'handlers': ['console'],
+            'level': os.getenv('STIWEBSERVICE_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
+# Con VISTAS_ASYNC=True (servidor ASGI) home y detalle de ticket usan sus vistas asíncronas
+VISTAS_ASYNC = os.getenv('VISTAS_ASYNC', 'False') == 'True'
+ROOT_URLCONF = 'django_project.urls_asgi' if VISTAS_ASYNC else 'django_project.urls'
 
 TEMPLATES = [
     {
@@ -67,6 +88,10 @@ TEMPLATES = [
 WSGI_APPLICATION = 'django_project.wsgi.application'
 
 # Base de Datos
+# Conexiones: con DB_POOL=True se usa el pool nativo de psycopg 3 (Django 5.1+); si no,
+# conexiones persistentes por DB_CONN_MAX_AGE segundos (0 bajo ASGI, donde no se reutilizan
+# entre solicitudes). Las verificaciones de salud descartan conexiones caídas antes de usarlas.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
@@ -75,12 +100,57 @@ DATABASES = {
         'PASSWORD': os.getenv('DB_PASSWORD', ''),
         'HOST': os.getenv('DB_HOST', 'localhost'),
         'PORT': os.getenv('DB_PORT', '5432'),
+        'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv('DB_CONN_MAX_AGE', '0' if VISTAS_ASYNC else '60')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
         'OPTIONS': {
             'sslmode': os.getenv('DB_SSLMODE', 'require'),
         },
     }
 }
 
+if DB_POOL:
+    DATABASES['default']['OPTIONS']['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+    }
+
+# DB_ENGINE=sqlite permite correr los benchmarks sin PostgreSQL
+if os.getenv('DB_ENGINE') == 'sqlite':
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.getenv('DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')),
+    }
+
+# Caché (locmem por defecto; en producción se puede usar archivo o base de datos)
+# Ejemplos: CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache, CACHE_LOCATION=/var/tmp/sti-cache
+#           CACHE_BACKEND=django.core.cache.backends.db.DatabaseCache, CACHE_LOCATION=sti_cache (requiere createcachetable)
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'sti-cache'),
+    }
+}
+
+# Sesiones: db (una consulta por solicitud), cached_db (se leen de la caché y se guardan también en la
+# base) o signed_cookies (sin estado en el servidor; cerrar sesión no invalida una copia robada de la cookie).
+# cached_db y el usuario en caché necesitan una caché compartida entre workers para que cerrar sesión,
+# desactivar un usuario o cambiar su contraseña valga en todos; con locmem quedan desactivados por defecto.
+CACHE_COMPARTIDA = CACHES['default']['BACKEND'] not in (
+    'django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache')
+SESSION_MODO = os.getenv('SESSION_MODO', 'cached_db' if CACHE_COMPARTIDA else 'db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_MODO]
+# Segundos que el usuario autenticado se guarda en caché entre solicitudes (0 lo desactiva)
+USUARIO_CACHE_TTL = int(os.getenv('USUARIO_CACHE_TTL', '300' if CACHE_COMPARTIDA else '0'))
+
+# Agregados del dashboard: segundos frescos y segundos adicionales en que se sirven vencidos mientras se recalculan
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '300'))
+DASHBOARD_CACHE_STALE = int(os.getenv('DASHBOARD_CACHE_STALE', '60'))
+
 # Validación de contraseñas
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -114,12 +184,47 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 # Configuración del modelo de usuario personalizado
 AUTH_USER_MODEL = 'STIWEBSERVICE.CustomUser'
 
-# Configuración de errores personalizados
-HANDLER403 = 'django_project.settings.error_403'
+# El login del sitio es por correo (una consulta); ModelBackend mantiene el login por username del admin
+AUTHENTICATION_BACKENDS = [
+    'STIWEBSERVICE.autenticacion.EmailBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Asignación automática: máximo de tickets abiertos por técnico (sin definir o 0 = sin límite; con
+# límite, el resto espera en cola hasta que lo reparta el comando asignar_pendientes) y cuántos
+# segundos sigue vigente un motor cargado en un proceso
+ASIGNACION_CAPACIDAD = int(os.getenv('ASIGNACION_CAPACIDAD')) if os.getenv('ASIGNACION_CAPACIDAD') else None
+ASIGNACION_RESINCRONIZAR = float(os.getenv('ASIGNACION_RESINCRONIZAR', '300'))
+
+# Plazo de resolución comprometido por prioridad, en horas (ver STIWEBSERVICE/sla.py)
+SLA_HORAS = {
+    'Alta': int(os.getenv('SLA_HORAS_ALTA', '8')),
+    'Media': int(os.getenv('SLA_HORAS_MEDIA', '24')),
+    'Baja': int(os.getenv('SLA_HORAS_BAJA', '72')),
+}
 
+# Límite de intentos por vista: (capacidad, segundos en recargar la cubeta completa) por IP y por correo.
+# LIMITES_PROXIES_CONFIABLES es el número de proxies delante de la aplicación que agregan su
+# salto a X-Forwarded-For (1 en Render); 0 si los clientes llegan directo (se usa REMOTE_ADDR).
+# Sin definir, no se limita por IP, solo por correo.
+LIMITES_ACTIVOS = os.getenv('LIMITES_ACTIVOS', 'True') == 'True'
+LIMITES_PROXIES_CONFIABLES = (
+    int(os.getenv('LIMITES_PROXIES_CONFIABLES')) if os.getenv('LIMITES_PROXIES_CONFIABLES') else None
+)
+LIMITES_INTENTOS = {
+    'login': {
+        'ip': (int(os.getenv('LIMITE_LOGIN_IP', '30')), 60),
+        'email': (int(os.getenv('LIMITE_LOGIN_EMAIL', '5')), 300),
+    },
+    'registrarse': {
+        'ip': (int(os.getenv('LIMITE_REGISTRO_IP', '10')), 3600),
+    },
+}
 
-def error_403(request, exception=None):
-    return render(request, '403.html', status=403)
+# Registro de errores (404/403) en segundo plano: grupos en memoria, tamaño de lote y segundos entre vaciados
+ERRORES_CAPACIDAD_BUFFER = int(os.getenv('ERRORES_CAPACIDAD_BUFFER', '1000'))
+ERRORES_LOTE = int(os.getenv('ERRORES_LOTE', '200'))
+ERRORES_INTERVALO_VACIADO = float(os.getenv('ERRORES_INTERVALO_VACIADO', '10'))
 
 # Configuraciones de CORS
 CORS_ALLOWED_ORIGINS = os.getenv(
@@ -129,6 +234,8 @@ CORS_ALLOWED_ORIGINS = os.getenv(
 # Permitir todas las cabeceras y métodos para desarrollo
 CORS_ALLOW_HEADERS = ['*']
 CORS_ALLOW_METHODS = ['*']
+# El frontend necesita leer las cabeceras de validación para el GET condicional
+CORS_EXPOSE_HEADERS = ['ETag', 'Last-Modified']
 
 # Configuraciones adicionales para producción
 if not DEBUG:
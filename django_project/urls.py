@@ -2,7 +2,7 @@ from django.contrib import admin
 from django.contrib.auth.views import LoginView, LogoutView
 from django.urls import path, re_path
 
-from STIWEBSERVICE import views
+from STIWEBSERVICE import api, views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -12,13 +12,23 @@ urlpatterns = [
     path('home/', views.home_vista, name='home'),
     path('ticket/<int:ticket_id>/',
          views.detalle_ticket_vista, name='detalleticket'),
+    path('ticket/historial/', views.historial_ticket_vista, name='historial'),
+    path('ticket/buscar/', views.buscar_tickets_vista, name='buscar_tickets'),
+    path('ticket/exportar/', views.exportar_tickets_vista, name='exportar_tickets'),
+    path('ticket/acciones-masivas/', views.acciones_masivas_vista, name='acciones_masivas'),
     path('ticket/eliminar/<int:ticket_id>/',
          views.eliminar_ticket_vista, name='eliminar_ticket'),
 
     path('dashboard/', views.dashboard_vista, name='dashboard'),
     path('encuesta/<int:ticket_id>', views.encuesta_vista, name='encuesta'),
+    path('api/tickets/', api.tickets_api, name='api_tickets'),
+    path('api/tickets/<int:ticket_id>/', api.ticket_detalle_api, name='api_ticket_detalle'),
+    path('api/estadisticas/', api.estadisticas_api, name='api_estadisticas'),
     path('login/', views.login_view, name='login'),
     path('perfil/', views.perfil_usuario, name='perfil_usuario'),
     path('logout/', views.custom_logout, name='logout'),
     re_path(r'^.*$', views.error_404_view, name='error_404'),
 ]
+
+handler403 = views.error_403_view
+handler404 = views.error_404_view
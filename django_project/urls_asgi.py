@@ -0,0 +1,25 @@
+"""
+Rutas para el despliegue ASGI (VISTAS_ASYNC=True).
+
+Son las mismas de ``django_project.urls``, pero home y el detalle de ticket se
+sirven con sus versiones asíncronas.
+"""
+from django.urls import path
+
+from django_project.urls import urlpatterns as rutas_wsgi
+from STIWEBSERVICE import views
+
+VISTAS_ASINCRONAS = {
+    'home': views.home_vista_async,
+    'detalleticket': views.detalle_ticket_vista_async,
+}
+
+urlpatterns = [
+    path(str(ruta.pattern), VISTAS_ASINCRONAS[ruta.name], name=ruta.name)
+    if getattr(ruta, 'name', None) in VISTAS_ASINCRONAS else ruta
+    for ruta in rutas_wsgi
+]
+
+# Django busca los manejadores de error en el ROOT_URLCONF: los mismos que en urls.py.
+handler403 = views.error_403_view
+handler404 = views.error_404_view
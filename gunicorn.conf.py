@@ -0,0 +1,13 @@
+# Configuración de gunicorn (se carga automáticamente desde la raíz del proyecto).
+#
+#   WSGI (workers síncronos):  gunicorn django_project.wsgi
+#   ASGI (workers uvicorn):    VISTAS_ASYNC=True GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker \
+#                              gunicorn django_project.asgi
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'sync')
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+accesslog = '-'